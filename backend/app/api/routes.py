@@ -1,33 +1,142 @@
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import or_, select
-
-from app.db.models import CountryIndicatorModel, CentreModel, ReferenceModel, get_session
+import asyncio
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Select, String, func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_events_poll_seconds, get_recommender_workers
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from app.db.models import (
+    INDICATORS_COUNTER,
+    LOAD_COUNTER,
+    TOPOLOGY_COUNTER,
+    CountryIndicatorModel,
+    CentreModel,
+    ReferenceModel,
+    bump_load_version,
+    get_change_versions,
+    get_async_session,
+    get_latest_indicators,
+    upsert_references,
+)
+from app.db.queries import (
+    INDICATOR_COLUMNS,
+    fetch_dicts,
+    rows_to_dicts,
+    select_centres,
+    select_references,
+    split_specialities,
+)
+from app.services.change_feed import ChangeFeed, format_sse
+from app.services.episode_log import EpisodeLog
 from app.services.recommender import Recommender
+from app.services.snapshot_codec import MEDIA_TYPE as SNAPSHOT_MEDIA_TYPE, encode_snapshot
 from app.services.schemas import (
+    BatchRecommandationRequest,
+    BatchRecommandationResponse,
+    BatchRecommandationResult,
+    BulkCentreCreate,
+    BulkReferenceCreate,
+    BulkWriteResponse,
     CentreCreate,
+    CentreLoadResponse,
+    CentreLoadUpdate,
+    CentrePage,
     CentreResponse,
     CentreUpdate,
     IndicatorResponse,
     RecommandationRequest,
     RecommandationResponse,
     ReferenceCreate,
+    ReferencePage,
     ReferenceResponse,
     ReferenceUpdate,
+    RouteCacheStats,
 )
 
 router = APIRouter()
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 1000
+# Rows fetched per round trip when streaming NDJSON dumps.
+STREAM_BATCH_SIZE = 500
+# Change counters whose versions make up each table's ETag. Every centre write
+# bumps topology or load and every reference write bumps topology.
+CENTRES_ETAG_COUNTERS = (TOPOLOGY_COUNTER, LOAD_COUNTER)
+REFERENCES_ETAG_COUNTERS = (TOPOLOGY_COUNTER,)
+INDICATORS_ETAG_COUNTERS = (INDICATORS_COUNTER,)
 _recommender: Recommender | None = None
+_recommender_lock = threading.Lock()
+# Graph builds and scoring are CPU-bound: they run here instead of on the event loop
+# or in the default pool that serves the remaining sync work.
+_recommender_executor = ThreadPoolExecutor(max_workers=get_recommender_workers(), thread_name_prefix="recommender")
+T = TypeVar("T")
+PRELOAD_RETRY_SECONDS = 1.0
+PRELOAD_RETRY_MAX_SECONDS = 30.0
+# Seconds between SSE comment lines that keep idle /events connections open through proxies.
+EVENTS_KEEPALIVE_SECONDS = 15.0
 
 
 def get_recommender() -> Recommender:
     global _recommender
     if _recommender is None:
-        _recommender = Recommender()
+        # Executor threads may race here; build the graph only once.
+        with _recommender_lock:
+            if _recommender is None:
+                _recommender = Recommender()
     return _recommender
 
 
-def _split_specialities(specialities: str) -> list[str]:
-    return [item.strip() for item in specialities.split(",") if item.strip()]
+async def _offload(work: Callable[[], T]) -> T:
+    return await asyncio.get_running_loop().run_in_executor(_recommender_executor, work)
+
+
+# Served recommendations are persisted off the request path (write-behind).
+episode_log = EpisodeLog.from_env()
+# Set once warm_up() has built the recommender and its graph snapshot; /ready reports it.
+_warm = threading.Event()
+_warm_error: str | None = None
+
+
+def warm_up() -> None:
+    """Build the recommender and its graph snapshot (hierarchy included) before traffic arrives."""
+    get_recommender().graph_service.snapshot()
+    _warm.set()
+
+
+async def preload() -> None:
+    """Warm the async DB pool and the recommendation hot path; run from the app lifespan.
+
+    Failures (e.g. the database is not reachable yet) are retried with backoff
+    while /ready keeps reporting the last error.
+    """
+    global _warm_error
+    delay = PRELOAD_RETRY_SECONDS
+    while True:
+        try:
+            async with get_async_session() as session:
+                await session.execute(select(literal(1)))
+            await _offload(warm_up)
+        except Exception as exc:
+            _warm_error = f"{type(exc).__name__}: {exc}"
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PRELOAD_RETRY_MAX_SECONDS)
+        else:
+            _warm_error = None
+            return
+
+
+_change_feed = ChangeFeed(
+    lambda: _offload(lambda: get_recommender().graph_service.snapshot()),
+    interval=get_events_poll_seconds(),
+)
 
 
 def _join_specialities(specialities: list[str]) -> str:
@@ -37,46 +146,282 @@ def _join_specialities(specialities: list[str]) -> str:
     return ",".join(cleaned)
 
 
+async def _table_etag(session: AsyncSession, table: str, counters: tuple[str, ...]) -> str:
+    versions = await session.run_sync(get_change_versions, counters)
+    return f'W/"{table}-{"-".join(str(version) for version in versions)}"'
+
+
+def _not_modified(request: Request, etag: str) -> Response | None:
+    """A bodiless 304 when ``If-None-Match`` already names ``etag`` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def _centre_filters(level: str | None, speciality: str | None, name_prefix: str | None) -> list:
+    clauses = []
+    if level:
+        clauses.append(CentreModel.level == level)
+    if speciality:
+        # Specialities are stored comma-joined; pad both sides to match whole items only.
+        # Legacy rows may space the separators ("general, maternal"): drop only those
+        # spaces so multi-word items ("mental health") still match.
+        padded = literal(",", String) + CentreModel.specialities + ","
+        for spaced in (", ", " ,"):
+            padded = func.replace(padded, spaced, ",", type_=String)
+        clauses.append(padded.contains(f",{speciality.strip()},", autoescape=True))
+    if name_prefix:
+        clauses.append(CentreModel.name.startswith(name_prefix, autoescape=True))
+    return clauses
+
+
+def _reference_filters(source_id: str | None, dest_id: str | None) -> list:
+    clauses = []
+    if source_id:
+        clauses.append(ReferenceModel.source_id == source_id)
+    if dest_id:
+        clauses.append(ReferenceModel.dest_id == dest_id)
+    return clauses
+
+
+async def _centres_exist(session: AsyncSession, *centre_ids: str) -> bool:
+    wanted = set(centre_ids)
+    found = await session.scalar(select(func.count()).select_from(CentreModel).where(CentreModel.id.in_(wanted)))
+    return found == len(wanted)
+
+
+async def _commit(session: AsyncSession) -> None:
+    """Commit a network write and let /events subscribers see it without waiting for the next poll."""
+    await session.commit()
+    _change_feed.notify()
+
+
+async def _commit_bulk(session: AsyncSession) -> None:
+    # A concurrent writer can still claim an id or pair between the check and the insert.
+    try:
+        await _commit(session)
+    except IntegrityError as exc:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="Bulk write conflicted with a concurrent change; retry") from exc
+
+
+def _page_response(items: list[dict], limit: int, etag: str) -> JSONResponse:
+    next_after_id = items[limit - 1]["id"] if len(items) > limit else None
+    return JSONResponse({"items": items[:limit], "next_after_id": next_after_id}, headers={"ETag": etag})
+
+
+def _stream_ndjson(query: Select) -> StreamingResponse:
+    """Stream ``query`` as one JSON object per line, holding one batch of rows at a time."""
+
+    async def lines() -> AsyncIterator[str]:
+        async with get_async_session() as session:
+            result = await session.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            keys = list(result.keys())
+            async for batch in result.partitions():
+                yield "".join(json.dumps(item, separators=(",", ":")) + "\n" for item in rows_to_dicts(keys, batch))
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/health")
-def healthcheck() -> dict[str, str]:
+async def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@router.get("/ready")
+async def readiness() -> JSONResponse:
+    """200 once the graph is loaded and searchable, 503 while warming (unlike /health)."""
+    if not _warm.is_set():
+        body = {"status": "warming"} if _warm_error is None else {"status": "error", "detail": _warm_error}
+        return JSONResponse(body, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    snapshot = get_recommender().graph_service.current
+    return JSONResponse(
+        {
+            "status": "ready",
+            "topology_version": snapshot.topology_version,
+            "load_version": snapshot.load_version,
+            "node_count": snapshot.compact.node_count,
+            "routing_method": snapshot.routing_method,
+        }
+    )
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """Latency histograms and hot-path timers of this process, in Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @router.post("/recommander", response_model=RecommandationResponse)
-def recommander(payload: RecommandationRequest) -> RecommandationResponse:
+async def recommander(payload: RecommandationRequest) -> RecommandationResponse:
+    def run() -> RecommandationResponse:
+        start = time.perf_counter()
+        recommender = get_recommender()
+        snapshot = recommender.graph_service.snapshot()
+        response = recommender.recommend(payload, snapshot)
+        episode_log.record(payload, response, snapshot, time.perf_counter() - start)
+        return response
+
     try:
-        return get_recommender().recommend(payload)
+        return await _offload(run)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
-@router.get("/centres", response_model=list[CentreResponse])
-def list_centres() -> list[CentreResponse]:
-    with get_session() as session:
-        rows = session.scalars(select(CentreModel).order_by(CentreModel.id)).all()
-
-    return [
-        CentreResponse(
-            id=row.id,
-            name=row.name,
-            level=row.level,
-            specialities=_split_specialities(row.specialities),
-            capacity_available=row.capacity_available,
-            estimated_wait_minutes=row.estimated_wait_minutes,
-        )
-        for row in rows
+@router.post("/recommander/batch", response_model=BatchRecommandationResponse)
+async def recommander_batch(payload: BatchRecommandationRequest) -> BatchRecommandationResponse:
+    def run() -> tuple:
+        start = time.perf_counter()
+        recommender = get_recommender()
+        snapshot = recommender.graph_service.snapshot()
+        outcomes = recommender.recommend_batch(payload.items, snapshot)
+        # Items share one search, so each is logged with the latency of the whole batch.
+        latency = time.perf_counter() - start
+        for item, outcome in zip(payload.items, outcomes):
+            if not isinstance(outcome, ValueError):
+                episode_log.record(item, outcome, snapshot, latency)
+        return snapshot, outcomes
+
+    snapshot, outcomes = await _offload(run)
+    results = [
+        BatchRecommandationResult(patient_id=item.patient_id, error=str(outcome))
+        if isinstance(outcome, ValueError)
+        else BatchRecommandationResult(patient_id=item.patient_id, recommendation=outcome)
+        for item, outcome in zip(payload.items, outcomes)
     ]
+    return BatchRecommandationResponse(
+        topology_version=snapshot.topology_version,
+        load_version=snapshot.load_version,
+        results=results,
+    )
+
+
+@router.get("/recommander/cache", response_model=RouteCacheStats)
+async def recommander_cache_stats() -> RouteCacheStats:
+    return RouteCacheStats(**await _offload(lambda: get_recommender().route_cache.stats()))
+
+
+@router.get("/graph/snapshot")
+async def graph_snapshot(
+    request: Request,
+    since_topology: int | None = None,
+    since_load: int | None = None,
+) -> Response:
+    """The whole network as one binary payload (see app.services.snapshot_codec).
+
+    A client that already holds ``since_topology`` only receives the load
+    columns, and gets a 304 when ``since_load`` is current as well.
+    """
+    snapshot = await _offload(lambda: get_recommender().graph_service.snapshot())
+    etag = f'W/"graph-{snapshot.topology_version}-{snapshot.load_version}"'
+    headers = {
+        "ETag": etag,
+        "X-Topology-Version": str(snapshot.topology_version),
+        "X-Load-Version": str(snapshot.load_version),
+    }
+    topology_known = since_topology is not None and since_topology == snapshot.topology_version
+    if topology_known and since_load is not None and since_load == snapshot.load_version:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    payload = await _offload(lambda: encode_snapshot(snapshot, topology=not topology_known))
+    return Response(content=payload, media_type=SNAPSHOT_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/events")
+async def network_events(request: Request) -> StreamingResponse:
+    """Server-sent events for network changes, replacing periodic full reloads.
+
+    ``versions`` carries the current topology and load versions: sent first, then
+    whenever the topology changes (refetch ``/graph/snapshot``). ``load`` carries
+    ``[id, capacity_available, estimated_wait_minutes]`` rows for centres whose
+    load moved, tagged with the new load version.
+    """
+    queue = await _change_feed.subscribe()
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            _change_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/centres", response_model=list[CentreResponse])
+async def list_centres(
+    request: Request,
+    level: str | None = None,
+    speciality: str | None = None,
+    name_prefix: str | None = None,
+) -> Response:
+    query = select_centres(*_centre_filters(level, speciality, name_prefix))
+    async with get_async_session() as session:
+        etag = await _table_etag(session, "centres", CENTRES_ETAG_COUNTERS)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        items = await session.run_sync(fetch_dicts, query)
+
+    return JSONResponse(items, headers={"ETag": etag})
+
+
+@router.get("/centres/page", response_model=CentrePage)
+async def list_centres_page(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after_id: str | None = None,
+    level: str | None = None,
+    speciality: str | None = None,
+    name_prefix: str | None = None,
+) -> Response:
+    clauses = _centre_filters(level, speciality, name_prefix)
+    if after_id is not None:
+        clauses.append(CentreModel.id > after_id)
+    async with get_async_session() as session:
+        etag = await _table_etag(session, "centres", CENTRES_ETAG_COUNTERS)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        # One extra row tells whether another page follows.
+        items = await session.run_sync(fetch_dicts, select_centres(*clauses).limit(limit + 1))
+
+    return _page_response(items, limit, etag)
+
+
+@router.get("/centres/stream", response_class=StreamingResponse)
+async def stream_centres(
+    level: str | None = None,
+    speciality: str | None = None,
+    name_prefix: str | None = None,
+) -> StreamingResponse:
+    return _stream_ndjson(select_centres(*_centre_filters(level, speciality, name_prefix)))
 
 
 @router.post("/centres", response_model=CentreResponse, status_code=status.HTTP_201_CREATED)
-def create_centre(payload: CentreCreate) -> CentreResponse:
+async def create_centre(payload: CentreCreate) -> CentreResponse:
     try:
         specialities = _join_specialities(payload.specialities)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    with get_session() as session:
-        existing = session.get(CentreModel, payload.id)
+    async with get_async_session() as session:
+        existing = await session.get(CentreModel, payload.id)
         if existing:
             raise HTTPException(status_code=409, detail=f"Centre '{payload.id}' already exists")
 
@@ -89,27 +434,52 @@ def create_centre(payload: CentreCreate) -> CentreResponse:
             estimated_wait_minutes=payload.estimated_wait_minutes,
         )
         session.add(centre)
-        session.commit()
+        await _commit(session)
 
     return CentreResponse(
         id=payload.id,
         name=payload.name,
         level=payload.level,
-        specialities=_split_specialities(specialities),
+        specialities=split_specialities(specialities),
         capacity_available=payload.capacity_available,
         estimated_wait_minutes=payload.estimated_wait_minutes,
     )
 
 
+@router.post("/centres/bulk", response_model=BulkWriteResponse, status_code=status.HTTP_201_CREATED)
+async def create_centres_bulk(payload: BulkCentreCreate) -> BulkWriteResponse:
+    """Create many centres in one transaction; ids that already exist are skipped and reported."""
+    rows = []
+    seen: set[str] = set()
+    for position, item in enumerate(payload.items):
+        if item.id in seen:
+            raise HTTPException(status_code=400, detail=f"items[{position}]: centre '{item.id}' is repeated")
+        seen.add(item.id)
+        try:
+            specialities = _join_specialities(item.specialities)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"items[{position}]: {exc}") from exc
+        rows.append({**item.model_dump(), "specialities": specialities})
+
+    async with get_async_session() as session:
+        existing = set(await session.scalars(select(CentreModel.id).where(CentreModel.id.in_(seen))))
+        new_rows = [row for row in rows if row["id"] not in existing]
+        if new_rows:
+            await session.execute(insert(CentreModel), new_rows)
+        await _commit_bulk(session)
+
+    return BulkWriteResponse(created=len(new_rows), conflicts=sorted(existing))
+
+
 @router.put("/centres/{centre_id}", response_model=CentreResponse)
-def update_centre(centre_id: str, payload: CentreUpdate) -> CentreResponse:
+async def update_centre(centre_id: str, payload: CentreUpdate) -> CentreResponse:
     try:
         specialities = _join_specialities(payload.specialities)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    with get_session() as session:
-        centre = session.get(CentreModel, centre_id)
+    async with get_async_session() as session:
+        centre = await session.get(CentreModel, centre_id)
         if not centre:
             raise HTTPException(status_code=404, detail=f"Centre '{centre_id}' not found")
 
@@ -118,31 +488,71 @@ def update_centre(centre_id: str, payload: CentreUpdate) -> CentreResponse:
         centre.specialities = specialities
         centre.capacity_available = payload.capacity_available
         centre.estimated_wait_minutes = payload.estimated_wait_minutes
-        session.commit()
+        await _commit(session)
 
         return CentreResponse(
             id=centre.id,
             name=centre.name,
             level=centre.level,
-            specialities=_split_specialities(centre.specialities),
+            specialities=split_specialities(centre.specialities),
             capacity_available=centre.capacity_available,
             estimated_wait_minutes=centre.estimated_wait_minutes,
         )
 
 
+@router.patch("/centres/{centre_id}/load", response_model=CentreLoadResponse)
+async def update_centre_load(centre_id: str, payload: CentreLoadUpdate) -> CentreLoadResponse:
+    changes = payload.model_dump(exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="capacity_available or estimated_wait_minutes is required")
+
+    # Core UPDATE of the two load columns: no row load, no topology bump.
+    centres = CentreModel.__table__
+    async with get_async_session() as session:
+        connection = await session.connection()
+        result = await connection.execute(
+            update(centres)
+            .where(centres.c.id == centre_id)
+            .values(**changes)
+            .returning(centres.c.capacity_available, centres.c.estimated_wait_minutes)
+        )
+        row = result.first()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Centre '{centre_id}' not found")
+        load_version = await session.run_sync(bump_load_version)
+        await _commit(session)
+
+    if _recommender is not None:
+        # The patch can wait on the graph write lock while a reload runs.
+        graph_service = _recommender.graph_service
+        await _offload(
+            lambda: graph_service.apply_load_patch(
+                centre_id,
+                capacity_available=row.capacity_available,
+                estimated_wait_minutes=row.estimated_wait_minutes,
+                load_version=load_version,
+            )
+        )
+
+    return CentreLoadResponse(
+        id=centre_id,
+        capacity_available=row.capacity_available,
+        estimated_wait_minutes=row.estimated_wait_minutes,
+        load_version=load_version,
+    )
+
+
 @router.delete("/centres/{centre_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_centre(centre_id: str) -> None:
-    with get_session() as session:
-        centre = session.get(CentreModel, centre_id)
+async def delete_centre(centre_id: str) -> None:
+    async with get_async_session() as session:
+        centre = await session.get(CentreModel, centre_id)
         if not centre:
             raise HTTPException(status_code=404, detail=f"Centre '{centre_id}' not found")
 
-        refs_count = len(
-            session.scalars(
-                select(ReferenceModel).where(
-                    or_(ReferenceModel.source_id == centre_id, ReferenceModel.dest_id == centre_id)
-                )
-            ).all()
+        refs_count = await session.scalar(
+            select(func.count())
+            .select_from(ReferenceModel)
+            .where(or_(ReferenceModel.source_id == centre_id, ReferenceModel.dest_id == centre_id))
         )
         if refs_count > 0:
             raise HTTPException(
@@ -150,73 +560,141 @@ def delete_centre(centre_id: str) -> None:
                 detail=f"Centre '{centre_id}' is referenced by {refs_count} links. Delete links first.",
             )
 
-        session.delete(centre)
-        session.commit()
+        await session.delete(centre)
+        await _commit(session)
 
 
 @router.get("/references", response_model=list[ReferenceResponse])
-def list_references() -> list[ReferenceResponse]:
-    with get_session() as session:
-        rows = session.scalars(select(ReferenceModel).order_by(ReferenceModel.id)).all()
-
-    return [
-        ReferenceResponse(
-            id=row.id,
-            source_id=row.source_id,
-            dest_id=row.dest_id,
-            travel_minutes=row.travel_minutes,
-        )
-        for row in rows
-    ]
+async def list_references(request: Request, source_id: str | None = None, dest_id: str | None = None) -> Response:
+    query = select_references(*_reference_filters(source_id, dest_id))
+    async with get_async_session() as session:
+        etag = await _table_etag(session, "references", REFERENCES_ETAG_COUNTERS)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        items = await session.run_sync(fetch_dicts, query)
+
+    return JSONResponse(items, headers={"ETag": etag})
+
+
+@router.get("/references/page", response_model=ReferencePage)
+async def list_references_page(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after_id: int | None = None,
+    source_id: str | None = None,
+    dest_id: str | None = None,
+) -> Response:
+    clauses = _reference_filters(source_id, dest_id)
+    if after_id is not None:
+        clauses.append(ReferenceModel.id > after_id)
+    async with get_async_session() as session:
+        etag = await _table_etag(session, "references", REFERENCES_ETAG_COUNTERS)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        items = await session.run_sync(fetch_dicts, select_references(*clauses).limit(limit + 1))
+
+    return _page_response(items, limit, etag)
+
+
+@router.get("/references/stream", response_class=StreamingResponse)
+async def stream_references(source_id: str | None = None, dest_id: str | None = None) -> StreamingResponse:
+    return _stream_ndjson(select_references(*_reference_filters(source_id, dest_id)))
 
 
 @router.post("/references", response_model=ReferenceResponse, status_code=status.HTTP_201_CREATED)
-def create_reference(payload: ReferenceCreate) -> ReferenceResponse:
+async def create_reference(payload: ReferenceCreate, response: Response) -> ReferenceResponse:
+    """Create the link, or update ``travel_minutes`` (200) if the pair already exists."""
     if payload.source_id == payload.dest_id:
         raise HTTPException(status_code=400, detail="source_id and dest_id must be different")
 
-    with get_session() as session:
-        src = session.get(CentreModel, payload.source_id)
-        dst = session.get(CentreModel, payload.dest_id)
-        if not src or not dst:
+    pair = (ReferenceModel.source_id == payload.source_id, ReferenceModel.dest_id == payload.dest_id)
+    async with get_async_session() as session:
+        if not await _centres_exist(session, payload.source_id, payload.dest_id):
             raise HTTPException(status_code=400, detail="source_id or dest_id does not exist")
 
-        ref = ReferenceModel(
-            source_id=payload.source_id,
-            dest_id=payload.dest_id,
-            travel_minutes=payload.travel_minutes,
-        )
-        session.add(ref)
-        session.commit()
-        session.refresh(ref)
-
-        return ReferenceResponse(
-            id=ref.id,
-            source_id=ref.source_id,
-            dest_id=ref.dest_id,
-            travel_minutes=ref.travel_minutes,
-        )
+        existed = await session.scalar(select(ReferenceModel.id).where(*pair)) is not None
+        await session.run_sync(upsert_references, [payload.model_dump()])
+        await _commit(session)
+        reference_id = await session.scalar(select(ReferenceModel.id).where(*pair))
+
+    if existed:
+        response.status_code = status.HTTP_200_OK
+    return ReferenceResponse(id=reference_id, **payload.model_dump())
+
+
+@router.post("/references/bulk", response_model=BulkWriteResponse, status_code=status.HTTP_201_CREATED)
+async def create_references_bulk(payload: BulkReferenceCreate) -> BulkWriteResponse:
+    """Create many links in one transaction, validating every endpoint id with a single query."""
+    pairs: set[tuple[str, str]] = set()
+    for position, item in enumerate(payload.items):
+        if item.source_id == item.dest_id:
+            raise HTTPException(status_code=400, detail=f"items[{position}]: source_id and dest_id must be different")
+        pair = (item.source_id, item.dest_id)
+        if pair in pairs:
+            raise HTTPException(status_code=400, detail=f"items[{position}]: link {pair[0]} -> {pair[1]} is repeated")
+        pairs.add(pair)
+
+    centre_ids = {centre_id for pair in pairs for centre_id in pair}
+    sources = {source_id for source_id, _ in pairs}
+    async with get_async_session() as session:
+        missing = centre_ids - set(await session.scalars(select(CentreModel.id).where(CentreModel.id.in_(centre_ids))))
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Unknown centre ids: {', '.join(sorted(missing))}")
+
+        existing = {
+            (source_id, dest_id)
+            for source_id, dest_id in await session.execute(
+                select(ReferenceModel.source_id, ReferenceModel.dest_id).where(ReferenceModel.source_id.in_(sources))
+            )
+        } & pairs
+        rows = [item.model_dump() for item in payload.items]
+        new_rows = [row for row in rows if (row["source_id"], row["dest_id"]) not in existing]
+        if new_rows:
+            await session.execute(insert(ReferenceModel), new_rows)
+        updated = 0
+        if payload.on_conflict == "update" and existing:
+            await session.run_sync(upsert_references, [row for row in rows if (row["source_id"], row["dest_id"]) in existing])
+            updated = len(existing)
+        await _commit_bulk(session)
+
+    return BulkWriteResponse(
+        created=len(new_rows),
+        updated=updated,
+        conflicts=[f"{source_id}->{dest_id}" for source_id, dest_id in sorted(existing)],
+    )
 
 
 @router.put("/references/{reference_id}", response_model=ReferenceResponse)
-def update_reference(reference_id: int, payload: ReferenceUpdate) -> ReferenceResponse:
+async def update_reference(reference_id: int, payload: ReferenceUpdate) -> ReferenceResponse:
     if payload.source_id == payload.dest_id:
         raise HTTPException(status_code=400, detail="source_id and dest_id must be different")
 
-    with get_session() as session:
-        ref = session.get(ReferenceModel, reference_id)
+    async with get_async_session() as session:
+        ref = await session.get(ReferenceModel, reference_id)
         if not ref:
             raise HTTPException(status_code=404, detail=f"Reference '{reference_id}' not found")
 
-        src = session.get(CentreModel, payload.source_id)
-        dst = session.get(CentreModel, payload.dest_id)
-        if not src or not dst:
+        if not await _centres_exist(session, payload.source_id, payload.dest_id):
             raise HTTPException(status_code=400, detail="source_id or dest_id does not exist")
+        duplicate = await session.scalar(
+            select(ReferenceModel.id).where(
+                ReferenceModel.source_id == payload.source_id,
+                ReferenceModel.dest_id == payload.dest_id,
+                ReferenceModel.id != reference_id,
+            )
+        )
+        if duplicate is not None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Link {payload.source_id} -> {payload.dest_id} already exists as reference '{duplicate}'",
+            )
 
         ref.source_id = payload.source_id
         ref.dest_id = payload.dest_id
         ref.travel_minutes = payload.travel_minutes
-        session.commit()
+        await _commit(session)
 
         return ReferenceResponse(
             id=ref.id,
@@ -227,68 +705,52 @@ def update_reference(reference_id: int, payload: ReferenceUpdate) -> ReferenceRe
 
 
 @router.delete("/references/{reference_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_reference(reference_id: int) -> None:
-    with get_session() as session:
-        ref = session.get(ReferenceModel, reference_id)
+async def delete_reference(reference_id: int) -> None:
+    async with get_async_session() as session:
+        ref = await session.get(ReferenceModel, reference_id)
         if not ref:
             raise HTTPException(status_code=404, detail=f"Reference '{reference_id}' not found")
 
-        session.delete(ref)
-        session.commit()
+        await session.delete(ref)
+        await _commit(session)
 
 
 @router.get("/indicators", response_model=list[IndicatorResponse])
-def list_indicators(country_code: str | None = None, indicator_code: str | None = None) -> list[IndicatorResponse]:
-    with get_session() as session:
-        query = select(CountryIndicatorModel)
-        if country_code:
-            query = query.where(CountryIndicatorModel.country_code == country_code.upper())
-        if indicator_code:
-            query = query.where(CountryIndicatorModel.indicator_code == indicator_code)
-        rows = session.scalars(
+async def list_indicators(
+    request: Request,
+    country_code: str | None = None,
+    indicator_code: str | None = None,
+) -> Response:
+    query = select(*INDICATOR_COLUMNS)
+    if country_code:
+        query = query.where(CountryIndicatorModel.country_code == country_code.upper())
+    if indicator_code:
+        query = query.where(CountryIndicatorModel.indicator_code == indicator_code)
+    async with get_async_session() as session:
+        etag = await _table_etag(session, "indicators", INDICATORS_ETAG_COUNTERS)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        items = await session.run_sync(
+            fetch_dicts,
             query.order_by(
                 CountryIndicatorModel.country_code,
                 CountryIndicatorModel.indicator_code,
                 CountryIndicatorModel.year,
-            )
-        ).all()
-
-    return [
-        IndicatorResponse(
-            country_code=row.country_code,
-            indicator_code=row.indicator_code,
-            indicator_name=row.indicator_name,
-            year=row.year,
-            value=row.value,
-            source_file=row.source_file,
+            ),
         )
-        for row in rows
-    ]
+
+    return JSONResponse(items, headers={"ETag": etag})
 
 
 @router.get("/indicators/latest", response_model=list[IndicatorResponse])
-def list_latest_indicators(country_code: str = "KEN") -> list[IndicatorResponse]:
-    country = country_code.upper()
-    with get_session() as session:
-        rows = session.scalars(
-            select(CountryIndicatorModel).where(CountryIndicatorModel.country_code == country)
-        ).all()
-
-    latest_by_indicator: dict[str, CountryIndicatorModel] = {}
-    for row in rows:
-        current = latest_by_indicator.get(row.indicator_code)
-        if current is None or row.year > current.year:
-            latest_by_indicator[row.indicator_code] = row
-
-    latest_rows = sorted(latest_by_indicator.values(), key=lambda x: x.indicator_code)
-    return [
-        IndicatorResponse(
-            country_code=row.country_code,
-            indicator_code=row.indicator_code,
-            indicator_name=row.indicator_name,
-            year=row.year,
-            value=row.value,
-            source_file=row.source_file,
-        )
-        for row in latest_rows
-    ]
+async def list_latest_indicators(request: Request, country_code: str = "KEN") -> Response:
+    async with get_async_session() as session:
+        etag = await _table_etag(session, "indicators", INDICATORS_ETAG_COUNTERS)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        rows = await session.run_sync(get_latest_indicators, country_code.upper())
+        items = [row._asdict() for row in rows]
+
+    return JSONResponse(items, headers={"ETag": etag})
@@ -10,6 +10,121 @@ def get_database_url() -> str:
     return f"sqlite:///{default_db.as_posix()}"
 
 
+# Async drivers substituted for plain URLs; URLs naming a driver are used as-is.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def get_async_database_url() -> str:
+    """DATABASE_URL with an async driver, unless ASYNC_DATABASE_URL overrides it."""
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override
+    db_url = get_database_url()
+    scheme, sep, rest = db_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def get_recommender_workers() -> int:
+    """Threads in the executor that runs CPU-bound recommendation work off the event loop."""
+    return int(os.getenv("RECOMMENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+SQLITE_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def get_sqlite_pragmas() -> dict[str, str]:
+    """PRAGMAs applied to every SQLite connection; an empty env value keeps SQLite's default.
+
+    WAL lets readers (API, Streamlit) proceed while a simulator writes, and
+    synchronous=NORMAL is durable in WAL mode except across power loss.
+    """
+    settings = {
+        "journal_mode": (os.getenv("SQLITE_JOURNAL_MODE", "WAL"), SQLITE_JOURNAL_MODES),
+        "synchronous": (os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"), SQLITE_SYNCHRONOUS_MODES),
+        "temp_store": (os.getenv("SQLITE_TEMP_STORE", "MEMORY"), SQLITE_TEMP_STORES),
+        # Bytes of the file mapped into memory (256 MiB).
+        "mmap_size": (os.getenv("SQLITE_MMAP_SIZE", "268435456"), None),
+        # Negative values are KiB (64 MiB), positive values are pages.
+        "cache_size": (os.getenv("SQLITE_CACHE_SIZE", "-65536"), None),
+        "busy_timeout": (os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"), None),
+    }
+    pragmas: dict[str, str] = {}
+    for name, (raw, allowed) in settings.items():
+        value = raw.strip().upper()
+        if not value:
+            continue
+        if allowed is None:
+            value = str(int(value))
+        elif value not in allowed:
+            raise ValueError(f"Unsupported SQLite {name} {raw!r}; expected one of {sorted(allowed)}")
+        pragmas[name] = value
+    return pragmas
+
+
+def get_distance_matrix_path() -> Path:
+    """Base path for the cached all-pairs travel matrix, next to the SQLite file."""
+    override = os.getenv("DISTANCE_MATRIX_DIR")
+    db_url = get_database_url()
+    if db_url.startswith("sqlite:///") and ":memory:" not in db_url:
+        db_path = Path(db_url.removeprefix("sqlite:///"))
+    else:
+        db_path = Path(__file__).resolve().parents[2] / "carepath.db"
+    directory = Path(override) if override else db_path.resolve().parent
+    return directory / f"{db_path.stem}.distances"
+
+
+def get_graph_snapshot_dir() -> Path | None:
+    """Directory of the memory-mapped topology files shared by API workers; unset keeps a private graph per process."""
+    override = os.getenv("GRAPH_SNAPSHOT_DIR", "").strip()
+    return Path(override) if override else None
+
+
+def get_distance_matrix_max_nodes() -> int:
+    return int(os.getenv("DISTANCE_MATRIX_MAX_NODES", "4000"))
+
+
+def get_routing_mode() -> str:
+    """``dijkstra`` (default) or ``hierarchical`` for on-demand routing without a distance matrix."""
+    mode = os.getenv("ROUTING_MODE", "dijkstra").strip().lower()
+    if mode not in {"dijkstra", "hierarchical"}:
+        raise ValueError(f"ROUTING_MODE must be 'dijkstra' or 'hierarchical', got {mode!r}")
+    return mode
+
+
+def get_route_cache_size() -> int:
+    return int(os.getenv("ROUTE_CACHE_SIZE", "1024"))
+
+
+def get_events_poll_seconds() -> float:
+    """How often /events checks the change counters for writes made outside the API."""
+    return float(os.getenv("EVENTS_POLL_SECONDS", "1.0"))
+
+
+EPISODE_OVERFLOW_POLICIES = {"drop_newest", "drop_oldest", "block"}
+
+
+def get_episode_queue_size() -> int:
+    """Recommendations buffered for the episodes table; 0 disables the episode log."""
+    return int(os.getenv("EPISODE_QUEUE_SIZE", "10000"))
+
+
+def get_episode_overflow_policy() -> str:
+    policy = os.getenv("EPISODE_QUEUE_OVERFLOW", "drop_newest").strip().lower()
+    if policy not in EPISODE_OVERFLOW_POLICIES:
+        raise ValueError(f"EPISODE_QUEUE_OVERFLOW must be one of {sorted(EPISODE_OVERFLOW_POLICIES)}, got {policy!r}")
+    return policy
+
+
+def get_episode_batch_size() -> int:
+    return int(os.getenv("EPISODE_BATCH_SIZE", "500"))
+
+
+def get_episode_flush_seconds() -> float:
+    return float(os.getenv("EPISODE_FLUSH_SECONDS", "1.0"))
+
+
 def get_healthsites_api_key() -> str:
     key = os.getenv("HEALTHSITES_API_KEY", "").strip()
     if not key:
@@ -0,0 +1,259 @@
+"""In-process metrics registry rendered in the Prometheus text format.
+
+Metrics are module-level singletons registered in REGISTRY; ``GET /metrics``
+serves ``REGISTRY.render()``. Values live in this process only, so each
+uvicorn worker reports its own series.
+"""
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Prometheus client defaults, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Finer buckets for in-process steps that usually take well under a millisecond.
+STEP_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Cumulative buckets plus ``_sum`` and ``_count``, per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket (non-cumulative) plus the +Inf overflow, then the sum.
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[position] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels((*self.labelnames, "le"), (*key, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing every HTTP request into HTTP_REQUEST_SECONDS.
+
+    Requests are labelled by route template (``/centres/{centre_id}``), not the
+    raw path, so series stay bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, method=scope["method"], route=route, status=str(status)
+            )
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "carepath_http_request_duration_seconds",
+        "Time from request receipt to the end of the response body.",
+        ("method", "route", "status"),
+    )
+)
+GRAPH_RELOAD_SECONDS = REGISTRY.register(
+    Histogram(
+        "carepath_graph_reload_duration_seconds",
+        "GraphService rebuilds, by layer (topology or load).",
+        ("layer",),
+    )
+)
+GRAPH_NODES = REGISTRY.register(Gauge("carepath_graph_nodes", "Centres in the current graph snapshot."))
+GRAPH_EDGES = REGISTRY.register(Gauge("carepath_graph_edges", "Referral links in the current graph snapshot."))
+RECOMMEND_CANDIDATES = REGISTRY.register(
+    Histogram(
+        "carepath_recommend_candidates",
+        "Destinations with the needed speciality and free capacity, per routed request.",
+        buckets=COUNT_BUCKETS,
+    )
+)
+RECOMMEND_SEARCH_SECONDS = REGISTRY.register(
+    Histogram(
+        "carepath_recommend_search_duration_seconds",
+        "Shortest travel time lookup per search, by method (matrix, hierarchy or dijkstra).",
+        ("method",),
+        buckets=STEP_BUCKETS,
+    )
+)
+RECOMMEND_SCORING_SECONDS = REGISTRY.register(
+    Histogram(
+        "carepath_recommend_scoring_duration_seconds",
+        "Scoring the reachable candidates and building the response, per request.",
+        buckets=STEP_BUCKETS,
+    )
+)
+DB_TRANSACTION_SECONDS = REGISTRY.register(
+    Histogram(
+        "carepath_db_transaction_duration_seconds",
+        "Session transactions from first statement to commit or rollback (read-only sessions roll back on close).",
+        ("outcome",),
+    )
+)
+DB_COMMIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "carepath_db_commit_duration_seconds",
+        "Session.commit(), including the final flush.",
+        buckets=STEP_BUCKETS,
+    )
+)
+EPISODES_WRITTEN = REGISTRY.register(
+    Counter("carepath_episodes_written_total", "Recommendations persisted to the episodes table.")
+)
+EPISODES_DROPPED = REGISTRY.register(
+    Counter(
+        "carepath_episodes_dropped_total",
+        "Recommendations not persisted, by reason (overflow or write_error).",
+        ("reason",),
+    )
+)
@@ -1,7 +1,37 @@
-from sqlalchemy import ForeignKey, Integer, String, Text, UniqueConstraint, create_engine, text
-from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
-
-from app.core.config import get_database_url
+import secrets
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    Select,
+    UniqueConstraint,
+    create_engine,
+    delete,
+    event,
+    func,
+    inspect,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import DeclarativeBase, Mapped, ORMExecuteState, Session, mapped_column, sessionmaker
+
+from app.core.config import get_async_database_url, get_database_url, get_sqlite_pragmas
+from app.core.metrics import DB_COMMIT_SECONDS, DB_TRANSACTION_SECONDS
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 DATABASE_URL = get_database_url()
 
@@ -33,6 +63,11 @@ class CentreModel(Base):
 
 class ReferenceModel(Base):
     __tablename__ = "references"
+    # The unique pair index also serves lookups by source_id (its leading column).
+    __table_args__ = (
+        Index("uq_references_pair", "source_id", "dest_id", unique=True),
+        Index("ix_references_dest_id", "dest_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     source_id: Mapped[str] = mapped_column(ForeignKey("centres.id"), nullable=False)
@@ -49,13 +84,27 @@ class PatientModel(Base):
 
 
 class EpisodeModel(Base):
+    """One served recommendation: the audit trail and offline RL data.
+
+    ``patient_id`` is the id sent with the request; API patients are not
+    registered in ``patients``, so it is not a foreign key.
+    """
+
     __tablename__ = "episodes"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    patient_id: Mapped[str] = mapped_column(ForeignKey("patients.id"), nullable=False)
+    patient_id: Mapped[str] = mapped_column(String, nullable=False)
     source_id: Mapped[str] = mapped_column(ForeignKey("centres.id"), nullable=False)
     recommended_dest_id: Mapped[str] = mapped_column(ForeignKey("centres.id"), nullable=False)
     reward: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    needed_speciality: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    severity: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    score: Mapped[float | None] = mapped_column(nullable=True)
+    score_breakdown_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    topology_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    load_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    latency_ms: Mapped[float | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
 
 
 class CountryIndicatorModel(Base):
@@ -79,23 +128,78 @@ class CountryIndicatorModel(Base):
     metadata_json: Mapped[str | None] = mapped_column(Text, nullable=True)
 
 
+class CountryIndicatorLatestModel(Base):
+    """Latest year of each (country, indicator), rebuilt by refresh_latest_indicators()."""
+
+    __tablename__ = "country_indicators_latest"
+
+    country_code: Mapped[str] = mapped_column(String(8), primary_key=True)
+    indicator_code: Mapped[str] = mapped_column(String(64), primary_key=True)
+    indicator_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    year: Mapped[int] = mapped_column(Integer, nullable=False)
+    value: Mapped[float] = mapped_column(nullable=False)
+    source_file: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+
+class ChangeCounterModel(Base):
+    __tablename__ = "change_counters"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+TOPOLOGY_COUNTER = "topology"
+LOAD_COUNTER = "load"
+INDICATORS_COUNTER = "indicators"
+# Indicators version that country_indicators_latest was last rebuilt from.
+INDICATORS_LATEST_COUNTER = "indicators_latest"
+# Not a counter: a random id drawn once per database (see get_database_id).
+DATABASE_ID_COUNTER = "database_id"
+# Centre columns that describe current load rather than network structure.
+LOAD_COLUMNS = frozenset({"capacity_available", "estimated_wait_minutes"})
+_NETWORK_MODELS = (CentreModel, ReferenceModel)
+_INDICATOR_MODELS = (CountryIndicatorModel,)
+
+
 engine_kwargs: dict = {"future": True}
 if DATABASE_URL.startswith("sqlite"):
     engine_kwargs["connect_args"] = {"check_same_thread": False}
 
 engine = create_engine(DATABASE_URL, **engine_kwargs)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+# The API, Streamlit and the simulators share one file: tune every new connection.
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _configure_sqlite_connection)
+
+
+class CarePathSession(Session):
+    """Session class behind both the sync and the async session factories.
+
+    The change-counter listeners below are attached to this class, so writes
+    bump the network and indicator versions whichever factory made the session.
+    """
+
+
+SessionLocal = sessionmaker(bind=engine, class_=CarePathSession, autoflush=False, autocommit=False, future=True)
+_AsyncSessionLocal: "async_sessionmaker[AsyncSession] | None" = None
 
 
 def init_db() -> None:
     Base.metadata.create_all(engine)
-    _ensure_sqlite_schema_updates()
-
+    _apply_sqlite_migrations()
 
-def _ensure_sqlite_schema_updates() -> None:
-    if not DATABASE_URL.startswith("sqlite"):
-        return
 
+def _migration_centre_columns(conn: Connection) -> None:
     required_columns = {
         "lat": "REAL",
         "lon": "REAL",
@@ -105,27 +209,355 @@ def _ensure_sqlite_schema_updates() -> None:
         "capacity_max": "INTEGER NOT NULL DEFAULT 10",
         "catchment_population": "INTEGER DEFAULT 0",
     }
+    rows = conn.execute(text("PRAGMA table_info(centres)")).fetchall()
+    existing = {row[1] for row in rows}
 
-    with engine.begin() as conn:
-        rows = conn.execute(text("PRAGMA table_info(centres)")).fetchall()
-        existing = {row[1] for row in rows}
-
-        for col, sql_type in required_columns.items():
-            if col not in existing:
-                conn.execute(text(f"ALTER TABLE centres ADD COLUMN {col} {sql_type}"))
-
-        conn.execute(
-            text(
-                "CREATE UNIQUE INDEX IF NOT EXISTS idx_centres_osm_identity "
-                "ON centres(osm_type, osm_id)"
-            )
+    for col, sql_type in required_columns.items():
+        if col not in existing:
+            conn.execute(text(f"ALTER TABLE centres ADD COLUMN {col} {sql_type}"))
+
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_centres_osm_identity "
+            "ON centres(osm_type, osm_id)"
+        )
+    )
+
+
+def _migration_reference_indexes(conn: Connection) -> None:
+    # Keep the newest row of each duplicated pair, the one the graph already routes on.
+    removed = conn.execute(
+        text(
+            'DELETE FROM "references" WHERE id NOT IN '
+            '(SELECT MAX(id) FROM "references" GROUP BY source_id, dest_id)'
+        )
+    ).rowcount
+    if removed:
+        _bump_counter(conn, TOPOLOGY_COUNTER)
+    conn.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS uq_references_pair ON "references"(source_id, dest_id)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_references_dest_id ON "references"(dest_id)'))
+
+
+def _migration_episode_log(conn: Connection) -> None:
+    # SQLite cannot drop the old patients.id foreign key in place: rebuild the
+    # table from the model and copy the original columns across.
+    conn.execute(text("ALTER TABLE episodes RENAME TO episodes_old"))
+    # Present when create_all() already built the new table; the name must be free.
+    conn.execute(text("DROP INDEX IF EXISTS ix_episodes_created_at"))
+    EpisodeModel.__table__.create(conn)
+    conn.execute(
+        text(
+            "INSERT INTO episodes (id, patient_id, source_id, recommended_dest_id, reward) "
+            "SELECT id, patient_id, source_id, recommended_dest_id, reward FROM episodes_old"
         )
+    )
+    conn.execute(text("DROP TABLE episodes_old"))
+
+
+# Applied in order; PRAGMA user_version records how many already ran. Steps must
+# also be safe on a database that create_all() just built at the latest schema.
+SQLITE_MIGRATIONS: tuple[Callable[[Connection], None], ...] = (
+    _migration_centre_columns,
+    _migration_reference_indexes,
+    _migration_episode_log,
+)
+
+
+def _apply_sqlite_migrations() -> None:
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+        applied = int(conn.execute(text("PRAGMA user_version")).scalar_one())
+        for step, migration in enumerate(SQLITE_MIGRATIONS[applied:], start=applied + 1):
+            migration(conn)
+            conn.execute(text(f"PRAGMA user_version = {step}"))
 
 
 def get_session() -> Session:
     return SessionLocal()
 
 
+def get_async_session() -> "AsyncSession":
+    """Async session on a second engine over the same database (aiosqlite for SQLite).
+
+    The engine is created on first use, so scripts that only need the sync
+    session do not require the async driver.
+    """
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(get_async_database_url())
+        if DATABASE_URL.startswith("sqlite"):
+            event.listen(async_engine.sync_engine, "connect", _configure_sqlite_connection)
+        # Handlers build responses after commit without lazy loads, which async cannot do.
+        _AsyncSessionLocal = async_sessionmaker(
+            async_engine,
+            sync_session_class=CarePathSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _AsyncSessionLocal()
+
+
+def _create_missing_counters(conn: Connection, error: OperationalError) -> None:
+    # Databases created before the change counters (and never passed through
+    # init_db, e.g. by the training scripts) get the table on first use.
+    if inspect(conn).has_table(ChangeCounterModel.__tablename__):
+        raise error
+    ChangeCounterModel.__table__.create(conn, checkfirst=True)
+
+
+def _bump_counter(conn: Connection, name: str) -> int:
+    table = ChangeCounterModel.__table__
+    statement = update(table).where(table.c.name == name).values(version=table.c.version + 1)
+    try:
+        result = conn.execute(statement)
+    except OperationalError as error:
+        _create_missing_counters(conn, error)
+        result = conn.execute(statement)
+    if result.rowcount == 0:
+        conn.execute(insert(table).values(name=name, version=1))
+    return int(conn.execute(select(table.c.version).where(table.c.name == name)).scalar_one())
+
+
+def get_change_versions(session: Session, names: tuple[str, ...]) -> tuple[int, ...]:
+    """Return the given change counters in order, 0 for counters never bumped."""
+    query = select(ChangeCounterModel.name, ChangeCounterModel.version).where(ChangeCounterModel.name.in_(names))
+    try:
+        rows = dict(session.execute(query).all())
+    except OperationalError as error:
+        _create_missing_counters(session.connection(), error)
+        rows = {}
+    return tuple(int(rows.get(name, 0)) for name in names)
+
+
+def get_network_versions(session: Session) -> tuple[int, int]:
+    """Return the (topology, load) counters of the referral network."""
+    topology_version, load_version = get_change_versions(session, (TOPOLOGY_COUNTER, LOAD_COUNTER))
+    return topology_version, load_version
+
+
+def get_database_id(session: Session) -> int:
+    """Random id of this database, drawn and stored on first use.
+
+    Counters start over when a database is recreated, so anything cached
+    outside it by version (the shared topology files) also records this id.
+    """
+    (database_id,) = get_change_versions(session, (DATABASE_ID_COUNTER,))
+    if database_id:
+        return database_id
+    table = ChangeCounterModel.__table__
+    # OR IGNORE: another worker may draw one concurrently; every worker keeps the first.
+    session.execute(
+        insert(table)
+        .prefix_with("OR IGNORE", dialect="sqlite")
+        .values(name=DATABASE_ID_COUNTER, version=secrets.randbelow(2**62) + 1)
+    )
+    session.commit()
+    (database_id,) = get_change_versions(session, (DATABASE_ID_COUNTER,))
+    return database_id
+
+
+def bump_topology_version(session: Session) -> int:
+    return _bump_counter(session.connection(), TOPOLOGY_COUNTER)
+
+
+def bump_load_version(session: Session) -> int:
+    return _bump_counter(session.connection(), LOAD_COUNTER)
+
+
+def bump_indicators_version(session: Session) -> int:
+    return _bump_counter(session.connection(), INDICATORS_COUNTER)
+
+
+def upsert_references(session: Session, rows: Iterable[dict]) -> None:
+    """Insert links, overwriting ``travel_minutes`` when the (source, dest) pair already exists."""
+    values = list(rows)
+    if not values:
+        return
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(ReferenceModel)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ReferenceModel.source_id, ReferenceModel.dest_id],
+            set_={"travel_minutes": stmt.excluded.travel_minutes},
+        ),
+        values,
+    )
+
+
+def _latest_indicators_select(country_code: str | None = None) -> Select:
+    indicators = CountryIndicatorModel
+    latest_year = select(
+        indicators.country_code,
+        indicators.indicator_code,
+        func.max(indicators.year).label("year"),
+    ).group_by(indicators.country_code, indicators.indicator_code)
+    if country_code is not None:
+        latest_year = latest_year.where(indicators.country_code == country_code)
+    latest_year = latest_year.subquery()
+    return select(
+        indicators.country_code,
+        indicators.indicator_code,
+        indicators.indicator_name,
+        indicators.year,
+        indicators.value,
+        indicators.source_file,
+    ).join(
+        latest_year,
+        (indicators.country_code == latest_year.c.country_code)
+        & (indicators.indicator_code == latest_year.c.indicator_code)
+        & (indicators.year == latest_year.c.year),
+    )
+
+
+def get_latest_indicators(session: Session, country_code: str) -> list[Row]:
+    """Latest year of every indicator for ``country_code``, ordered by indicator code.
+
+    Reads country_indicators_latest when it was rebuilt from the current
+    indicators version, otherwise reduces country_indicators in SQL.
+    """
+    indicators_version, latest_version = get_change_versions(session, (INDICATORS_COUNTER, INDICATORS_LATEST_COUNTER))
+    if latest_version and latest_version == indicators_version:
+        latest = CountryIndicatorLatestModel
+        query = select(
+            latest.country_code,
+            latest.indicator_code,
+            latest.indicator_name,
+            latest.year,
+            latest.value,
+            latest.source_file,
+        ).where(latest.country_code == country_code)
+        return list(session.execute(query.order_by(latest.indicator_code)).all())
+
+    query = _latest_indicators_select(country_code)
+    return list(session.execute(query.order_by(CountryIndicatorModel.indicator_code)).all())
+
+
+def refresh_latest_indicators(session: Session) -> int:
+    """Rebuild country_indicators_latest from country_indicators; returns the row count.
+
+    Call after committing indicator writes. Until it runs again, readers fall
+    back to the GROUP BY query because the recorded version no longer matches.
+    """
+    conn = session.connection()
+    (indicators_version,) = get_change_versions(session, (INDICATORS_COUNTER,))
+    latest = CountryIndicatorLatestModel.__table__
+    conn.execute(delete(latest))
+    source = _latest_indicators_select()
+    inserted = conn.execute(insert(latest).from_select([column.name for column in source.selected_columns], source))
+    counters = ChangeCounterModel.__table__
+    stored = conn.execute(
+        update(counters).where(counters.c.name == INDICATORS_LATEST_COUNTER).values(version=indicators_version)
+    )
+    if stored.rowcount == 0:
+        conn.execute(insert(counters).values(name=INDICATORS_LATEST_COUNTER, version=indicators_version))
+    return inserted.rowcount
+
+
+def _is_load_only_change(obj: object) -> bool:
+    if not isinstance(obj, CentreModel):
+        return False
+    changed = {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+    return changed <= LOAD_COLUMNS
+
+
+# Every session write touching centres or references bumps a network counter
+# inside the same transaction, so API handlers, import scripts and simulators
+# all invalidate cached graphs without having to remember to do it. Edits that
+# only touch LOAD_COLUMNS bump the cheaper load counter; anything else is topology.
+@event.listens_for(CarePathSession, "before_flush")
+def _track_network_changes(session: Session, flush_context, instances) -> None:
+    if any(isinstance(obj, _NETWORK_MODELS) for obj in (*session.new, *session.deleted)):
+        bump_topology_version(session)
+        return
+
+    dirty = [obj for obj in session.dirty if isinstance(obj, _NETWORK_MODELS) and session.is_modified(obj)]
+    if not dirty:
+        return
+    if all(_is_load_only_change(obj) for obj in dirty):
+        bump_load_version(session)
+    else:
+        bump_topology_version(session)
+
+
+# Indicator writes bump their own counter, which versions the indicator endpoints.
+@event.listens_for(CarePathSession, "before_flush")
+def _track_indicator_changes(session: Session, flush_context, instances) -> None:
+    changed = (*session.new, *session.deleted, *(obj for obj in session.dirty if session.is_modified(obj)))
+    if any(isinstance(obj, _INDICATOR_MODELS) for obj in changed):
+        bump_indicators_version(session)
+
+
+def _is_load_only_update(state: ORMExecuteState) -> bool:
+    """True for a centres UPDATE that only sets LOAD_COLUMNS, via values() or bulk-by-primary-key rows."""
+    mapper = state.bind_mapper
+    if not (state.is_update and issubclass(mapper.class_, CentreModel)):
+        return False
+    # SQLAlchemy has no public accessor for an UPDATE's SET clause (compile().params
+    # mixes in WHERE binds and renames expression binds), so read Update._values.
+    # requirements.txt pins SQLAlchemy; test_update_values_contract fails if it goes away.
+    changed = {getattr(key, "key", key) for key in state.statement._values or ()}
+    parameters = state.parameters
+    rows = parameters if isinstance(parameters, list) else [parameters] if parameters else []
+    primary_keys = {column.key for column in mapper.primary_key}
+    for row in rows:
+        # Bulk updates by primary key locate rows with the key; it is not written.
+        changed.update(key for key in row if key not in primary_keys)
+    return bool(changed) and changed <= LOAD_COLUMNS
+
+
+@event.listens_for(CarePathSession, "do_orm_execute")
+def _track_bulk_writes(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    if mapper is None:
+        return
+    if _is_load_only_update(state):
+        bump_load_version(state.session)
+    elif issubclass(mapper.class_, _NETWORK_MODELS):
+        bump_topology_version(state.session)
+    elif issubclass(mapper.class_, _INDICATOR_MODELS):
+        bump_indicators_version(state.session)
+
+
+# Transaction and commit timings for /metrics. Kept in session.info so async
+# sessions (whose sync_session_class is CarePathSession) are timed the same way.
+@event.listens_for(CarePathSession, "after_begin")
+def _time_transaction_begin(session: Session, transaction, connection) -> None:
+    session.info.setdefault("metrics_began", time.perf_counter())
+
+
+@event.listens_for(CarePathSession, "before_commit")
+def _time_commit_begin(session: Session) -> None:
+    session.info["metrics_commit_began"] = time.perf_counter()
+
+
+@event.listens_for(CarePathSession, "after_commit")
+def _time_commit_end(session: Session) -> None:
+    began = session.info.pop("metrics_commit_began", None)
+    if began is not None:
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - began)
+    session.info["metrics_outcome"] = "commit"
+
+
+@event.listens_for(CarePathSession, "after_transaction_end")
+def _time_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is not None:
+        return
+    began = session.info.pop("metrics_began", None)
+    outcome = session.info.pop("metrics_outcome", "rollback")
+    session.info.pop("metrics_commit_began", None)
+    if began is not None:
+        DB_TRANSACTION_SECONDS.observe(time.perf_counter() - began, outcome=outcome)
+
+
 if __name__ == "__main__":
     init_db()
     print("SQLite schema initialized: carepath.db")
@@ -0,0 +1,66 @@
+"""Column-projection reads for list endpoints and dashboards.
+
+These select only the columns a caller returns and turn each result tuple
+straight into a plain dict, so large lists never build ORM entities,
+load unused blobs such as ``raw_tags_json`` or go through pydantic.
+"""
+
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models import CentreModel, CountryIndicatorModel, ReferenceModel
+
+CENTRE_COLUMNS = (
+    CentreModel.id,
+    CentreModel.name,
+    CentreModel.level,
+    CentreModel.specialities,
+    CentreModel.capacity_available,
+    CentreModel.estimated_wait_minutes,
+)
+REFERENCE_COLUMNS = (
+    ReferenceModel.id,
+    ReferenceModel.source_id,
+    ReferenceModel.dest_id,
+    ReferenceModel.travel_minutes,
+)
+INDICATOR_COLUMNS = (
+    CountryIndicatorModel.country_code,
+    CountryIndicatorModel.indicator_code,
+    CountryIndicatorModel.indicator_name,
+    CountryIndicatorModel.year,
+    CountryIndicatorModel.value,
+    CountryIndicatorModel.source_file,
+)
+
+
+def split_specialities(specialities: str) -> list[str]:
+    return [item.strip() for item in specialities.split(",") if item.strip()]
+
+
+def select_centres(*clauses: ColumnElement[bool], columns: Sequence = CENTRE_COLUMNS) -> Select:
+    return select(*columns).where(*clauses).order_by(CentreModel.id)
+
+
+def select_references(*clauses: ColumnElement[bool], columns: Sequence = REFERENCE_COLUMNS) -> Select:
+    return select(*columns).where(*clauses).order_by(ReferenceModel.id)
+
+
+def rows_to_dicts(keys: Sequence[str], rows: Iterable[tuple]) -> list[dict]:
+    """Zip result tuples with ``keys``, splitting the comma-joined ``specialities`` column."""
+    if "specialities" not in keys:
+        return [dict(zip(keys, row)) for row in rows]
+    out = []
+    for row in rows:
+        item = dict(zip(keys, row))
+        item["specialities"] = split_specialities(item["specialities"])
+        out.append(item)
+    return out
+
+
+def fetch_dicts(session: Session, query: Select) -> list[dict]:
+    result = session.execute(query)
+    return rows_to_dicts(list(result.keys()), result)
@@ -1,17 +1,37 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.api.routes import router
+from app.api.routes import episode_log, preload, router
+from app.core.metrics import RequestMetricsMiddleware
 from app.db.models import init_db
 
 
-def create_app() -> FastAPI:
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     init_db()
+    # Serve /health right away; /ready flips once the graph preload finishes.
+    task = asyncio.create_task(preload())
+    yield
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    # Persist recommendations still waiting in the write-behind queue.
+    await asyncio.to_thread(episode_log.stop)
+
+
+def create_app() -> FastAPI:
     app = FastAPI(
         title="CarePath AI",
         description="MVP for patient referral path recommendation",
         version="0.1.0",
+        lifespan=lifespan,
     )
     app.include_router(router)
+    app.add_middleware(RequestMetricsMiddleware)
     return app
 
 
@@ -3,7 +3,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 import gymnasium as gym
-import networkx as nx
 import numpy as np
 from gymnasium import spaces
 
@@ -74,13 +73,13 @@ class ReferralEnv(gym.Env):
         self.graph_service.reload()
         candidates = self.graph_service.candidate_destinations(self.speciality)
         destinations: list[DestinationState] = []
+        travel_times, _ = self.graph_service.shortest_travel_times(self.source_id, candidates)
 
         for node_id in candidates:
             if node_id == self.source_id:
                 continue
-            try:
-                _, travel = self.graph_service.shortest_path(self.source_id, node_id)
-            except (nx.NetworkXNoPath, nx.NodeNotFound):
+            travel = travel_times.get(node_id)
+            if travel is None:
                 continue
 
             attrs = self.graph_service.node(node_id)
@@ -0,0 +1,121 @@
+import asyncio
+import contextlib
+import json
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+from app.services.graph_service import GraphSnapshot
+
+# An event is an (SSE event name, JSON payload) pair.
+Event = tuple[str, dict]
+
+
+def versions_event(snapshot: GraphSnapshot) -> Event:
+    return "versions", {"topology_version": snapshot.topology_version, "load_version": snapshot.load_version}
+
+
+def diff_snapshots(previous: GraphSnapshot, current: GraphSnapshot) -> Event | None:
+    """The event that brings a client holding ``previous`` up to ``current``.
+
+    Load-only changes become ``[id, capacity_available, estimated_wait_minutes]``
+    rows for the centres that moved. A topology change cannot be expressed as
+    deltas, so clients get the new versions and refetch ``/graph/snapshot``.
+    """
+    if (previous.topology_version, previous.load_version) == (current.topology_version, current.load_version):
+        return None
+    if previous.compact is not current.compact:
+        return versions_event(current)
+    old, new = previous.load, current.load
+    changed = np.flatnonzero(
+        (old.capacity_available != new.capacity_available) | (old.estimated_wait_minutes != new.estimated_wait_minutes)
+    )
+    ids = current.compact.ids
+    centres = [
+        [ids[idx], int(new.capacity_available[idx]), int(new.estimated_wait_minutes[idx])] for idx in changed.tolist()
+    ]
+    return "load", {
+        "topology_version": current.topology_version,
+        "load_version": current.load_version,
+        "centres": centres,
+    }
+
+
+def format_sse(event: Event) -> str:
+    name, data = event
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class ChangeFeed:
+    """Fan-out of network changes to ``/events`` subscribers.
+
+    One poller per process compares successive graph snapshots, so writes from
+    the simulators and scripts (which only move the DB change counters) are
+    published as well as API writes; API handlers call notify() to skip the
+    wait. The poller runs only while someone is subscribed. A subscriber that
+    falls ``queue_size`` events behind is reset to a single versions event.
+    """
+
+    def __init__(self, poll: Callable[[], Awaitable[GraphSnapshot]], *, interval: float, queue_size: int = 64) -> None:
+        self.poll = poll
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue[Event]] = set()
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._latest: GraphSnapshot | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self) -> asyncio.Queue[Event]:
+        """A queue that starts with the current versions, then receives every change after them."""
+        if self._task is None or self._task.done():
+            snapshot = await self.poll()
+            # Another subscriber may have started the poller while this one polled.
+            if self._task is None or self._task.done():
+                self._latest = snapshot
+                self._wake = asyncio.Event()
+                self._task = asyncio.get_running_loop().create_task(self._run())
+        queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=self.queue_size)
+        queue.put_nowait(versions_event(self._latest))
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[Event]) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def notify(self) -> None:
+        """Poll now instead of at the next interval, e.g. right after an API write."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def _publish(self, event: Event, snapshot: GraphSnapshot) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                # Too far behind for deltas to help: restart it from the current versions.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(versions_event(snapshot))
+            else:
+                queue.put_nowait(event)
+
+    async def _run(self) -> None:
+        wake = self._wake
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(wake.wait(), timeout=self.interval)
+            wake.clear()
+            try:
+                current = await self.poll()
+            except Exception:
+                # A locked or briefly unavailable database: try again next interval.
+                continue
+            event = diff_snapshots(self._latest, current)
+            self._latest = current
+            if event is not None:
+                self._publish(event, current)
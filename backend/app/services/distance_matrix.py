@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.core.config import get_distance_matrix_max_nodes, get_distance_matrix_path
+
+if TYPE_CHECKING:
+    from app.services.graph_service import CompactGraph
+
+NO_PREDECESSOR = -1
+
+
+@dataclass(frozen=True)
+class DistanceMatrix:
+    """All-pairs travel minutes and predecessors for one network topology.
+
+    ``travel[s, t]`` is ``inf`` when ``t`` cannot be reached from ``s``;
+    ``predecessors[s, t]`` is the node before ``t`` on the shortest path from ``s``.
+    """
+
+    topology_hash: str
+    travel: np.ndarray
+    predecessors: np.ndarray
+
+
+def topology_hash(compact: CompactGraph) -> str:
+    digest = hashlib.sha256()
+    digest.update("\n".join(compact.ids).encode("utf-8"))
+    for array in (compact.indptr, compact.indices, compact.travel_minutes):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _file_paths(base_path: Path) -> tuple[Path, Path, Path]:
+    return (
+        base_path.with_name(f"{base_path.name}.travel.npy"),
+        base_path.with_name(f"{base_path.name}.pred.npy"),
+        base_path.with_name(f"{base_path.name}.json"),
+    )
+
+
+def build_distance_matrix(compact: CompactGraph, base_path: Path | None = None) -> DistanceMatrix:
+    """Run one Dijkstra per node and persist the result as memory-mapped .npy files."""
+    max_nodes = get_distance_matrix_max_nodes()
+    if compact.node_count > max_nodes:
+        raise ValueError(
+            f"Network has {compact.node_count} centres; all-pairs matrix is limited to {max_nodes} "
+            "(DISTANCE_MATRIX_MAX_NODES). Routing falls back to on-demand search."
+        )
+    base_path = base_path or get_distance_matrix_path()
+    base_path.parent.mkdir(parents=True, exist_ok=True)
+    travel_path, pred_path, meta_path = _file_paths(base_path)
+    n = compact.node_count
+
+    # Fill the arrays in place on disk so country-scale builds never need two copies in RAM.
+    tmp_travel = travel_path.with_name(f"{travel_path.name}.tmp")
+    tmp_pred = pred_path.with_name(f"{pred_path.name}.tmp")
+    travel = np.lib.format.open_memmap(tmp_travel, mode="w+", dtype=np.float32, shape=(n, n))
+    predecessors = np.lib.format.open_memmap(tmp_pred, mode="w+", dtype=np.int32, shape=(n, n))
+    travel[:] = np.inf
+    predecessors[:] = NO_PREDECESSOR
+
+    all_nodes = range(n)
+    for source in all_nodes:
+        settled, preds = compact.dijkstra(source, all_nodes)
+        travel[source, list(settled)] = list(settled.values())
+        if preds:
+            predecessors[source, list(preds)] = list(preds.values())
+
+    travel.flush()
+    predecessors.flush()
+    del travel, predecessors
+    os.replace(tmp_travel, travel_path)
+    os.replace(tmp_pred, pred_path)
+
+    digest = topology_hash(compact)
+    meta_path.write_text(json.dumps({"topology_hash": digest, "nodes": n}), encoding="utf-8")
+    return DistanceMatrix(
+        topology_hash=digest,
+        travel=np.load(travel_path, mmap_mode="r"),
+        predecessors=np.load(pred_path, mmap_mode="r"),
+    )
+
+
+def load_distance_matrix(compact: CompactGraph, base_path: Path | None = None) -> DistanceMatrix | None:
+    """Map the cached matrix read-only if it was built for this exact topology."""
+    if compact.node_count == 0 or compact.node_count > get_distance_matrix_max_nodes():
+        return None
+
+    travel_path, pred_path, meta_path = _file_paths(base_path or get_distance_matrix_path())
+    if not (meta_path.exists() and travel_path.exists() and pred_path.exists()):
+        return None
+
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    digest = topology_hash(compact)
+    if meta.get("topology_hash") != digest or meta.get("nodes") != compact.node_count:
+        return None
+
+    travel = np.load(travel_path, mmap_mode="r")
+    predecessors = np.load(pred_path, mmap_mode="r")
+    expected_shape = (compact.node_count, compact.node_count)
+    if travel.shape != expected_shape or predecessors.shape != expected_shape:
+        return None
+    return DistanceMatrix(topology_hash=digest, travel=travel, predecessors=predecessors)
@@ -0,0 +1,157 @@
+import queue
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from app.core.config import (
+    get_episode_batch_size,
+    get_episode_flush_seconds,
+    get_episode_overflow_policy,
+    get_episode_queue_size,
+)
+from app.core.metrics import EPISODES_DROPPED, EPISODES_WRITTEN
+from app.db.models import EpisodeModel, get_session
+from app.services.graph_service import GraphSnapshot
+from app.services.schemas import RecommandationRequest, RecommandationResponse
+
+# Longest a recommendation waits for queue space under the "block" policy before its record is dropped.
+BLOCK_TIMEOUT_SECONDS = 1.0
+
+
+class EpisodeLog:
+    """Write-behind log of served recommendations into the episodes table.
+
+    record() only enqueues a row, so callers never wait on the database; a
+    daemon thread started on first use drains the bounded queue in batched
+    transactions. When the queue is full, ``overflow`` decides what gives:
+    ``drop_newest`` discards the new record, ``drop_oldest`` evicts the oldest
+    queued one and ``block`` waits up to BLOCK_TIMEOUT_SECONDS for space.
+    Rows still queued when the process dies without stop() are lost.
+    """
+
+    def __init__(self, max_size: int, *, overflow: str, batch_size: int, flush_seconds: float) -> None:
+        self.enabled = max_size > 0
+        self.overflow = overflow
+        self.batch_size = max(batch_size, 1)
+        self.flush_seconds = flush_seconds
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=max(max_size, 1))
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    @classmethod
+    def from_env(cls) -> "EpisodeLog":
+        return cls(
+            get_episode_queue_size(),
+            overflow=get_episode_overflow_policy(),
+            batch_size=get_episode_batch_size(),
+            flush_seconds=get_episode_flush_seconds(),
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def record(
+        self,
+        payload: RecommandationRequest,
+        response: RecommandationResponse,
+        snapshot: GraphSnapshot,
+        latency_seconds: float,
+    ) -> bool:
+        """Queue one recommendation; False if it was dropped (log disabled or queue full)."""
+        if not self.enabled:
+            return False
+        row = {
+            "patient_id": payload.patient_id,
+            "source_id": payload.current_centre_id,
+            "recommended_dest_id": response.destination_centre_id,
+            "needed_speciality": payload.needed_speciality,
+            "severity": payload.severity,
+            "score": response.score,
+            "score_breakdown_json": response.score_breakdown.model_dump_json(),
+            "topology_version": snapshot.topology_version,
+            "load_version": snapshot.load_version,
+            "latency_ms": latency_seconds * 1000.0,
+            # Naive UTC, like the SQLite DateTime column stores it.
+            "created_at": datetime.now(timezone.utc).replace(tzinfo=None),
+        }
+        self._ensure_started()
+        return self._put(row)
+
+    def _put(self, row: dict) -> bool:
+        if self.overflow == "drop_oldest":
+            while True:
+                try:
+                    self._queue.put_nowait(row)
+                    return True
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        EPISODES_DROPPED.inc(reason="overflow")
+                    except queue.Empty:
+                        pass
+        try:
+            if self.overflow == "block":
+                self._queue.put(row, timeout=BLOCK_TIMEOUT_SECONDS)
+            else:
+                self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            EPISODES_DROPPED.inc(reason="overflow")
+            return False
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="episode-log", daemon=True)
+                self._thread.start()
+
+    def _drain(self, first: dict | None = None) -> list[dict]:
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows: list[dict]) -> None:
+        try:
+            with get_session() as session:
+                session.execute(insert(EpisodeModel), rows)
+                session.commit()
+        except Exception:
+            # The log must never take the API down; losses show up in /metrics.
+            EPISODES_DROPPED.inc(len(rows), reason="write_error")
+            return
+        EPISODES_WRITTEN.inc(len(rows))
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+
+    def flush(self) -> int:
+        """Write everything queued so far from the calling thread; returns the rows taken."""
+        taken = 0
+        while batch := self._drain():
+            self._write(batch)
+            taken += len(batch)
+        return taken
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the writer thread and persist whatever is still queued."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join(timeout)
+        self.flush()
@@ -1,64 +1,702 @@
+import heapq
+import math
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from functools import cached_property
+
 import networkx as nx
+import numpy as np
 from sqlalchemy import select
 
-from app.db.models import CentreModel, ReferenceModel, get_session
+from app.db.models import CentreModel, ReferenceModel, get_database_id, get_network_versions, get_session
+from app.core.config import get_graph_snapshot_dir, get_routing_mode
+from app.core.metrics import GRAPH_EDGES, GRAPH_NODES, GRAPH_RELOAD_SECONDS
+from app.services.distance_matrix import DistanceMatrix, load_distance_matrix
+from app.services.hierarchy import ContractionHierarchy, HierarchyPredecessors, build_hierarchy
+from app.services.packed import IdIndex, StringTable, plain_view
+from app.services.shared_snapshot import SharedTopologyStore
+from app.services.snapshot_codec import encode_topology, strings
+
+KNOWN_LEVELS = ("primary", "secondary", "tertiary")
+MAX_SPECIALITIES = 64
+
+# A sparse map from a single search, one row of the cached predecessor matrix,
+# or a lazy lookup over a hierarchy query's distances.
+Predecessors = dict[int, int] | np.ndarray | HierarchyPredecessors
+# Called with (node index, travel minutes) as each node settles; returning True ends the search.
+StopCondition = Callable[[int, float], bool]
+
+
+def _split_specialities(raw: str) -> tuple[str, ...]:
+    return tuple(speciality.strip() for speciality in raw.split(",") if speciality.strip())
+
+
+def _osm_type_codes(osm_type: list[str | None]) -> tuple[np.ndarray, list[str]]:
+    osm_types = sorted({value for value in osm_type if value is not None})
+    lookup = {value: code for code, value in enumerate(osm_types)}
+    codes = np.array([-1 if value is None else lookup[value] for value in osm_type], dtype=np.int8)
+    return codes, osm_types
+
+
+def _speciality_postings(speciality_mask: np.ndarray, speciality_count: int) -> tuple[np.ndarray, np.ndarray]:
+    postings = [np.flatnonzero(speciality_mask & np.uint64(1 << bit)) for bit in range(speciality_count)]
+    speciality_ptr = np.zeros(speciality_count + 1, dtype=np.int64)
+    np.cumsum([len(nodes) for nodes in postings], out=speciality_ptr[1:])
+    speciality_nodes = np.concatenate(postings).astype(np.int32) if postings else np.empty(0, dtype=np.int32)
+    return speciality_ptr, speciality_nodes
+
+
+@dataclass(eq=False)
+class CompactGraph:
+    """Integer-indexed referral network topology stored as CSR arrays.
+
+    Node ``i`` owns the outgoing edges ``indices[indptr[i]:indptr[i + 1]]`` with
+    matching ``travel_minutes``. Per-node attributes live in parallel arrays;
+    levels, specialities and OSM types are dictionary-encoded (``level_code``
+    indexes ``levels``, bit ``b`` of ``speciality_mask`` stands for
+    ``specialities[b]``, ``osm_type_code`` indexes ``osm_types`` or is -1) and
+    strings are packed in StringTables. The lookups derived from them (the id
+    index, the nodes per speciality in ``speciality_nodes[speciality_ptr[b]:
+    speciality_ptr[b + 1]]``) are arrays too, so a graph mapped from a shared
+    file holds no per-process copy of the network. Capacity and wait change
+    far more often and live in a separate LoadTable.
+    """
+
+    ids: StringTable
+    names: StringTable
+    lat: np.ndarray
+    lon: np.ndarray
+    osm_type_code: np.ndarray
+    osm_types: list[str]
+    osm_id: StringTable
+    level_code: np.ndarray
+    levels: list[str]
+    speciality_mask: np.ndarray
+    specialities: list[str]
+    capacity_max: np.ndarray
+    catchment_population: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    travel_minutes: np.ndarray
+    index: IdIndex
+    speciality_ptr: np.ndarray
+    speciality_nodes: np.ndarray
+
+    def __post_init__(self) -> None:
+        for array in (
+            self.lat,
+            self.lon,
+            self.osm_type_code,
+            self.level_code,
+            self.speciality_mask,
+            self.capacity_max,
+            self.catchment_population,
+            self.indptr,
+            self.indices,
+            self.travel_minutes,
+            self.speciality_ptr,
+            self.speciality_nodes,
+        ):
+            array.flags.writeable = False
+        # The search walks these views of the CSR arrays, not copies of them.
+        self._adjacency = (plain_view(self.indptr), plain_view(self.indices), plain_view(self.travel_minutes))
+
+    @classmethod
+    def from_rows(cls, centres: Sequence[CentreModel], links: Sequence[ReferenceModel]) -> "CompactGraph":
+        ids = StringTable.from_values([centre.id for centre in centres])
+        index = IdIndex.build(ids)
+
+        levels = list(KNOWN_LEVELS)
+        level_lookup = {level: code for code, level in enumerate(levels)}
+        specialities: list[str] = []
+        speciality_lookup: dict[str, int] = {}
+        level_code = np.empty(len(ids), dtype=np.int8)
+        speciality_mask = np.zeros(len(ids), dtype=np.uint64)
+
+        for idx, centre in enumerate(centres):
+            if centre.level not in level_lookup:
+                level_lookup[centre.level] = len(levels)
+                levels.append(centre.level)
+            level_code[idx] = level_lookup[centre.level]
+
+            mask = 0
+            for speciality in _split_specialities(centre.specialities):
+                if speciality not in speciality_lookup:
+                    if len(specialities) >= MAX_SPECIALITIES:
+                        raise ValueError(f"At most {MAX_SPECIALITIES} distinct specialities are supported")
+                    speciality_lookup[speciality] = len(specialities)
+                    specialities.append(speciality)
+                mask |= 1 << speciality_lookup[speciality]
+            speciality_mask[idx] = mask
+
+        # Like DiGraph.add_edge, a repeated (source, dest) pair keeps the last row.
+        # Links pointing at unknown centres cannot be routed and are dropped.
+        edges: dict[tuple[int, int], float] = {}
+        for link in links:
+            src = index.get(link.source_id)
+            dst = index.get(link.dest_id)
+            if src is None or dst is None:
+                continue
+            edges[(src, dst)] = float(link.travel_minutes)
+
+        sources = np.fromiter((src for src, _ in edges), dtype=np.int32, count=len(edges))
+        targets = np.fromiter((dst for _, dst in edges), dtype=np.int32, count=len(edges))
+        weights = np.fromiter(edges.values(), dtype=np.float32, count=len(edges))
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(ids) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=len(ids)), out=indptr[1:])
+        osm_type_code, osm_types = _osm_type_codes([centre.osm_type for centre in centres])
+        speciality_ptr, speciality_nodes = _speciality_postings(speciality_mask, len(specialities))
+
+        return cls(
+            ids=ids,
+            names=StringTable.from_values([centre.name for centre in centres]),
+            lat=np.array([math.nan if c.lat is None else c.lat for c in centres], dtype=np.float64),
+            lon=np.array([math.nan if c.lon is None else c.lon for c in centres], dtype=np.float64),
+            osm_type_code=osm_type_code,
+            osm_types=osm_types,
+            osm_id=StringTable.from_values([centre.osm_id for centre in centres]),
+            level_code=level_code,
+            levels=levels,
+            speciality_mask=speciality_mask,
+            specialities=specialities,
+            capacity_max=np.array([c.capacity_max for c in centres], dtype=np.int32),
+            catchment_population=np.array([c.catchment_population or 0 for c in centres], dtype=np.int64),
+            indptr=indptr,
+            indices=targets[order],
+            travel_minutes=weights[order],
+            index=index,
+            speciality_ptr=speciality_ptr,
+            speciality_nodes=speciality_nodes,
+        )
+
+    @classmethod
+    def from_payload(cls, header: dict, arrays: dict[str, np.ndarray]) -> "CompactGraph":
+        """Rebuild from a decoded encode_topology payload; every array stays a view of its buffer (e.g. a shared mmap)."""
+        ids = strings(arrays, "ids")
+        return cls(
+            ids=ids,
+            names=strings(arrays, "names"),
+            lat=arrays["lat"],
+            lon=arrays["lon"],
+            osm_type_code=arrays["osm_type_code"],
+            osm_types=header["osm_types"],
+            osm_id=strings(arrays, "osm_id"),
+            level_code=arrays["level_code"],
+            levels=header["levels"],
+            speciality_mask=arrays["speciality_mask"],
+            specialities=header["specialities"],
+            capacity_max=arrays["capacity_max"],
+            catchment_population=arrays["catchment_population"],
+            indptr=arrays["indptr"],
+            indices=arrays["indices"],
+            travel_minutes=arrays["travel_minutes"],
+            index=IdIndex(ids=ids, slots=arrays["id_slots"]),
+            speciality_ptr=arrays["speciality_ptr"],
+            speciality_nodes=arrays["speciality_nodes"],
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.indices.shape[0])
+
+    def nodes_with(self, speciality: str) -> np.ndarray:
+        """Ascending indexes of the nodes offering ``speciality``."""
+        try:
+            bit = self.specialities.index(speciality)
+        except ValueError:
+            return self.speciality_nodes[:0]
+        return self.speciality_nodes[self.speciality_ptr[bit] : self.speciality_ptr[bit + 1]]
+
+    def osm_type(self, idx: int) -> str | None:
+        code = int(self.osm_type_code[idx])
+        return None if code < 0 else self.osm_types[code]
+
+    def node_specialities(self, idx: int) -> tuple[str, ...]:
+        mask = int(self.speciality_mask[idx])
+        return tuple(name for bit, name in enumerate(self.specialities) if mask >> bit & 1)
+
+    def node_attrs(self, idx: int, load: "LoadTable") -> dict:
+        lat = float(self.lat[idx])
+        lon = float(self.lon[idx])
+        return {
+            "name": self.names[idx],
+            "lat": None if math.isnan(lat) else lat,
+            "lon": None if math.isnan(lon) else lon,
+            "osm_type": self.osm_type(idx),
+            "osm_id": self.osm_id[idx],
+            "level": self.levels[int(self.level_code[idx])],
+            "specialities": self.node_specialities(idx),
+            "capacity_max": int(self.capacity_max[idx]),
+            "capacity_available": int(load.capacity_available[idx]),
+            "estimated_wait_minutes": int(load.estimated_wait_minutes[idx]),
+            "catchment_population": int(self.catchment_population[idx]),
+        }
+
+    def dijkstra(
+        self,
+        source: int,
+        targets: Iterable[int],
+        should_stop: StopCondition | None = None,
+    ) -> tuple[dict[int, float], dict[int, int]]:
+        """Heap-based Dijkstra over node indexes, stopping once every target is settled.
+
+        ``should_stop`` sees nodes in non-decreasing travel order and can end the
+        search early; targets not yet settled are then missing from the result.
+        """
+        indptr, indices, weights = self._adjacency
+        remaining = set(targets)
+        settled: dict[int, float] = {}
+        predecessors: dict[int, int] = {}
+        tentative: dict[int, float] = {source: 0.0}
+        heap: list[tuple[float, int]] = [(0.0, source)]
+
+        while heap and remaining:
+            travel, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = travel
+            remaining.discard(node)
+            if should_stop is not None and should_stop(node, travel):
+                break
+            for pos in range(indptr[node], indptr[node + 1]):
+                neighbour = indices[pos]
+                if neighbour in settled:
+                    continue
+                candidate = travel + weights[pos]
+                if candidate < tentative.get(neighbour, math.inf):
+                    tentative[neighbour] = candidate
+                    predecessors[neighbour] = node
+                    heapq.heappush(heap, (candidate, neighbour))
+
+        return settled, predecessors
+
+    def to_networkx(self, load: "LoadTable") -> nx.DiGraph:
+        graph = nx.DiGraph()
+        for idx, node_id in enumerate(self.ids):
+            graph.add_node(node_id, **self.node_attrs(idx, load))
+        indptr, indices, weights = self._adjacency
+        for src, node_id in enumerate(self.ids):
+            for pos in range(indptr[src], indptr[src + 1]):
+                graph.add_edge(node_id, self.ids[indices[pos]], travel_minutes=weights[pos])
+        return graph
+
+
+@dataclass(frozen=True, eq=False)
+class LoadTable:
+    """Per-node capacity and wait, indexed like the CompactGraph it belongs to.
+
+    Arrays are read-only; a load change produces a new table (see with_node).
+    """
+
+    capacity_available: np.ndarray
+    estimated_wait_minutes: np.ndarray
+
+    def __post_init__(self) -> None:
+        self.capacity_available.flags.writeable = False
+        self.estimated_wait_minutes.flags.writeable = False
+
+    @classmethod
+    def from_rows(cls, compact: CompactGraph, rows: Iterable[tuple[str, int, int]]) -> "LoadTable":
+        rows = list(rows)
+        if compact.ids.matches([node_id for node_id, _, _ in rows]):
+            # Read in the same DB order as the topology: no per-id lookups needed.
+            capacity = np.fromiter((row[1] for row in rows), dtype=np.int32, count=len(rows))
+            wait = np.fromiter((row[2] for row in rows), dtype=np.int32, count=len(rows))
+            return cls(capacity_available=capacity, estimated_wait_minutes=wait)
+
+        capacity = np.zeros(compact.node_count, dtype=np.int32)
+        wait = np.zeros(compact.node_count, dtype=np.int32)
+        for node_id, capacity_available, estimated_wait_minutes in rows:
+            idx = compact.index.get(node_id)
+            if idx is None:
+                continue
+            capacity[idx] = capacity_available
+            wait[idx] = estimated_wait_minutes
+        return cls(capacity_available=capacity, estimated_wait_minutes=wait)
+
+    def with_node(self, idx: int, *, capacity_available: int, estimated_wait_minutes: int) -> "LoadTable":
+        capacity = self.capacity_available.copy()
+        wait = self.estimated_wait_minutes.copy()
+        capacity[idx] = capacity_available
+        wait[idx] = estimated_wait_minutes
+        return LoadTable(capacity_available=capacity, estimated_wait_minutes=wait)
+
+
+def _available_index(compact: CompactGraph, load: LoadTable, specialities: Iterable[str]) -> dict[str, np.ndarray]:
+    available = {}
+    for speciality in specialities:
+        nodes = compact.nodes_with(speciality)
+        available[speciality] = nodes[load.capacity_available[nodes] > 0]
+    return available
+
+
+@dataclass(frozen=True, eq=False)
+class GraphSnapshot:
+    """Immutable state of the network that a request routes against.
+
+    GraphService swaps in a new snapshot on every change instead of mutating
+    this one, so a request keeps a consistent view from start to finish.
+    """
+
+    compact: CompactGraph
+    load: LoadTable
+    distances: DistanceMatrix | None
+    hierarchy: ContractionHierarchy | None
+    topology_version: int | None
+    load_version: int | None
+    # Per speciality, the ascending indexes of its nodes with free capacity.
+    available_index: dict[str, np.ndarray]
+
+    @classmethod
+    def build(
+        cls,
+        compact: CompactGraph,
+        load: LoadTable,
+        *,
+        distances: DistanceMatrix | None,
+        topology_version: int | None,
+        load_version: int | None,
+        hierarchy: ContractionHierarchy | None = None,
+    ) -> "GraphSnapshot":
+        return cls(
+            compact=compact,
+            load=load,
+            distances=distances,
+            hierarchy=hierarchy,
+            topology_version=topology_version,
+            load_version=load_version,
+            available_index=_available_index(compact, load, compact.specialities),
+        )
+
+    def with_load(self, load: LoadTable, load_version: int | None) -> "GraphSnapshot":
+        """Share the topology and its caches; only rebuild availability for flipped nodes."""
+        flipped = (self.load.capacity_available > 0) != (load.capacity_available > 0)
+        touched = int(np.bitwise_or.reduce(self.compact.speciality_mask[flipped], initial=np.uint64(0)))
+        specialities = [name for bit, name in enumerate(self.compact.specialities) if touched >> bit & 1]
+        available_index = {**self.available_index, **_available_index(self.compact, load, specialities)}
+        return replace(self, load=load, load_version=load_version, available_index=available_index)
+
+    @cached_property
+    def graph(self) -> nx.DiGraph:
+        return self.compact.to_networkx(self.load)
+
+    def is_empty(self) -> bool:
+        return self.compact.node_count == 0
+
+    @property
+    def routing_method(self) -> str:
+        """Which of the lookups in shortest_travel_times answers this snapshot."""
+        if self.distances is not None:
+            return "matrix"
+        if self.hierarchy is not None:
+            return "hierarchy"
+        return "dijkstra"
+
+    def _ids_in_load_order(self, indexes: np.ndarray) -> list[str]:
+        # Indexes are ascending, i.e. DB row order, so tie-breaking stays identical to a full node scan.
+        ids = self.compact.ids
+        return [ids[idx] for idx in indexes.tolist()]
+
+    def nodes_with_speciality(self, speciality: str) -> list[str]:
+        return self._ids_in_load_order(self.compact.nodes_with(speciality))
+
+    def candidate_destinations(self, needed_speciality: str) -> list[str]:
+        return self._ids_in_load_order(self.available_index.get(needed_speciality, self.compact.speciality_nodes[:0]))
+
+    def shortest_travel_times(
+        self,
+        source: str,
+        targets: Iterable[str],
+        should_stop: StopCondition | None = None,
+    ) -> tuple[dict[str, float], Predecessors]:
+        """Travel minutes from ``source`` to each reachable target.
+
+        Reads the cached matrix row when available, then tries the
+        contraction hierarchy, otherwise runs a single-source Dijkstra that
+        stops once every target is settled or ``should_stop`` says so (the
+        other two never search, so they ignore it). The second value is the
+        predecessor map to pass to path_from_predecessors.
+        """
+        index = self.compact.index
+        source_idx = index.get(source)
+        if source_idx is None:
+            return {}, {}
+
+        ids = self.compact.ids
+        target_idx = [index[node_id] for node_id in targets if node_id in index]
+        if self.distances is not None:
+            row = self.distances.travel[source_idx]
+            travel_times = {}
+            for idx in target_idx:
+                travel = float(row[idx])
+                if travel != math.inf:
+                    travel_times[ids[idx]] = travel
+            return travel_times, self.distances.predecessors[source_idx]
+
+        if self.hierarchy is not None:
+            dist = self.hierarchy.distances_from(source_idx)
+            travel_times = {ids[idx]: float(dist[idx]) for idx in target_idx if dist[idx] != math.inf}
+            return travel_times, HierarchyPredecessors(self.hierarchy, dist)
+
+        settled, predecessors = self.compact.dijkstra(source_idx, target_idx, should_stop)
+        travel_times = {ids[idx]: settled[idx] for idx in target_idx if idx in settled}
+        return travel_times, predecessors
+
+    def path_from_predecessors(self, predecessors: Predecessors, source: str, target: str) -> list[str]:
+        index = self.compact.index
+        source_idx = index[source]
+        path = [index[target]]
+        while path[-1] != source_idx:
+            path.append(int(predecessors[path[-1]]))
+        ids = self.compact.ids
+        return [ids[idx] for idx in reversed(path)]
+
+    def shortest_path(self, source: str, target: str) -> tuple[list[str], float]:
+        path = nx.shortest_path(self.graph, source=source, target=target, weight="travel_minutes")
+        total_travel = nx.path_weight(self.graph, path, weight="travel_minutes")
+        return path, float(total_travel)
+
+    def node(self, node_id: str) -> dict:
+        return self.compact.node_attrs(self.compact.index[node_id], self.load)
+
+
+def _needs_hierarchy(compact: CompactGraph, distances: DistanceMatrix | None) -> bool:
+    return distances is None and compact.node_count > 0 and get_routing_mode() == "hierarchical"
 
 
 class GraphService:
-    """Graph loaded from SQLite referral network tables."""
+    """Graph loaded from SQLite referral network tables.
+
+    Routing runs on a CompactGraph, answered from the cached all-pairs
+    DistanceMatrix when one matches the current topology. Capacity and wait
+    live in a LoadTable with its own version, so load edits never rebuild the
+    topology or invalidate anything derived from it.
+
+    All of it is held in an immutable GraphSnapshot. Changes build a new
+    snapshot off to the side and publish it with a single reference swap
+    (read-copy-update): readers never lock and keep the snapshot they started
+    with, while a lock makes concurrent writers rebuild only once. With
+    GRAPH_SNAPSHOT_DIR set, the topology, its lookups and the contraction
+    hierarchy come from a file built once and mapped by every worker process
+    (see shared_snapshot); only the load layer is read per process.
+    """
 
     def __init__(self) -> None:
-        self.graph = nx.DiGraph()
+        empty = CompactGraph.from_rows([], [])
+        self._snapshot = GraphSnapshot.build(
+            empty,
+            LoadTable.from_rows(empty, []),
+            distances=None,
+            topology_version=None,
+            load_version=None,
+        )
+        self._write_lock = threading.Lock()
+        snapshot_dir = get_graph_snapshot_dir()
+        self._shared = SharedTopologyStore(snapshot_dir) if snapshot_dir else None
         self.reload()
 
+    @property
+    def current(self) -> GraphSnapshot:
+        return self._snapshot
+
+    def snapshot(self) -> GraphSnapshot:
+        """Refresh if the network changed, then return the snapshot to route on."""
+        self.refresh()
+        return self._snapshot
+
     def reload(self) -> None:
-        self.graph.clear()
+        with self._write_lock:
+            self._reload()
+
+    def _reload(self) -> None:
+        with GRAPH_RELOAD_SECONDS.time(layer="topology"):
+            self._reload_topology()
+        GRAPH_NODES.set(self._snapshot.compact.node_count)
+        GRAPH_EDGES.set(self._snapshot.compact.edge_count)
+
+    def _reload_topology(self) -> None:
+        shared_hierarchy = None
+        if self._shared is None:
+            with get_session() as session:
+                topology_version, load_version = get_network_versions(session)
+                centres = session.scalars(select(CentreModel)).all()
+                links = session.scalars(select(ReferenceModel)).all()
+
+            compact = CompactGraph.from_rows(centres, links)
+            load = LoadTable.from_rows(
+                compact,
+                ((centre.id, centre.capacity_available, centre.estimated_wait_minutes) for centre in centres),
+            )
+        else:
+            # Map the topology another worker may already have built; load is per process.
+            with get_session() as session:
+                database_id = get_database_id(session)
+                wanted_version, _ = get_network_versions(session)
+            header, arrays = self._shared.load(database_id, wanted_version, self._build_shared_topology)
+            compact = CompactGraph.from_payload(header, arrays)
+            shared_hierarchy = ContractionHierarchy.from_payload(header, arrays)
+            topology_version = header["topology_version"]
+            load_version, rows = self._read_load()
+            load = LoadTable.from_rows(compact, rows)
+        distances = load_distance_matrix(compact)
+        hierarchy = None
+        if _needs_hierarchy(compact, distances):
+            hierarchy = shared_hierarchy or build_hierarchy(compact)
+        self._snapshot = GraphSnapshot.build(
+            compact,
+            load,
+            distances=distances,
+            hierarchy=hierarchy,
+            topology_version=topology_version,
+            load_version=load_version,
+        )
+
+    def reload_load(self) -> None:
+        """Re-read only capacity and wait, keeping the topology and its caches."""
+        with self._write_lock:
+            self._reload_load()
+
+    def _reload_load(self) -> None:
+        with GRAPH_RELOAD_SECONDS.time(layer="load"):
+            self._reload_load_table()
+
+    @staticmethod
+    def _build_shared_topology() -> tuple[int, bytes]:
         with get_session() as session:
+            database_id = get_database_id(session)
+            topology_version, _ = get_network_versions(session)
             centres = session.scalars(select(CentreModel)).all()
             links = session.scalars(select(ReferenceModel)).all()
+        compact = CompactGraph.from_rows(centres, links)
+        # Contracted once here and mapped by every worker, like the topology itself.
+        hierarchy = build_hierarchy(compact) if _needs_hierarchy(compact, load_distance_matrix(compact)) else None
+        return topology_version, encode_topology(compact, topology_version, hierarchy, database_id)
 
-        for centre in centres:
-            specialities = tuple(
-                speciality.strip()
-                for speciality in centre.specialities.split(",")
-                if speciality.strip()
-            )
-            self.graph.add_node(
-                centre.id,
-                name=centre.name,
-                lat=centre.lat,
-                lon=centre.lon,
-                osm_type=centre.osm_type,
-                osm_id=centre.osm_id,
-                level=centre.level,
-                specialities=specialities,
-                capacity_max=centre.capacity_max,
-                capacity_available=centre.capacity_available,
-                estimated_wait_minutes=centre.estimated_wait_minutes,
-                catchment_population=centre.catchment_population or 0,
-            )
+    @staticmethod
+    def _read_load() -> tuple[int, list]:
+        with get_session() as session:
+            _, load_version = get_network_versions(session)
+            rows = session.execute(
+                select(CentreModel.id, CentreModel.capacity_available, CentreModel.estimated_wait_minutes)
+            ).all()
+        return load_version, rows
 
-        for link in links:
-            self.graph.add_edge(
-                link.source_id,
-                link.dest_id,
-                travel_minutes=link.travel_minutes,
-            )
+    def _reload_load_table(self) -> None:
+        load_version, rows = self._read_load()
+        current = self._snapshot
+        self._snapshot = current.with_load(LoadTable.from_rows(current.compact, rows), load_version)
+
+    def refresh(self) -> bool:
+        """Reload whichever layer's counter moved since the last load."""
+        with get_session() as session:
+            versions = get_network_versions(session)
+        if self._is_current(versions):
+            return False
+
+        with self._write_lock:
+            # Another thread may have published the same versions while we waited.
+            with get_session() as session:
+                topology_version, load_version = get_network_versions(session)
+            current = self._snapshot
+            if topology_version != current.topology_version:
+                self._reload()
+            elif load_version != current.load_version:
+                self._reload_load()
+        return True
+
+    def _is_current(self, versions: tuple[int, int]) -> bool:
+        current = self._snapshot
+        return versions == (current.topology_version, current.load_version)
+
+    def update_load(self, node_id: str, *, capacity_available: int, estimated_wait_minutes: int) -> None:
+        """Publish a snapshot with one node's load patched, keeping the capacity index in sync."""
+        with self._write_lock:
+            self._update_load(node_id, capacity_available, estimated_wait_minutes, self._snapshot.load_version)
+
+    def _update_load(self, node_id: str, capacity_available: int, estimated_wait_minutes: int, load_version: int | None) -> None:
+        current = self._snapshot
+        load = current.load.with_node(
+            current.compact.index[node_id],
+            capacity_available=capacity_available,
+            estimated_wait_minutes=estimated_wait_minutes,
+        )
+        self._snapshot = current.with_load(load, load_version)
+
+    def apply_load_patch(
+        self,
+        node_id: str,
+        *,
+        capacity_available: int,
+        estimated_wait_minutes: int,
+        load_version: int,
+    ) -> bool:
+        """Apply a load edit committed as ``load_version`` without re-reading the DB.
+
+        Only safe when this service already holds every earlier load change,
+        i.e. ``load_version - 1``; otherwise the next refresh() picks it up.
+        """
+        with self._write_lock:
+            current = self._snapshot
+            if current.load_version != load_version - 1 or node_id not in current.compact.index:
+                return False
+            self._update_load(node_id, capacity_available, estimated_wait_minutes, load_version)
+        return True
+
+    # Read helpers below use whatever snapshot is current at call time; request
+    # paths should take one snapshot() and use it throughout instead.
+
+    @property
+    def compact(self) -> CompactGraph:
+        return self._snapshot.compact
+
+    @property
+    def load(self) -> LoadTable:
+        return self._snapshot.load
+
+    @property
+    def distances(self) -> DistanceMatrix | None:
+        return self._snapshot.distances
+
+    @property
+    def topology_version(self) -> int | None:
+        return self._snapshot.topology_version
+
+    @property
+    def load_version(self) -> int | None:
+        return self._snapshot.load_version
+
+    @property
+    def graph(self) -> nx.DiGraph:
+        return self._snapshot.graph
 
     def is_empty(self) -> bool:
-        return self.graph.number_of_nodes() == 0
+        return self._snapshot.is_empty()
+
+    def nodes_with_speciality(self, speciality: str) -> list[str]:
+        return self._snapshot.nodes_with_speciality(speciality)
 
     def candidate_destinations(self, needed_speciality: str) -> list[str]:
-        results: list[str] = []
-        for node_id, attrs in self.graph.nodes(data=True):
-            if needed_speciality in attrs["specialities"] and attrs["capacity_available"] > 0:
-                results.append(node_id)
-        return results
+        return self._snapshot.candidate_destinations(needed_speciality)
+
+    def shortest_travel_times(
+        self,
+        source: str,
+        targets: Iterable[str],
+        should_stop: StopCondition | None = None,
+    ) -> tuple[dict[str, float], Predecessors]:
+        return self._snapshot.shortest_travel_times(source, targets, should_stop)
+
+    def path_from_predecessors(self, predecessors: Predecessors, source: str, target: str) -> list[str]:
+        return self._snapshot.path_from_predecessors(predecessors, source, target)
 
     def shortest_path(self, source: str, target: str) -> tuple[list[str], float]:
-        path = nx.shortest_path(self.graph, source=source, target=target, weight="travel_minutes")
-        total_travel = nx.path_weight(self.graph, path, weight="travel_minutes")
-        return path, float(total_travel)
+        return self._snapshot.shortest_path(source, target)
 
     def node(self, node_id: str) -> dict:
-        return dict(self.graph.nodes[node_id])
+        return self._snapshot.node(node_id)
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.services.packed import plain_view
+
+if TYPE_CHECKING:
+    from app.services.graph_service import CompactGraph
+
+# Contraction order follows the referral levels, so the tertiary core ends up on top.
+LEVEL_RANK = {"primary": 0, "secondary": 1, "tertiary": 2}
+# Witness searches give up after this many settled nodes and keep the shortcut instead.
+WITNESS_SETTLE_LIMIT = 64
+# Every ContractionHierarchy field but shortcut_count; snapshot_codec stores them as "hierarchy.<name>".
+ARRAY_FIELDS = (
+    "rank",
+    "up_indptr",
+    "up_indices",
+    "up_weights",
+    "down_src",
+    "down_weights",
+    "segment_start",
+    "segment_dst",
+    "group_ptr",
+    "rev_indptr",
+    "rev_indices",
+    "rev_weights",
+)
+
+
+@dataclass(frozen=True, eq=False)
+class ContractionHierarchy:
+    """Contraction hierarchy over a CompactGraph, contracted level by level.
+
+    Primary centres are contracted first, then secondary, then tertiary, each
+    adding shortcut edges between its remaining neighbours unless a witness
+    path is already as short. A query (PHAST) runs a Dijkstra over upward
+    edges only, which mostly climbs into the secondary/tertiary core, then
+    sweeps the downward edges in rank order with one vectorized pass per
+    sweep group. The result is the exact distance to every centre.
+
+    Predecessors come from the original links, so paths and tie-breaks match
+    CompactGraph.dijkstra.
+    """
+
+    rank: np.ndarray
+    up_indptr: np.ndarray
+    up_indices: np.ndarray
+    up_weights: np.ndarray
+    down_src: np.ndarray
+    down_weights: np.ndarray
+    segment_start: np.ndarray
+    segment_dst: np.ndarray
+    group_ptr: np.ndarray
+    rev_indptr: np.ndarray
+    rev_indices: np.ndarray
+    rev_weights: np.ndarray
+    shortcut_count: int
+    _plain: tuple = field(init=False, repr=False)
+    _groups: list = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Zero-copy views, so a hierarchy mapped from a shared file stays shared.
+        object.__setattr__(
+            self,
+            "_plain",
+            tuple(
+                plain_view(array)
+                for array in (
+                    self.up_indptr,
+                    self.up_indices,
+                    self.up_weights,
+                    self.rev_indptr,
+                    self.rev_indices,
+                    self.rev_weights,
+                )
+            ),
+        )
+        groups = []
+        group_ptr = self.group_ptr.tolist()
+        for group in range(len(group_ptr) - 1):
+            first, last = group_ptr[group], group_ptr[group + 1]
+            groups.append((int(self.segment_start[first]), int(self.segment_start[last]), first, last))
+        object.__setattr__(self, "_groups", groups)
+
+    @classmethod
+    def from_payload(cls, header: dict, arrays: dict[str, np.ndarray]) -> ContractionHierarchy | None:
+        """The hierarchy stored in a decoded snapshot_codec topology payload, if it has one."""
+        if "hierarchy" not in header:
+            return None
+        return cls(
+            **{name: arrays[f"hierarchy.{name}"] for name in ARRAY_FIELDS},
+            shortcut_count=header["hierarchy"]["shortcut_count"],
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.rank)
+
+    def distances_from(self, source: int) -> np.ndarray:
+        """Exact travel minutes from ``source`` to every node (``inf`` if unreachable)."""
+        up_indptr, up_indices, up_weights = self._plain[:3]
+        settled: dict[int, float] = {}
+        tentative: dict[int, float] = {source: 0.0}
+        heap: list[tuple[float, int]] = [(0.0, source)]
+        while heap:
+            travel, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = travel
+            for pos in range(up_indptr[node], up_indptr[node + 1]):
+                neighbour = up_indices[pos]
+                candidate = travel + up_weights[pos]
+                if candidate < tentative.get(neighbour, math.inf):
+                    tentative[neighbour] = candidate
+                    heapq.heappush(heap, (candidate, neighbour))
+
+        dist = np.full(self.node_count, np.inf)
+        dist[list(settled)] = list(settled.values())
+        for edge_first, edge_last, first, last in self._groups:
+            via = dist[self.down_src[edge_first:edge_last]] + self.down_weights[edge_first:edge_last]
+            starts = self.segment_start[first:last] - edge_first
+            dst = self.segment_dst[first:last]
+            dist[dst] = np.minimum(dist[dst], np.minimum.reduceat(via, starts))
+        return dist
+
+    def predecessor(self, dist: np.ndarray, node: int) -> int:
+        """Node before ``node`` on the shortest path, chosen as CompactGraph.dijkstra would.
+
+        Dijkstra settles nodes in (travel, index) order and keeps the first
+        neighbour reaching the final distance, i.e. the smallest such pair.
+        """
+        rev_indptr, rev_indices, rev_weights = self._plain[3:]
+        best: tuple[float, float, int] | None = None
+        for pos in range(rev_indptr[node], rev_indptr[node + 1]):
+            neighbour = rev_indices[pos]
+            travel = float(dist[neighbour])
+            key = (travel + rev_weights[pos], travel, neighbour)
+            if best is None or key < best:
+                best = key
+        if best is None or best[0] == math.inf:
+            raise KeyError(node)
+        return best[2]
+
+
+class HierarchyPredecessors:
+    """Predecessor lookup for one hierarchy query, resolved lazily per node."""
+
+    def __init__(self, hierarchy: ContractionHierarchy, dist: np.ndarray) -> None:
+        self._hierarchy = hierarchy
+        self._dist = dist
+
+    def __getitem__(self, node: int) -> int:
+        return self._hierarchy.predecessor(self._dist, node)
+
+
+def _witness_distances(
+    out_edges: list[dict[int, float]],
+    source: int,
+    excluded: int,
+    targets: set[int],
+    limit: float,
+) -> dict[int, float]:
+    # Tentative distances are lengths of real paths avoiding ``excluded``, so
+    # they are valid witnesses even when the search stops early.
+    tentative: dict[int, float] = {source: 0.0}
+    heap: list[tuple[float, int]] = [(0.0, source)]
+    settled: set[int] = set()
+    remaining = set(targets)
+    while heap and remaining and len(settled) < WITNESS_SETTLE_LIMIT:
+        travel, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        if travel > limit:
+            break
+        settled.add(node)
+        remaining.discard(node)
+        for neighbour, weight in out_edges[node].items():
+            if neighbour == excluded:
+                continue
+            candidate = travel + weight
+            if candidate < tentative.get(neighbour, math.inf):
+                tentative[neighbour] = candidate
+                heapq.heappush(heap, (candidate, neighbour))
+    return tentative
+
+
+def _csr(rows: list[list[tuple[int, float]]], weight_dtype: type) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    indptr = np.zeros(len(rows) + 1, dtype=np.int32)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    indices = np.fromiter((dst for row in rows for dst, _ in row), dtype=np.int32, count=int(indptr[-1]))
+    weights = np.fromiter((weight for row in rows for _, weight in row), dtype=weight_dtype, count=int(indptr[-1]))
+    return indptr, indices, weights
+
+
+def build_hierarchy(compact: CompactGraph) -> ContractionHierarchy:
+    """Contract every node of ``compact`` in level order and return the query structure."""
+    n = compact.node_count
+    indptr = compact.indptr.tolist()
+    indices = compact.indices.tolist()
+    weights = compact.travel_minutes.tolist()
+    out_edges: list[dict[int, float]] = [{} for _ in range(n)]
+    in_edges: list[dict[int, float]] = [{} for _ in range(n)]
+    reverse: list[list[tuple[int, float]]] = [[] for _ in range(n)]
+    for src in range(n):
+        for pos in range(indptr[src], indptr[src + 1]):
+            dst = indices[pos]
+            if dst == src:
+                continue
+            out_edges[src][dst] = weights[pos]
+            in_edges[dst][src] = weights[pos]
+            reverse[dst].append((src, weights[pos]))
+
+    level_rank = [LEVEL_RANK.get(compact.levels[code], 0) for code in compact.level_code.tolist()]
+
+    deleted = [0] * n
+
+    def priority(node: int) -> tuple[int, int, int]:
+        degree_in, degree_out = len(in_edges[node]), len(out_edges[node])
+        return (level_rank[node], degree_in * degree_out - degree_in - degree_out + deleted[node], node)
+
+    # Lazy updates: a node whose priority grew since it was queued goes back in.
+    queue = [priority(node) for node in range(n)]
+    heapq.heapify(queue)
+    rank = np.empty(n, dtype=np.int32)
+    up: list[list[tuple[int, float]]] = [[] for _ in range(n)]
+    down_in: list[list[tuple[int, float]]] = [[] for _ in range(n)]
+    shortcut_count = 0
+    position = 0
+    while queue:
+        queued = heapq.heappop(queue)
+        node = queued[2]
+        current = priority(node)
+        if queue and current > queued and current > queue[0]:
+            heapq.heappush(queue, current)
+            continue
+
+        rank[node] = position
+        position += 1
+        incoming = in_edges[node]
+        outgoing = out_edges[node]
+        up[node] = sorted(outgoing.items())
+        down_in[node] = sorted(incoming.items())
+
+        for source, weight_in in incoming.items():
+            via = {dst: weight_in + weight_out for dst, weight_out in outgoing.items() if dst != source}
+            if not via:
+                continue
+            witness = _witness_distances(out_edges, source, node, set(via), max(via.values()))
+            for dst, travel in via.items():
+                if witness.get(dst, math.inf) <= travel:
+                    continue
+                out_edges[source][dst] = travel
+                in_edges[dst][source] = travel
+                shortcut_count += 1
+
+        for source in incoming:
+            del out_edges[source][node]
+            deleted[source] += 1
+        for dst in outgoing:
+            del in_edges[dst][node]
+            deleted[dst] += 1
+        out_edges[node] = {}
+        in_edges[node] = {}
+
+    # A node's sweep group is one past the deepest higher-ranked node feeding it,
+    # so every group only reads distances that earlier groups finalized.
+    group = [0] * n
+    for node in np.argsort(-rank, kind="stable").tolist():
+        if down_in[node]:
+            group[node] = 1 + max(group[src] for src, _ in down_in[node])
+
+    swept = sorted((node for node in range(n) if down_in[node]), key=lambda node: (group[node], node))
+    segment_start = np.zeros(len(swept) + 1, dtype=np.int64)
+    np.cumsum([len(down_in[node]) for node in swept], out=segment_start[1:])
+    down_src = np.fromiter((src for node in swept for src, _ in down_in[node]), dtype=np.int32, count=int(segment_start[-1]))
+    down_weights = np.fromiter(
+        (weight for node in swept for _, weight in down_in[node]),
+        dtype=np.float64,
+        count=int(segment_start[-1]),
+    )
+    group_of_segment = np.array([group[node] for node in swept], dtype=np.int64)
+    group_count = int(group_of_segment.max()) if len(swept) else 0
+    group_ptr = np.searchsorted(group_of_segment, np.arange(1, group_count + 2), side="left")
+
+    up_indptr, up_indices, up_weights = _csr(up, np.float64)
+    rev_indptr, rev_indices, rev_weights = _csr(reverse, np.float64)
+    return ContractionHierarchy(
+        rank=rank,
+        up_indptr=up_indptr,
+        up_indices=up_indices,
+        up_weights=up_weights,
+        down_src=down_src,
+        down_weights=down_weights,
+        segment_start=segment_start,
+        segment_dst=np.array(swept, dtype=np.int64),
+        group_ptr=group_ptr,
+        rev_indptr=rev_indptr,
+        rev_indices=rev_indices,
+        rev_weights=rev_weights,
+        shortcut_count=shortcut_count,
+    )
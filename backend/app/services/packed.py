@@ -0,0 +1,146 @@
+"""Read-only structures over flat numpy arrays, usable in place on a shared mmap.
+
+Everything here keeps its state in arrays that snapshot_codec can write to a
+file and map back, so worker processes share the pages instead of each
+holding Python lists, strings and dicts derived from them.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+NO_NODE = -1
+
+
+def plain_view(array: np.ndarray) -> memoryview | list:
+    """Zero-copy view whose items index as plain Python ints/floats.
+
+    Per-element numpy indexing is slow from Python loops; a memoryview reads
+    the same buffer at close to list speed without copying it.
+    """
+    if not array.dtype.isnative:
+        return array.tolist()
+    return memoryview(np.ascontiguousarray(array)).cast("B").cast(array.dtype.char)
+
+
+@dataclass(frozen=True, eq=False)
+class StringTable(Sequence):
+    """Strings packed as UTF-8 bytes: item ``i`` is ``data[offsets[i]:offsets[i + 1]]``.
+
+    ``missing`` marks None items of a nullable column; it is None when every
+    item is present.
+    """
+
+    offsets: np.ndarray
+    data: np.ndarray
+    missing: np.ndarray | None = None
+    _offsets: memoryview | list = field(init=False, repr=False)
+    _data: memoryview = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_offsets", plain_view(self.offsets))
+        object.__setattr__(self, "_data", memoryview(np.ascontiguousarray(self.data)).cast("B"))
+
+    @classmethod
+    def from_values(cls, values: Sequence[str | None]) -> "StringTable":
+        encoded = [b"" if value is None else value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        missing = None
+        if any(value is None for value in values):
+            missing = np.array([value is None for value in values], dtype=np.bool_)
+        return cls(offsets=offsets, data=np.frombuffer(b"".join(encoded), dtype=np.uint8), missing=missing)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def raw(self, idx: int) -> bytes:
+        return bytes(self._data[self._offsets[idx] : self._offsets[idx + 1]])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[position] for position in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        if self.missing is not None and self.missing[idx]:
+            return None
+        return self.raw(idx).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str | None]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def matches(self, values: Sequence[str]) -> bool:
+        """Whether ``values`` are exactly these strings in this order, compared in bulk."""
+        if len(values) != len(self) or self.missing is not None:
+            return False
+        encoded = [value.encode("utf-8") for value in values]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        return bool(np.array_equal(np.diff(self.offsets), lengths)) and self._data == b"".join(encoded)
+
+
+def _slot_count(size: int) -> int:
+    # At most half full, so probe sequences stay short.
+    return 1 << max(2 * size - 1, 1).bit_length()
+
+
+@dataclass(frozen=True, eq=False)
+class IdIndex(Mapping):
+    """Node id -> node index, as an open-addressing hash table over a StringTable.
+
+    ``slots`` holds node indexes (NO_NODE when empty) at the CRC-32 of the
+    id, probing linearly. CRC-32 is stable across processes, unlike hash(),
+    so a table built by one worker is valid in every other.
+    """
+
+    ids: StringTable
+    slots: np.ndarray
+    _slots: memoryview | list = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_slots", plain_view(self.slots))
+
+    @classmethod
+    def build(cls, ids: StringTable) -> "IdIndex":
+        slots = np.full(_slot_count(len(ids)), NO_NODE, dtype=np.int32)
+        mask = len(slots) - 1
+        for idx in range(len(ids)):
+            key = ids.raw(idx)
+            slot = zlib.crc32(key) & mask
+            # Like a dict built in order, a repeated id maps to its last index.
+            while slots[slot] != NO_NODE and ids.raw(int(slots[slot])) != key:
+                slot = (slot + 1) & mask
+            slots[slot] = idx
+        return cls(ids=ids, slots=slots)
+
+    def _find(self, node_id: str) -> int:
+        key = node_id.encode("utf-8")
+        slots = self._slots
+        mask = len(slots) - 1
+        slot = zlib.crc32(key) & mask
+        while (idx := slots[slot]) != NO_NODE:
+            if self.ids.raw(idx) == key:
+                return idx
+            slot = (slot + 1) & mask
+        return NO_NODE
+
+    def __getitem__(self, node_id: str) -> int:
+        idx = self._find(node_id) if isinstance(node_id, str) else NO_NODE
+        if idx == NO_NODE:
+            raise KeyError(node_id)
+        return idx
+
+    def __contains__(self, node_id: object) -> bool:
+        return isinstance(node_id, str) and self._find(node_id) != NO_NODE
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
@@ -1,8 +1,13 @@
+import math
+from collections.abc import Iterable
 from dataclasses import dataclass
 
-import networkx as nx
+import numpy as np
 
-from app.services.graph_service import GraphService
+from app.core.config import get_route_cache_size
+from app.core.metrics import RECOMMEND_CANDIDATES, RECOMMEND_SCORING_SECONDS, RECOMMEND_SEARCH_SECONDS
+from app.services.graph_service import GraphService, GraphSnapshot, LoadTable, Predecessors, StopCondition
+from app.services.route_cache import RouteCache, RouteKey
 from app.services.schemas import PathStep, RecommandationRequest, RecommandationResponse, ScoreBreakdown
 
 
@@ -51,52 +56,260 @@ class CandidateScore:
         return SEVERITY_WEIGHTS[self.severity]
 
 
+class ScoreBound:
+    """Branch-and-bound state for one request while its search runs.
+
+    Nodes settle in non-decreasing travel order, so after one settles at
+    ``travel`` every unsettled candidate scores at least
+    ``severity_weight * (travel + min wait) / max capacity`` over the
+    candidates still unsettled. Once that bound is above the best score seen,
+    no remaining candidate can win, or even tie, and the search may stop.
+    """
+
+    def __init__(self, severity: str, candidate_idx: Iterable[int], load: LoadTable) -> None:
+        self.severity_weight = SEVERITY_WEIGHTS[severity]
+        self.best_score = math.inf
+        self._wait = {idx: float(load.estimated_wait_minutes[idx]) for idx in candidate_idx}
+        self._capacity = {idx: max(int(load.capacity_available[idx]), 1) for idx in self._wait}
+        self._by_wait = sorted(self._wait, key=self._wait.__getitem__)
+        self._by_capacity = sorted(self._capacity, key=self._capacity.__getitem__, reverse=True)
+        self._wait_pos = 0
+        self._capacity_pos = 0
+        self._settled: set[int] = set()
+
+    def observe(self, node: int, travel: float) -> bool:
+        """Record a settled node; True once no unsettled candidate can beat the best score."""
+        if node in self._wait:
+            self._settled.add(node)
+            score = self.severity_weight * (travel + self._wait[node]) / self._capacity[node]
+            self.best_score = min(self.best_score, score)
+
+        while self._wait_pos < len(self._by_wait) and self._by_wait[self._wait_pos] in self._settled:
+            self._wait_pos += 1
+        while self._capacity_pos < len(self._by_capacity) and self._by_capacity[self._capacity_pos] in self._settled:
+            self._capacity_pos += 1
+        if self._wait_pos == len(self._by_wait):
+            return True
+
+        min_wait = self._wait[self._by_wait[self._wait_pos]]
+        max_capacity = self._capacity[self._by_capacity[self._capacity_pos]]
+        return self.severity_weight * (travel + min_wait) / max_capacity > self.best_score
+
+
+def _prune_when_all_bounded(bounds: list[ScoreBound]) -> StopCondition:
+    def should_stop(node: int, travel: float) -> bool:
+        # Every bound must see every node, so no short-circuiting here.
+        exhausted = [bound.observe(node, travel) for bound in bounds]
+        return all(exhausted)
+
+    return should_stop
+
+
+def _route_key(payload: RecommandationRequest) -> RouteKey:
+    return (payload.current_centre_id, payload.needed_speciality, payload.severity)
+
+
+def _for_patient(outcome: RecommandationResponse | ValueError, payload: RecommandationRequest) -> RecommandationResponse:
+    # Cached outcomes are shared between patients; only patient_id differs.
+    if isinstance(outcome, ValueError):
+        raise ValueError(str(outcome))
+    return outcome.model_copy(update={"patient_id": payload.patient_id})
+
+
 class Recommender:
     def __init__(self) -> None:
         self.graph_service = GraphService()
+        self.route_cache = RouteCache(get_route_cache_size())
+
+    def recommend(
+        self,
+        payload: RecommandationRequest,
+        snapshot: GraphSnapshot | None = None,
+    ) -> RecommandationResponse:
+        snapshot = snapshot or self.graph_service.snapshot()
+        key = _route_key(payload)
+        versions = (snapshot.topology_version, snapshot.load_version)
+        cached = self.route_cache.get(key, versions)
+        if cached is not None:
+            return _for_patient(cached, payload)
+
+        try:
+            self._ensure_network(snapshot)
+            candidates = self._candidates_for(snapshot, payload)
+            RECOMMEND_CANDIDATES.observe(len(candidates))
+            with RECOMMEND_SEARCH_SECONDS.time(method=snapshot.routing_method):
+                travel_times, predecessors = snapshot.shortest_travel_times(
+                    payload.current_centre_id,
+                    candidates,
+                    self._score_pruning(snapshot, [(payload, candidates)]),
+                )
+            with RECOMMEND_SCORING_SECONDS.time():
+                best = self._select_best(snapshot, payload, candidates, travel_times, predecessors)
+                response = self._build_response(snapshot, payload, best)
+        except ValueError as exc:
+            self.route_cache.put(key, versions, exc)
+            raise
+        self.route_cache.put(key, versions, response)
+        return response
+
+    def recommend_batch(
+        self,
+        payloads: list[RecommandationRequest],
+        snapshot: GraphSnapshot | None = None,
+    ) -> list[RecommandationResponse | ValueError]:
+        """Recommend for many patients against one network snapshot.
+
+        Cached routes are answered first; the remaining requests sharing a
+        source centre share one search. Each item gets either its response or
+        the ValueError a single call would have raised.
+        """
+        snapshot = snapshot or self.graph_service.snapshot()
+        versions = (snapshot.topology_version, snapshot.load_version)
+        results: list[RecommandationResponse | ValueError | None] = [None] * len(payloads)
+        positions_by_source: dict[str, list[int]] = {}
+        for pos, payload in enumerate(payloads):
+            cached = self.route_cache.get(_route_key(payload), versions)
+            if isinstance(cached, ValueError):
+                results[pos] = cached
+            elif cached is not None:
+                results[pos] = _for_patient(cached, payload)
+            else:
+                positions_by_source.setdefault(payload.current_centre_id, []).append(pos)
+        if not positions_by_source:
+            return results
 
-    def recommend(self, payload: RecommandationRequest) -> RecommandationResponse:
-        self.graph_service.reload()
-        if self.graph_service.is_empty():
+        try:
+            self._ensure_network(snapshot)
+        except ValueError as exc:
+            return [exc if result is None else result for result in results]
+
+        for source, positions in positions_by_source.items():
+            self._route_source(snapshot, source, positions, payloads, results)
+            for pos in positions:
+                self.route_cache.put(_route_key(payloads[pos]), versions, results[pos])
+
+        return results
+
+    def _route_source(
+        self,
+        snapshot: GraphSnapshot,
+        source: str,
+        positions: list[int],
+        payloads: list[RecommandationRequest],
+        results: list[RecommandationResponse | ValueError | None],
+    ) -> None:
+        """Fill ``results`` for the batch positions that start from ``source`` with one search."""
+        candidates_by_pos: dict[int, list[str]] = {}
+        for pos in positions:
+            try:
+                candidates_by_pos[pos] = self._candidates_for(snapshot, payloads[pos])
+            except ValueError as exc:
+                results[pos] = exc
+        if not candidates_by_pos:
+            return
+
+        targets = set().union(*candidates_by_pos.values())
+        for candidates in candidates_by_pos.values():
+            RECOMMEND_CANDIDATES.observe(len(candidates))
+        with RECOMMEND_SEARCH_SECONDS.time(method=snapshot.routing_method):
+            travel_times, predecessors = snapshot.shortest_travel_times(
+                source,
+                targets,
+                self._score_pruning(snapshot, [(payloads[pos], candidates) for pos, candidates in candidates_by_pos.items()]),
+            )
+        for pos, candidates in candidates_by_pos.items():
+            try:
+                with RECOMMEND_SCORING_SECONDS.time():
+                    best = self._select_best(snapshot, payloads[pos], candidates, travel_times, predecessors)
+                    results[pos] = self._build_response(snapshot, payloads[pos], best)
+            except ValueError as exc:
+                results[pos] = exc
+
+    def _score_pruning(
+        self,
+        snapshot: GraphSnapshot,
+        requests: list[tuple[RecommandationRequest, list[str]]],
+    ) -> StopCondition | None:
+        """Stop the search once no request sharing it can still change its winner.
+
+        Skipping the unsettled candidates leaves the result identical to
+        scoring all of them, since each one scores strictly above the winner.
+        Matrix and hierarchy lookups do not search, so they need no bound.
+        """
+        if snapshot.distances is not None or snapshot.hierarchy is not None:
+            return None
+        index = snapshot.compact.index
+        bounds = [
+            ScoreBound(payload.severity, (index[node_id] for node_id in candidates), snapshot.load)
+            for payload, candidates in requests
+        ]
+        return _prune_when_all_bounded(bounds)
+
+    def _ensure_network(self, snapshot: GraphSnapshot) -> None:
+        if snapshot.is_empty():
             raise ValueError("Referral network is empty. Initialize DB and seed demo data first.")
 
-        candidates = self.graph_service.candidate_destinations(payload.needed_speciality)
+    def _candidates_for(self, snapshot: GraphSnapshot, payload: RecommandationRequest) -> list[str]:
+        candidates = snapshot.candidate_destinations(payload.needed_speciality)
         if not candidates:
             raise ValueError("No available destination for requested speciality")
         non_self_candidates = [node_id for node_id in candidates if node_id != payload.current_centre_id]
         if not non_self_candidates:
             raise ValueError("No available destination other than current centre")
+        return non_self_candidates
 
-        scored: list[CandidateScore] = []
-        for node_id in non_self_candidates:
-            try:
-                path, travel = self.graph_service.shortest_path(payload.current_centre_id, node_id)
-            except (nx.NetworkXNoPath, nx.NodeNotFound):
-                continue
-
-            attrs = self.graph_service.node(node_id)
-            scored.append(
-                CandidateScore(
-                    node_id=node_id,
-                    path=path,
-                    travel_minutes=travel,
-                    wait_minutes=float(attrs["estimated_wait_minutes"]),
-                    capacity=int(attrs["capacity_available"]),
-                    severity=payload.severity,
-                )
-            )
-
-        if not scored:
+    def _select_best(
+        self,
+        snapshot: GraphSnapshot,
+        payload: RecommandationRequest,
+        candidates: list[str],
+        travel_times: dict[str, float],
+        predecessors: Predecessors,
+    ) -> CandidateScore:
+        reachable = [node_id for node_id in candidates if node_id in travel_times]
+        if not reachable:
             raise ValueError("No reachable destination found from current centre")
 
-        best = min(scored, key=lambda c: c.score)
-        dest_attrs = self.graph_service.node(best.node_id)
+        # Same formula as compute_final_score, evaluated for every candidate at
+        # once; argmin keeps the first minimum, matching min() over the list.
+        compact = snapshot.compact
+        load = snapshot.load
+        idx = np.fromiter((compact.index[node_id] for node_id in reachable), dtype=np.intp, count=len(reachable))
+        travel = np.fromiter((travel_times[node_id] for node_id in reachable), dtype=np.float64, count=len(reachable))
+        wait = load.estimated_wait_minutes[idx].astype(np.float64)
+        capacity = load.capacity_available[idx]
+        scores = SEVERITY_WEIGHTS[payload.severity] * (travel + wait) / np.maximum(capacity, 1)
+        winner = int(np.argmin(scores))
+
+        best = CandidateScore(
+            node_id=reachable[winner],
+            path=[],
+            travel_minutes=float(travel[winner]),
+            wait_minutes=float(wait[winner]),
+            capacity=int(capacity[winner]),
+            severity=payload.severity,
+        )
+        # Only the winner needs its path materialized from the predecessor map.
+        best.path = snapshot.path_from_predecessors(
+            predecessors,
+            payload.current_centre_id,
+            best.node_id,
+        )
+        return best
+
+    def _build_response(
+        self,
+        snapshot: GraphSnapshot,
+        payload: RecommandationRequest,
+        best: CandidateScore,
+    ) -> RecommandationResponse:
+        dest_attrs = snapshot.node(best.node_id)
 
         steps = [
             PathStep(
                 centre_id=node_id,
-                centre_name=self.graph_service.node(node_id)["name"],
-                level=self.graph_service.node(node_id)["level"],
+                centre_name=snapshot.node(node_id)["name"],
+                level=snapshot.node(node_id)["level"],
             )
             for node_id in best.path
         ]
@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+
+from app.services.schemas import RecommandationResponse
+
+RouteKey = tuple[str, str, str]
+RouteOutcome = RecommandationResponse | ValueError
+
+
+class RouteCache:
+    """Bounded LRU of recommendation outcomes for one network version.
+
+    Keys are ``(source, speciality, severity)``; the topology and load versions
+    are held once for the whole cache; a lookup or store under a different
+    version drops every entry, since none of them can be served again. Failures
+    are cached too, so an unreachable speciality does not re-run the search.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._versions: tuple[int | None, int | None] | None = None
+        self._entries: OrderedDict[RouteKey, RouteOutcome] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: RouteKey, versions: tuple[int | None, int | None]) -> RouteOutcome | None:
+        with self._lock:
+            self._sync_versions(versions)
+            outcome = self._entries.get(key) if versions == self._versions else None
+            if outcome is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return outcome
+
+    def put(self, key: RouteKey, versions: tuple[int | None, int | None], outcome: RouteOutcome) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._sync_versions(versions)
+            if versions != self._versions:
+                # A newer version was seen meanwhile; this outcome is already stale.
+                return
+            self._entries[key] = outcome
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "topology_version": self._versions[0] if self._versions else None,
+                "load_version": self._versions[1] if self._versions else None,
+            }
+
+    def _sync_versions(self, versions: tuple[int | None, int | None]) -> None:
+        if versions == self._versions:
+            return
+        if self._versions is not None and _is_older(versions, self._versions):
+            return
+        self.evictions += len(self._entries)
+        self._entries.clear()
+        self._versions = versions
+
+
+def _is_older(versions: tuple[int | None, int | None], current: tuple[int | None, int | None]) -> bool:
+    if None in versions or None in current:
+        return False
+    # Each counter only ever grows, so a smaller one means a snapshot taken before the last bump.
+    return versions[0] < current[0] or versions[1] < current[1]
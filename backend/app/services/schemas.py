@@ -40,6 +40,22 @@ class RecommandationResponse(BaseModel):
     score_breakdown: ScoreBreakdown
 
 
+class BatchRecommandationRequest(BaseModel):
+    items: list[RecommandationRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchRecommandationResult(BaseModel):
+    patient_id: str
+    recommendation: RecommandationResponse | None = None
+    error: str | None = None
+
+
+class BatchRecommandationResponse(BaseModel):
+    topology_version: int | None
+    load_version: int | None
+    results: list[BatchRecommandationResult]
+
+
 class CentreCreate(BaseModel):
     id: str = Field(..., examples=["H_DISTRICT_2"])
     name: str = Field(..., examples=["Hopital District 2"])
@@ -49,6 +65,10 @@ class CentreCreate(BaseModel):
     estimated_wait_minutes: int = Field(..., ge=0, examples=[30])
 
 
+class BulkCentreCreate(BaseModel):
+    items: list[CentreCreate] = Field(..., min_length=1, max_length=5000)
+
+
 class CentreUpdate(BaseModel):
     name: str = Field(..., examples=["Hopital District 2"])
     level: str = Field(..., examples=["secondary"])
@@ -57,6 +77,28 @@ class CentreUpdate(BaseModel):
     estimated_wait_minutes: int = Field(..., ge=0, examples=[30])
 
 
+class CentreLoadUpdate(BaseModel):
+    capacity_available: int | None = Field(default=None, ge=0, examples=[3])
+    estimated_wait_minutes: int | None = Field(default=None, ge=0, examples=[45])
+
+
+class CentreLoadResponse(BaseModel):
+    id: str
+    capacity_available: int
+    estimated_wait_minutes: int
+    load_version: int
+
+
+class RouteCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    topology_version: int | None = None
+    load_version: int | None = None
+
+
 class CentreResponse(BaseModel):
     id: str
     name: str
@@ -66,12 +108,30 @@ class CentreResponse(BaseModel):
     estimated_wait_minutes: int
 
 
+class CentrePage(BaseModel):
+    items: list[CentreResponse]
+    next_after_id: str | None = None
+
+
 class ReferenceCreate(BaseModel):
     source_id: str = Field(..., examples=["C_LOCAL_A"])
     dest_id: str = Field(..., examples=["H_DISTRICT_1"])
     travel_minutes: int = Field(..., gt=0, examples=[20])
 
 
+class BulkReferenceCreate(BaseModel):
+    items: list[ReferenceCreate] = Field(..., min_length=1, max_length=5000)
+    # "skip" leaves existing pairs untouched; "update" overwrites their travel_minutes.
+    on_conflict: Literal["skip", "update"] = "skip"
+
+
+class BulkWriteResponse(BaseModel):
+    created: int
+    updated: int = 0
+    # Centre ids, or "source_id->dest_id" pairs, that already existed.
+    conflicts: list[str]
+
+
 class ReferenceUpdate(BaseModel):
     source_id: str = Field(..., examples=["C_LOCAL_A"])
     dest_id: str = Field(..., examples=["H_DISTRICT_1"])
@@ -85,6 +145,11 @@ class ReferenceResponse(BaseModel):
     travel_minutes: int
 
 
+class ReferencePage(BaseModel):
+    items: list[ReferenceResponse]
+    next_after_id: int | None = None
+
+
 class IndicatorResponse(BaseModel):
     country_code: str
     indicator_code: str
@@ -0,0 +1,108 @@
+"""Versioned topology files shared by API worker processes.
+
+With ``GRAPH_SNAPSHOT_DIR`` set, GraphService reads the topology from
+``topology-<database_id>-<version>.cpgs`` (the snapshot_codec layout) mapped
+read-only. The database id (models.get_database_id) keeps a recreated
+database, or a second one sharing the directory, from mapping another
+database's file at the same version.
+
+CompactGraph and ContractionHierarchy route over views of the mapping, so the
+network and everything derived from it sit once in the page cache however
+many workers map them. The first worker that needs a version builds the file
+under an exclusive lock; the others wait for the lock and map the result.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from pathlib import Path
+
+import numpy as np
+
+from app.services.snapshot_codec import decode_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, workers may each build a version once.
+    fcntl = None
+
+FILE_PREFIX = "topology-"
+FILE_SUFFIX = ".cpgs"
+LOCK_NAME = ".build.lock"
+
+DecodedSnapshot = tuple[dict, dict[str, np.ndarray]]
+# Reads the network and returns (topology version it was read at, encode_topology payload).
+# The payload header must carry the database id the file is published under.
+TopologyBuilder = Callable[[], tuple[int | None, bytes]]
+
+
+class SharedTopologyStore:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, database_id: int, topology_version: int | None) -> Path:
+        return self.directory / f"{FILE_PREFIX}{database_id}-{topology_version}{FILE_SUFFIX}"
+
+    def open(self, database_id: int, topology_version: int | None) -> DecodedSnapshot | None:
+        """Map the file for ``topology_version`` if some worker already built it."""
+        try:
+            with open(self.path_for(database_id, topology_version), "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        # The arrays keep the mapping alive; closing the file does not unmap it.
+        header, arrays = decode_snapshot(mapped)
+        if header.get("database_id") != database_id or header.get("topology_version") != topology_version:
+            # Renamed or copied in from elsewhere: treat as missing and rebuild over it.
+            return None
+        return header, arrays
+
+    def load(self, database_id: int, topology_version: int | None, build: TopologyBuilder) -> DecodedSnapshot:
+        """Map ``topology_version``, building it first if no file exists yet.
+
+        The topology may move on while building; the file is then written
+        under the version ``build`` actually read, and that one is mapped.
+        """
+        mapped = self.open(database_id, topology_version)
+        if mapped is not None:
+            return mapped
+        with self._build_lock():
+            # Another worker may have finished the same version while this one waited.
+            mapped = self.open(database_id, topology_version)
+            if mapped is not None:
+                return mapped
+            built_version, payload = build()
+            self._publish(database_id, built_version, payload)
+        return self.open(database_id, built_version)
+
+    @contextmanager
+    def _build_lock(self) -> Iterator[None]:
+        with open(self.directory / LOCK_NAME, "a+b") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _publish(self, database_id: int, topology_version: int | None, payload: bytes) -> None:
+        path = self.path_for(database_id, topology_version)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as handle:
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+        # Readers only ever see a complete file under its final name.
+        os.replace(tmp_path, path)
+        # Workers still routing on an older version keep their mapping after the
+        # unlink (POSIX); where the OS refuses, the file is left for a later prune.
+        # Files of other databases sharing the directory are theirs to prune.
+        for stale in self.directory.glob(f"{FILE_PREFIX}{database_id}-*{FILE_SUFFIX}"):
+            if stale != path:
+                with suppress(OSError):
+                    stale.unlink()
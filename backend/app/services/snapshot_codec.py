@@ -0,0 +1,172 @@
+"""Binary wire format for a GraphSnapshot, served by ``GET /graph/snapshot``.
+
+Layout (little-endian)::
+
+    b"CPGS" | u32 format version | u32 header length | JSON header | arrays
+
+The JSON header carries the versions, the small vocabularies and, for every
+array, its dtype and byte offset from the start of the payload. Arrays are
+8-byte aligned so clients can view them in place (``np.frombuffer``, JS
+typed arrays). Node attributes and the CSR edge arrays mirror CompactGraph:
+``level_code`` indexes ``levels``, bit ``b`` of ``speciality_mask`` stands
+for ``specialities[b]`` and ``osm_type_code`` indexes ``osm_types`` (-1 for
+none). String columns (``ids``, ``names``, ``osm_id``) are UTF-8 bytes in
+``<column>.data`` split by ``<column>.offsets``, with ``osm_id.missing``
+flagging nulls; strings() reads them back. A ``load`` payload only carries
+capacity and wait, for clients that already hold the topology; a
+``topology`` payload (shared snapshot files) carries no load but adds the
+id hash index, the speciality posting lists and, when built, the
+contraction hierarchy, so workers map those instead of rebuilding them.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.services.hierarchy import ARRAY_FIELDS as HIERARCHY_ARRAYS
+from app.services.packed import StringTable
+
+if TYPE_CHECKING:
+    from app.services.graph_service import CompactGraph, GraphSnapshot
+    from app.services.hierarchy import ContractionHierarchy
+
+MAGIC = b"CPGS"
+FORMAT_VERSION = 2
+STRING_COLUMNS = ("ids", "names", "osm_id")
+MEDIA_TYPE = "application/vnd.carepath.graph-snapshot"
+_PREAMBLE = struct.Struct("<4sII")
+_ALIGN = 8
+Buffer = bytes | mmap.mmap
+
+
+def _pad(size: int) -> int:
+    return -size % _ALIGN
+
+
+def _string_arrays(name: str, table: StringTable) -> dict[str, np.ndarray]:
+    arrays = {f"{name}.offsets": table.offsets, f"{name}.data": table.data}
+    if table.missing is not None:
+        arrays[f"{name}.missing"] = table.missing
+    return arrays
+
+
+def strings(arrays: dict[str, np.ndarray], name: str) -> StringTable:
+    """The string column ``name`` of a decoded payload, e.g. ``list(strings(arrays, "ids"))``."""
+    return StringTable(
+        offsets=arrays[f"{name}.offsets"],
+        data=arrays[f"{name}.data"],
+        missing=arrays.get(f"{name}.missing"),
+    )
+
+
+def _topology_fields(compact: CompactGraph) -> tuple[dict, dict[str, np.ndarray]]:
+    header = {
+        "levels": compact.levels,
+        "specialities": compact.specialities,
+        "osm_types": compact.osm_types,
+    }
+    arrays = {
+        "lat": compact.lat,
+        "lon": compact.lon,
+        "level_code": compact.level_code,
+        "speciality_mask": compact.speciality_mask,
+        "osm_type_code": compact.osm_type_code,
+        "capacity_max": compact.capacity_max,
+        "catchment_population": compact.catchment_population,
+        "indptr": compact.indptr,
+        "indices": compact.indices,
+        "travel_minutes": compact.travel_minutes,
+    }
+    for name in STRING_COLUMNS:
+        arrays.update(_string_arrays(name, getattr(compact, name)))
+    return header, arrays
+
+
+def _pack(header: dict, arrays: dict[str, np.ndarray]) -> bytes:
+    # Offsets are relative to the first array; the header is padded so they stay aligned.
+    blobs: list[bytes] = []
+    specs = []
+    offset = 0
+    for name, array in arrays.items():
+        dtype = array.dtype.newbyteorder("<")
+        data = np.ascontiguousarray(array, dtype=dtype).tobytes()
+        specs.append({"name": name, "dtype": dtype.str, "offset": offset, "length": len(array)})
+        blobs.append(data + b"\0" * _pad(len(data)))
+        offset += len(blobs[-1])
+    header = {**header, "arrays": specs}
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * _pad(_PREAMBLE.size + len(header_bytes))
+    return b"".join([_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)), header_bytes, *blobs])
+
+
+def encode_snapshot(snapshot: GraphSnapshot, *, topology: bool = True) -> bytes:
+    """Serialise ``snapshot``; with ``topology=False`` only the load columns are included."""
+    compact = snapshot.compact
+    load = snapshot.load
+    header: dict = {
+        "kind": "full" if topology else "load",
+        "topology_version": snapshot.topology_version,
+        "load_version": snapshot.load_version,
+        "node_count": compact.node_count,
+        "edge_count": compact.edge_count,
+    }
+    arrays = {
+        "capacity_available": load.capacity_available,
+        "estimated_wait_minutes": load.estimated_wait_minutes,
+    }
+    if topology:
+        topology_header, topology_arrays = _topology_fields(compact)
+        header.update(topology_header)
+        arrays.update(topology_arrays)
+    return _pack(header, arrays)
+
+
+def encode_topology(
+    compact: CompactGraph,
+    topology_version: int | None,
+    hierarchy: ContractionHierarchy | None = None,
+    database_id: int | None = None,
+) -> bytes:
+    """Topology-only payload (no load columns), as stored in shared snapshot files."""
+    topology_header, arrays = _topology_fields(compact)
+    header = {
+        "kind": "topology",
+        "database_id": database_id,
+        "topology_version": topology_version,
+        "node_count": compact.node_count,
+        "edge_count": compact.edge_count,
+        **topology_header,
+    }
+    arrays["id_slots"] = compact.index.slots
+    arrays["speciality_ptr"] = compact.speciality_ptr
+    arrays["speciality_nodes"] = compact.speciality_nodes
+    if hierarchy is not None:
+        header["hierarchy"] = {"shortcut_count": hierarchy.shortcut_count}
+        arrays.update({f"hierarchy.{name}": getattr(hierarchy, name) for name in HIERARCHY_ARRAYS})
+    return _pack(header, arrays)
+
+
+def decode_snapshot(payload: Buffer) -> tuple[dict, dict[str, np.ndarray]]:
+    """Split a payload back into its JSON header and numpy views of the arrays.
+
+    ``payload`` may be bytes or a read-only mmap; the arrays then view the
+    mapped pages without copying them.
+    """
+    magic, version, header_length = _PREAMBLE.unpack_from(payload)
+    if magic != MAGIC:
+        raise ValueError("Not a CarePath graph snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported graph snapshot format version {version}")
+    start = _PREAMBLE.size + header_length
+    header = json.loads(payload[_PREAMBLE.size : start])
+    arrays = {
+        spec["name"]: np.frombuffer(payload, dtype=np.dtype(spec["dtype"]), count=spec["length"], offset=start + spec["offset"])
+        for spec in header["arrays"]
+    }
+    return header, arrays
@@ -11,9 +11,10 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.db.models import CentreModel, get_session, init_db
+from app.db.models import init_db
 from app.rl.env import ReferralEnv
 from app.rl.evaluation import evaluate_heuristic, evaluate_ppo, evaluate_random
+from app.services.graph_service import GraphService
 
 
 def parse_args() -> argparse.Namespace:
@@ -61,31 +62,22 @@ def build_env(args: argparse.Namespace, source_id: str) -> ReferralEnv:
     )
 
 
-def has_speciality(centre: CentreModel, speciality: str) -> bool:
-    values = [s.strip() for s in centre.specialities.split(",") if s.strip()]
-    return speciality in values
-
-
 def pick_source(args: argparse.Namespace) -> str:
     if args.source:
         return args.source
 
-    with get_session() as session:
-        centres = session.query(CentreModel).all()
-
+    graph_service = GraphService()
     candidates = [
-        centre
-        for centre in centres
-        if has_speciality(centre, args.speciality)
-        and not centre.id.startswith("C_LOCAL_")
-        and not centre.id.startswith("H_")
+        node_id
+        for node_id in graph_service.nodes_with_speciality(args.speciality)
+        if not node_id.startswith("C_LOCAL_") and not node_id.startswith("H_")
     ]
-    candidates.sort(key=lambda c: float(c.catchment_population or 0), reverse=True)
+    candidates.sort(key=lambda node_id: float(graph_service.node(node_id)["catchment_population"]), reverse=True)
 
-    for centre in candidates:
+    for node_id in candidates:
         try:
-            _ = build_env(args, centre.id)
-            return centre.id
+            _ = build_env(args, node_id)
+            return node_id
         except Exception:
             continue
     raise ValueError("No valid source centre found for requested speciality")
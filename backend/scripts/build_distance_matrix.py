@@ -0,0 +1,61 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.config import get_distance_matrix_path
+from app.db.models import init_db
+from app.services.distance_matrix import build_distance_matrix, load_distance_matrix
+from app.services.graph_service import GraphService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild the cached all-pairs travel matrix")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Base path for the matrix files (default: next to the SQLite DB)",
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the cache matches the network")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    init_db()
+    base_path = Path(args.output) if args.output else get_distance_matrix_path()
+
+    graph_service = GraphService()
+    compact = graph_service.compact
+    if compact.node_count == 0:
+        print({"status": "skipped", "reason": "empty_graph"})
+        return
+    if not args.force and load_distance_matrix(compact, base_path) is not None:
+        print({"status": "up_to_date", "path": str(base_path), "nodes": compact.node_count})
+        return
+
+    started = time.perf_counter()
+    try:
+        matrix = build_distance_matrix(compact, base_path)
+    except ValueError as exc:
+        print({"status": "skipped", "reason": str(exc)})
+        return
+    print(
+        {
+            "status": "built",
+            "path": str(base_path),
+            "nodes": compact.node_count,
+            "edges": compact.edge_count,
+            "topology_hash": matrix.topology_hash,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
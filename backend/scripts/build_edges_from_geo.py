@@ -12,7 +12,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.db.models import CentreModel, ReferenceModel, get_session, init_db
+from app.db.models import CentreModel, ReferenceModel, get_session, init_db, upsert_references
 
 
 def parse_args() -> argparse.Namespace:
@@ -113,9 +113,10 @@ def build_edges(
             session.query(ReferenceModel).delete()
 
         existing = {
-            (ref.source_id, ref.dest_id)
-            for ref in session.scalars(select(ReferenceModel)).all()
+            (source_id, dest_id)
+            for source_id, dest_id in session.execute(select(ReferenceModel.source_id, ReferenceModel.dest_id))
         }
+        new_edges: list[dict] = []
 
         def add_edge(source: CentreModel, target: CentreModel) -> None:
             nonlocal created, skipped
@@ -129,13 +130,7 @@ def build_edges(
                 osrm_server=osrm_server,
                 speed_kmh=speed_kmh,
             )
-            session.add(
-                ReferenceModel(
-                    source_id=source.id,
-                    dest_id=target.id,
-                    travel_minutes=travel,
-                )
-            )
+            new_edges.append({"source_id": source.id, "dest_id": target.id, "travel_minutes": travel})
             existing.add(key)
             created += 1
 
@@ -156,6 +151,7 @@ def build_edges(
             add_rule(by_level.get("primary", []), by_level.get("tertiary", []), alt_k)
             add_rule(by_level.get("secondary", []), by_level.get("secondary", []), 1)
 
+        upsert_references(session, new_edges)
         session.commit()
 
     return created, skipped
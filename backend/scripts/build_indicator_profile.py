@@ -6,13 +6,13 @@ import math
 import sys
 from pathlib import Path
 
-from sqlalchemy import select
+from sqlalchemy.engine import Row
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.db.models import CountryIndicatorModel, get_session, init_db
+from app.db.models import get_latest_indicators, get_session, init_db
 
 
 def parse_args() -> argparse.Namespace:
@@ -22,24 +22,17 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def _latest(country_code: str) -> dict[str, CountryIndicatorModel]:
+def _latest(country_code: str) -> dict[str, Row]:
     with get_session() as session:
-        rows = session.scalars(
-            select(CountryIndicatorModel).where(CountryIndicatorModel.country_code == country_code.upper())
-        ).all()
-    out: dict[str, CountryIndicatorModel] = {}
-    for row in rows:
-        cur = out.get(row.indicator_code)
-        if cur is None or row.year > cur.year:
-            out[row.indicator_code] = row
-    return out
+        rows = get_latest_indicators(session, country_code.upper())
+    return {row.indicator_code: row for row in rows}
 
 
 def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
-def build_profile(indicators: dict[str, CountryIndicatorModel]) -> dict:
+def build_profile(indicators: dict[str, Row]) -> dict:
     beds_per_1000 = float(indicators.get("SH.MED.BEDS.ZS").value) if indicators.get("SH.MED.BEDS.ZS") else None
     physicians_per_1000 = (
         float(indicators.get("SH.MED.PHYS.ZS").value) if indicators.get("SH.MED.PHYS.ZS") else None
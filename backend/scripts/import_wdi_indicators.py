@@ -13,7 +13,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.db.models import CountryIndicatorModel, get_session, init_db
+from app.db.models import CountryIndicatorModel, get_session, init_db, refresh_latest_indicators
 
 YEAR_RE = re.compile(r"^\d{4}$")
 
@@ -133,6 +133,8 @@ def upsert_points(points: list[dict]) -> tuple[int, int]:
                 existing.metadata_json = json.dumps({"importer": "wdi_csv"}, ensure_ascii=False)
                 updated += 1
         session.commit()
+        refresh_latest_indicators(session)
+        session.commit()
     return inserted, updated
 
 
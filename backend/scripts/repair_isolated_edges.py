@@ -122,7 +122,10 @@ def main() -> None:
     with get_session() as session:
         centres = session.scalars(select(CentreModel)).all()
         centres_by_id = {c.id: c for c in centres}
-        existing_edges = {(r.source_id, r.dest_id) for r in session.scalars(select(ReferenceModel)).all()}
+        existing_edges = {
+            (source_id, dest_id)
+            for source_id, dest_id in session.execute(select(ReferenceModel.source_id, ReferenceModel.dest_id))
+        }
 
         isolated_ids: list[str] = []
         for centre in centres:
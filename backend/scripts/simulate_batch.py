@@ -6,7 +6,6 @@ from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
 
-import networkx as nx
 from sqlalchemy import select
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -238,24 +237,22 @@ def apply_recovery(initial_caps: dict[str, int], recovery_amount: int) -> None:
 
 def apply_random_shock(
     *,
+    graph_service: GraphService,
     source_id: str,
     speciality: str,
     capacity_drop: int,
     wait_add: int,
     rng: random.Random,
 ) -> None:
+    graph_service.refresh()
+    candidates = [node_id for node_id in graph_service.nodes_with_speciality(speciality) if node_id != source_id]
+    if not candidates:
+        return
+    target_id = rng.choice(candidates)
     with get_session() as session:
-        centres = session.scalars(select(CentreModel)).all()
-        candidates = []
-        for centre in centres:
-            if centre.id == source_id:
-                continue
-            specialities = [s.strip() for s in centre.specialities.split(",") if s.strip()]
-            if speciality in specialities:
-                candidates.append(centre)
-        if not candidates:
+        target = session.get(CentreModel, target_id)
+        if target is None:
             return
-        target = rng.choice(candidates)
         target.capacity_available = max(0, target.capacity_available - max(capacity_drop, 0))
         target.estimated_wait_minutes = max(0, target.estimated_wait_minutes + max(wait_add, 0))
         session.commit()
@@ -270,21 +267,13 @@ def normalized_entropy(counts: Counter[str]) -> float:
     return entropy / math.log(len(counts))
 
 
-def preflight_snapshot(source_id: str, speciality: str) -> dict:
-    with get_session() as session:
-        centres = session.scalars(select(CentreModel)).all()
-
-    source_exists = any(c.id == source_id for c in centres)
-    eligible = 0
-    for centre in centres:
-        specialities = [s.strip() for s in centre.specialities.split(",") if s.strip()]
-        if speciality in specialities and centre.capacity_available > 0:
-            eligible += 1
-
+def preflight_snapshot(graph_service: GraphService, source_id: str, speciality: str) -> dict:
+    # Read the compact snapshot directly: the networkx view would be converted just for these counts.
+    snapshot = graph_service.snapshot()
     return {
-        "centres_total": len(centres),
-        "source_exists": source_exists,
-        "eligible_destinations": eligible,
+        "centres_total": snapshot.compact.node_count,
+        "source_exists": source_id in snapshot.compact.index,
+        "eligible_destinations": len(snapshot.candidate_destinations(speciality)),
     }
 
 
@@ -362,18 +351,15 @@ def fallback_recommendation(
 
     # In fallback mode we allow overloaded destinations (capacity can be zero),
     # but we still require speciality compatibility and connectivity.
-    candidates: list[FallbackDecision] = []
-    for node_id, attrs in graph_service.graph.nodes(data=True):
-        if node_id == source_id:
-            continue
-        if speciality not in attrs.get("specialities", ()):
-            continue
+    eligible = [node_id for node_id in graph_service.nodes_with_speciality(speciality) if node_id != source_id]
+    travel_times, _ = graph_service.shortest_travel_times(source_id, eligible)
 
-        try:
-            _, travel_minutes = graph_service.shortest_path(source_id, node_id)
-        except Exception:
+    candidates: list[FallbackDecision] = []
+    for node_id in eligible:
+        travel_minutes = travel_times.get(node_id)
+        if travel_minutes is None:
             continue
-
+        attrs = graph_service.node(node_id)
         wait_minutes = float(attrs["estimated_wait_minutes"])
         capacity = int(attrs["capacity_available"])
         score = compute_final_score(
@@ -408,13 +394,14 @@ def _build_reachable_candidates(
 ) -> list[PolicyDecision]:
     graph_service = GraphService()
     graph_service.reload()
+    destinations = graph_service.candidate_destinations(speciality)
+    travel_times, _ = graph_service.shortest_travel_times(source_id, destinations)
     candidates: list[PolicyDecision] = []
-    for node_id in graph_service.candidate_destinations(speciality):
+    for node_id in destinations:
         if node_id == source_id:
             continue
-        try:
-            _, travel = graph_service.shortest_path(source_id, node_id)
-        except (nx.NetworkXNoPath, nx.NodeNotFound):
+        travel = travel_times.get(node_id)
+        if travel is None:
             continue
         attrs = graph_service.node(node_id)
         wait = float(attrs["estimated_wait_minutes"])
@@ -459,9 +446,9 @@ def run_simulation(args: argparse.Namespace) -> dict:
     if getattr(args, "seed_complex", False):
         seed_complex_data()
 
-    snapshot = preflight_snapshot(args.source, args.speciality)
-    initial_caps = get_initial_capacities()
     recommender = Recommender()
+    snapshot = preflight_snapshot(recommender.graph_service, args.source, args.speciality)
+    initial_caps = get_initial_capacities()
     rng = random.Random(args.random_seed)
 
     destination_counts: Counter[str] = Counter()
@@ -544,6 +531,7 @@ def run_simulation(args: argparse.Namespace) -> dict:
             apply_recovery(initial_caps, args.recovery_amount)
         if args.shock_every > 0 and idx % args.shock_every == 0:
             apply_random_shock(
+                graph_service=recommender.graph_service,
                 source_id=source_centre,
                 speciality=speciality,
                 capacity_drop=args.shock_capacity_drop,
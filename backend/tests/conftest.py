@@ -1,5 +1,6 @@
 import sys
 import os
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
@@ -11,7 +12,15 @@ if str(ROOT) not in sys.path:
 
 os.environ.setdefault("DATABASE_URL", "sqlite:///./test_carepath.db")
 
-from app.db.models import CountryIndicatorModel, CentreModel, ReferenceModel, get_session, init_db
+from app.db.models import (
+    CountryIndicatorLatestModel,
+    CountryIndicatorModel,
+    CentreModel,
+    EpisodeModel,
+    ReferenceModel,
+    get_session,
+    init_db,
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -22,13 +31,17 @@ def init_database() -> None:
 @pytest.fixture(autouse=True)
 def clean_db() -> None:
     with get_session() as session:
+        session.query(CountryIndicatorLatestModel).delete()
         session.query(CountryIndicatorModel).delete()
+        session.query(EpisodeModel).delete()
         session.query(ReferenceModel).delete()
         session.query(CentreModel).delete()
         session.commit()
     yield
     with get_session() as session:
+        session.query(CountryIndicatorLatestModel).delete()
         session.query(CountryIndicatorModel).delete()
+        session.query(EpisodeModel).delete()
         session.query(ReferenceModel).delete()
         session.query(CentreModel).delete()
         session.commit()
@@ -39,3 +52,58 @@ def client() -> TestClient:
     from app.main import app
 
     return TestClient(app)
+
+
+def centre_payload(
+    centre_id: str,
+    *,
+    level: str = "secondary",
+    specialities: list[str] | None = None,
+    capacity_available: int = 5,
+    estimated_wait_minutes: int = 25,
+) -> dict:
+    return {
+        "id": centre_id,
+        "name": f"Centre {centre_id}",
+        "level": level,
+        "specialities": specialities or ["general"],
+        "capacity_available": capacity_available,
+        "estimated_wait_minutes": estimated_wait_minutes,
+    }
+
+
+@pytest.fixture
+def make_centre() -> Callable[..., dict]:
+    """Payload factory for POST /centres and /centres/bulk items."""
+    return centre_payload
+
+
+@pytest.fixture
+def create_centre(client: TestClient) -> Callable[..., dict]:
+    def create(centre_id: str, **fields) -> dict:
+        payload = centre_payload(centre_id, **fields)
+        response = client.post("/centres", json=payload)
+        assert response.status_code == 201
+        return payload
+
+    return create
+
+
+@pytest.fixture
+def create_reference(client: TestClient) -> Callable[[str, str, int], None]:
+    def create(source_id: str, dest_id: str, travel_minutes: int) -> None:
+        response = client.post(
+            "/references",
+            json={"source_id": source_id, "dest_id": dest_id, "travel_minutes": travel_minutes},
+        )
+        assert response.status_code == 201
+
+    return create
+
+
+@pytest.fixture
+def seeded_network(create_centre, create_reference) -> None:
+    """C_LOCAL_A (primary, general) -> H_DISTRICT_1 (secondary, general + maternal) in 18 minutes."""
+    create_centre("C_LOCAL_A", level="primary")
+    create_centre("H_DISTRICT_1", specialities=["general", "maternal"])
+    create_reference("C_LOCAL_A", "H_DISTRICT_1", 18)
@@ -102,3 +102,28 @@ def test_reference_crud_flow(client: TestClient) -> None:
     listed_after = client.get("/references")
     assert listed_after.status_code == 200
     assert all(item["id"] != created_id for item in listed_after.json())
+
+
+def test_posting_an_existing_pair_updates_it(client: TestClient) -> None:
+    _create_centre(client, "C_LOCAL_A")
+    _create_centre(client, "H_DISTRICT_1")
+    _create_centre(client, "H_REGIONAL_1")
+    link = {"source_id": "C_LOCAL_A", "dest_id": "H_DISTRICT_1", "travel_minutes": 20}
+    created = client.post("/references", json=link)
+    assert created.status_code == 201
+
+    upserted = client.post("/references", json={**link, "travel_minutes": 12})
+    assert upserted.status_code == 200
+    assert upserted.json() == {**link, "id": created.json()["id"], "travel_minutes": 12}
+    assert len(client.get("/references").json()) == 1
+
+    other = client.post(
+        "/references",
+        json={"source_id": "C_LOCAL_A", "dest_id": "H_REGIONAL_1", "travel_minutes": 40},
+    )
+    conflict = client.put(f"/references/{other.json()['id']}", json=link)
+    assert conflict.status_code == 409
+
+    blocked = client.delete("/centres/C_LOCAL_A")
+    assert blocked.status_code == 409
+    assert "referenced by 2 links" in blocked.json()["detail"]
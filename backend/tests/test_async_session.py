@@ -0,0 +1,40 @@
+import asyncio
+
+from app.core.config import get_async_database_url
+from app.db.models import CentreModel, get_async_session, get_network_versions, get_session
+
+
+def test_async_database_url_swaps_in_async_drivers(monkeypatch) -> None:
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///./x.db")
+    assert get_async_database_url() == "sqlite+aiosqlite:///./x.db"
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@db/carepath")
+    assert get_async_database_url() == "postgresql+asyncpg://u:p@db/carepath"
+    monkeypatch.setenv("ASYNC_DATABASE_URL", "postgresql+psycopg://u:p@db/carepath")
+    assert get_async_database_url() == "postgresql+psycopg://u:p@db/carepath"
+
+
+def test_async_session_writes_bump_change_counters() -> None:
+    with get_session() as session:
+        before = get_network_versions(session)
+
+    async def create() -> None:
+        async with get_async_session() as session:
+            session.add(
+                CentreModel(
+                    id="ASYNC",
+                    name="Async",
+                    level="primary",
+                    specialities="general",
+                    capacity_max=5,
+                    capacity_available=5,
+                    estimated_wait_minutes=10,
+                )
+            )
+            await session.commit()
+
+    asyncio.run(create())
+    with get_session() as session:
+        assert session.get(CentreModel, "ASYNC") is not None
+        assert get_network_versions(session)[0] > before[0]
+
@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from app.db.models import get_network_versions, get_session
+
+
+def test_bulk_centres_create_and_report_conflicts(client: TestClient, make_centre, create_centre) -> None:
+    create_centre("C00")
+    with get_session() as session:
+        before, _ = get_network_versions(session)
+
+    response = client.post("/centres/bulk", json={"items": [make_centre(f"C{idx:02d}", specialities=["general", "maternal"]) for idx in range(5)]})
+    assert response.status_code == 201
+    assert response.json() == {"created": 4, "updated": 0, "conflicts": ["C00"]}
+    with get_session() as session:
+        after, _ = get_network_versions(session)
+    assert after == before + 1
+    listed = client.get("/centres").json()
+    assert [item["id"] for item in listed] == ["C00", "C01", "C02", "C03", "C04"]
+    assert listed[1]["specialities"] == ["general", "maternal"]
+
+
+def test_bulk_centres_reject_the_whole_batch_on_invalid_items(client: TestClient, make_centre) -> None:
+    repeated = client.post("/centres/bulk", json={"items": [make_centre("C01"), make_centre("C01")]})
+    assert repeated.status_code == 400
+    assert "items[1]" in repeated.json()["detail"]
+
+    empty = client.post("/centres/bulk", json={"items": [make_centre("C01"), make_centre("C02", specialities=[" "])]})
+    assert empty.status_code == 400
+    assert client.get("/centres").json() == []
+
+
+def test_bulk_references_validate_ids_and_handle_conflicts(client: TestClient, make_centre) -> None:
+    client.post("/centres/bulk", json={"items": [make_centre(f"C{idx:02d}") for idx in range(3)]})
+    client.post("/references", json={"source_id": "C00", "dest_id": "C01", "travel_minutes": 30})
+    links = [
+        {"source_id": "C00", "dest_id": "C01", "travel_minutes": 12},
+        {"source_id": "C01", "dest_id": "C02", "travel_minutes": 15},
+        {"source_id": "C02", "dest_id": "C00", "travel_minutes": 40},
+    ]
+
+    unknown = client.post(
+        "/references/bulk",
+        json={"items": [*links, {"source_id": "C00", "dest_id": "MISSING", "travel_minutes": 5}]},
+    )
+    assert unknown.status_code == 400
+    assert "MISSING" in unknown.json()["detail"]
+    assert len(client.get("/references").json()) == 1
+
+    skipped = client.post("/references/bulk", json={"items": links})
+    assert skipped.json() == {"created": 2, "updated": 0, "conflicts": ["C00->C01"]}
+    assert client.get("/references", params={"source_id": "C00"}).json()[0]["travel_minutes"] == 30
+
+    updated = client.post("/references/bulk", json={"items": links, "on_conflict": "update"})
+    assert updated.json() == {"created": 0, "updated": 3, "conflicts": ["C00->C01", "C01->C02", "C02->C00"]}
+    assert client.get("/references", params={"source_id": "C00"}).json()[0]["travel_minutes"] == 12
@@ -0,0 +1,71 @@
+import asyncio
+
+from app.db.models import CentreModel, ReferenceModel, get_session
+from app.services.change_feed import ChangeFeed, format_sse
+from app.services.graph_service import GraphService
+
+
+def _feed(**kwargs) -> ChangeFeed:
+    service = GraphService()
+
+    async def poll():
+        return service.snapshot()
+
+    return ChangeFeed(poll, interval=60, **kwargs)
+
+
+def _set_capacity(centre_id: str, capacity_available: int) -> None:
+    # Written like the simulators do: straight to the DB, not through the API.
+    with get_session() as session:
+        session.get(CentreModel, centre_id).capacity_available = capacity_available
+        session.commit()
+
+
+def test_feed_publishes_load_deltas_then_topology_versions(seeded_network) -> None:
+    async def scenario() -> None:
+        feed = _feed()
+        queue = await feed.subscribe()
+        name, first = queue.get_nowait()
+        assert name == "versions"
+
+        _set_capacity("H_DISTRICT_1", 0)
+        feed.notify()
+        name, data = await asyncio.wait_for(queue.get(), timeout=5)
+        assert name == "load"
+        assert data["centres"] == [["H_DISTRICT_1", 0, 25]]
+        assert data["topology_version"] == first["topology_version"]
+        assert data["load_version"] > first["load_version"]
+
+        with get_session() as session:
+            session.add(ReferenceModel(source_id="H_DISTRICT_1", dest_id="C_LOCAL_A", travel_minutes=18))
+            session.commit()
+        feed.notify()
+        name, data = await asyncio.wait_for(queue.get(), timeout=5)
+        assert name == "versions"
+        assert data["topology_version"] > first["topology_version"]
+
+        feed.unsubscribe(queue)
+        assert feed.subscriber_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_lagging_subscriber_is_reset_to_versions(seeded_network) -> None:
+    async def scenario() -> None:
+        feed = _feed(queue_size=1)
+        queue = await feed.subscribe()
+        _set_capacity("C_LOCAL_A", 1)
+        feed.notify()
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+        name, data = queue.get_nowait()
+        assert name == "versions"
+        assert queue.empty()
+        feed.unsubscribe(queue)
+
+    asyncio.run(scenario())
+
+
+def test_events_are_formatted_as_sse() -> None:
+    event = ("load", {"load_version": 3, "centres": [["A", 1, 10]]})
+    assert format_sse(event) == 'event: load\ndata: {"load_version":3,"centres":[["A",1,10]]}\n\n'
@@ -0,0 +1,87 @@
+import math
+
+import pytest
+
+from app.db.models import CentreModel, ReferenceModel, get_session
+from app.services.distance_matrix import build_distance_matrix, load_distance_matrix
+from app.services.graph_service import GraphService
+
+
+def _seed_network() -> None:
+    centres = ["C_LOCAL_A", "H_DISTRICT_1", "H_DISTRICT_2", "H_REGIONAL_1", "H_ISOLATED"]
+    refs = [
+        ("C_LOCAL_A", "H_DISTRICT_1", 15),
+        ("C_LOCAL_A", "H_DISTRICT_2", 30),
+        ("C_LOCAL_A", "H_REGIONAL_1", 70),
+        ("H_DISTRICT_1", "H_REGIONAL_1", 22),
+        ("H_DISTRICT_1", "H_DISTRICT_2", 5),
+    ]
+    with get_session() as session:
+        session.add_all(
+            [
+                CentreModel(
+                    id=centre_id,
+                    name=f"Centre {centre_id}",
+                    level="secondary",
+                    specialities="general,maternal",
+                    capacity_available=3,
+                    estimated_wait_minutes=20,
+                )
+                for centre_id in centres
+            ]
+        )
+        session.add_all([ReferenceModel(source_id=s, dest_id=d, travel_minutes=t) for s, d, t in refs])
+        session.commit()
+
+
+@pytest.fixture(autouse=True)
+def matrix_dir(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DISTANCE_MATRIX_DIR", str(tmp_path))
+
+
+def test_matrix_matches_on_demand_search() -> None:
+    _seed_network()
+    graph_service = GraphService()
+    assert graph_service.distances is None
+    targets = ["H_DISTRICT_1", "H_DISTRICT_2", "H_REGIONAL_1", "H_ISOLATED"]
+    expected, _ = graph_service.shortest_travel_times("C_LOCAL_A", targets)
+
+    build_distance_matrix(graph_service.compact)
+    graph_service.reload()
+    assert graph_service.distances is not None
+
+    travel_times, predecessors = graph_service.shortest_travel_times("C_LOCAL_A", targets)
+    assert travel_times == expected
+    assert graph_service.path_from_predecessors(predecessors, "C_LOCAL_A", "H_REGIONAL_1") == [
+        "C_LOCAL_A",
+        "H_DISTRICT_1",
+        "H_REGIONAL_1",
+    ]
+    isolated = graph_service.compact.index["H_ISOLATED"]
+    assert math.isinf(graph_service.distances.travel[0, isolated])
+
+
+def test_matrix_is_ignored_after_topology_change() -> None:
+    _seed_network()
+    graph_service = GraphService()
+    build_distance_matrix(graph_service.compact)
+
+    with get_session() as session:
+        session.add(ReferenceModel(source_id="C_LOCAL_A", dest_id="H_ISOLATED", travel_minutes=9))
+        session.commit()
+    graph_service.refresh()
+
+    assert graph_service.distances is None
+    travel_times, _ = graph_service.shortest_travel_times("C_LOCAL_A", ["H_ISOLATED"])
+    assert travel_times == {"H_ISOLATED": 9.0}
+
+
+def test_size_guard_falls_back_to_search(monkeypatch) -> None:
+    _seed_network()
+    graph_service = GraphService()
+    build_distance_matrix(graph_service.compact)
+
+    monkeypatch.setenv("DISTANCE_MATRIX_MAX_NODES", "3")
+    assert load_distance_matrix(graph_service.compact) is None
+    with pytest.raises(ValueError):
+        build_distance_matrix(graph_service.compact)
@@ -0,0 +1,64 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.db.models import EpisodeModel, get_session
+from app.services.episode_log import EpisodeLog
+from app.services.recommender import Recommender
+from app.services.schemas import RecommandationRequest
+
+
+def _request(patient_id: str) -> dict:
+    return {"patient_id": patient_id, "current_centre_id": "C_LOCAL_A", "needed_speciality": "maternal", "severity": "high"}
+
+
+def test_recommendations_are_persisted_as_episodes(client: TestClient, seeded_network) -> None:
+    assert client.post("/recommander", json=_request("P1")).status_code == 200
+    items = [_request("P2"), {**_request("P3"), "needed_speciality": "pediatric"}]
+    assert client.post("/recommander/batch", json={"items": items}).status_code == 200
+
+    routes.episode_log.stop()
+    with get_session() as session:
+        episodes = session.query(EpisodeModel).order_by(EpisodeModel.patient_id).all()
+
+    # P3 has no pediatric destination, so nothing was served and nothing is logged.
+    assert [(e.patient_id, e.source_id, e.recommended_dest_id) for e in episodes] == [
+        ("P1", "C_LOCAL_A", "H_DISTRICT_1"),
+        ("P2", "C_LOCAL_A", "H_DISTRICT_1"),
+    ]
+    first = episodes[0]
+    assert first.severity == "high" and first.needed_speciality == "maternal"
+    assert json.loads(first.score_breakdown_json)["travel_minutes"] == 18
+    assert first.topology_version is not None and first.load_version is not None
+    assert first.latency_ms > 0
+    assert first.created_at is not None
+
+
+def _served(recommender: Recommender, patient_id: str):
+    payload = RecommandationRequest(**_request(patient_id))
+    snapshot = recommender.graph_service.snapshot()
+    return payload, recommender.recommend(payload, snapshot), snapshot
+
+
+def _queued_patients(log: EpisodeLog) -> list[str]:
+    return [row["patient_id"] for row in log._drain()]
+
+
+def test_overflow_policy_decides_which_record_is_dropped(seeded_network, monkeypatch) -> None:
+    recommender = Recommender()
+    # Keep the writer thread from draining the queue under test.
+    monkeypatch.setattr(EpisodeLog, "_ensure_started", lambda self: None)
+
+    newest = EpisodeLog(2, overflow="drop_newest", batch_size=10, flush_seconds=1)
+    oldest = EpisodeLog(2, overflow="drop_oldest", batch_size=10, flush_seconds=1)
+    for patient_id in ("P1", "P2", "P3"):
+        newest.record(*_served(recommender, patient_id), 0.001)
+        oldest.record(*_served(recommender, patient_id), 0.001)
+
+    assert _queued_patients(newest) == ["P1", "P2"]
+    assert _queued_patients(oldest) == ["P2", "P3"]
+
+    disabled = EpisodeLog(0, overflow="drop_newest", batch_size=10, flush_seconds=1)
+    assert disabled.record(*_served(recommender, "P4"), 0.001) is False
+    assert disabled.pending == 0
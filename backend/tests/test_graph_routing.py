@@ -0,0 +1,135 @@
+import networkx as nx
+
+from app.db.models import CentreModel, ReferenceModel, get_session, upsert_references
+from app.services.graph_service import GraphService
+
+
+def _seed_network() -> None:
+    centres = [
+        ("C_LOCAL_A", "primary", "general,maternal"),
+        ("C_LOCAL_B", "primary", "general"),
+        ("H_DISTRICT_1", "secondary", "general,maternal"),
+        ("H_DISTRICT_2", "secondary", "general,pediatric"),
+        ("H_REGIONAL_1", "tertiary", "general,maternal,pediatric"),
+        ("H_ISOLATED", "tertiary", "maternal"),
+    ]
+    refs = [
+        ("C_LOCAL_A", "H_DISTRICT_1", 15),
+        ("C_LOCAL_A", "H_DISTRICT_2", 30),
+        ("C_LOCAL_A", "H_REGIONAL_1", 70),
+        ("H_DISTRICT_1", "H_REGIONAL_1", 22),
+        ("H_DISTRICT_1", "H_DISTRICT_2", 5),
+        ("H_DISTRICT_2", "H_REGIONAL_1", 30),
+        ("C_LOCAL_B", "H_DISTRICT_2", 12),
+    ]
+    with get_session() as session:
+        session.add_all(
+            [
+                CentreModel(
+                    id=centre_id,
+                    name=f"Centre {centre_id}",
+                    level=level,
+                    specialities=specialities,
+                    capacity_available=3,
+                    estimated_wait_minutes=20,
+                )
+                for centre_id, level, specialities in centres
+            ]
+        )
+        session.add_all([ReferenceModel(source_id=s, dest_id=d, travel_minutes=t) for s, d, t in refs])
+        session.commit()
+
+
+def test_shortest_travel_times_match_networkx() -> None:
+    _seed_network()
+    graph_service = GraphService()
+    targets = ["H_DISTRICT_1", "H_DISTRICT_2", "H_REGIONAL_1", "H_ISOLATED"]
+
+    travel_times, predecessors = graph_service.shortest_travel_times("C_LOCAL_A", targets)
+
+    expected = nx.single_source_dijkstra_path_length(graph_service.graph, "C_LOCAL_A", weight="travel_minutes")
+    for target in targets[:-1]:
+        assert travel_times[target] == expected[target]
+        path = graph_service.path_from_predecessors(predecessors, "C_LOCAL_A", target)
+        assert path[0] == "C_LOCAL_A"
+        assert path[-1] == target
+        assert nx.path_weight(graph_service.graph, path, weight="travel_minutes") == expected[target]
+    assert "H_ISOLATED" not in travel_times
+
+
+def test_shortest_travel_times_unknown_source_returns_empty() -> None:
+    _seed_network()
+    graph_service = GraphService()
+
+    assert graph_service.shortest_travel_times("UNKNOWN", ["H_DISTRICT_1"]) == ({}, {})
+
+
+def test_candidate_index_tracks_capacity_updates() -> None:
+    _seed_network()
+    graph_service = GraphService()
+
+    assert graph_service.nodes_with_speciality("pediatric") == ["H_DISTRICT_2", "H_REGIONAL_1"]
+    assert graph_service.candidate_destinations("maternal") == [
+        "C_LOCAL_A",
+        "H_DISTRICT_1",
+        "H_REGIONAL_1",
+        "H_ISOLATED",
+    ]
+
+    graph_service.update_load("H_DISTRICT_1", capacity_available=0, estimated_wait_minutes=45)
+    assert "H_DISTRICT_1" not in graph_service.candidate_destinations("maternal")
+    assert "H_DISTRICT_1" not in graph_service.candidate_destinations("general")
+    assert graph_service.node("H_DISTRICT_1")["estimated_wait_minutes"] == 45
+
+    graph_service.update_load("H_DISTRICT_1", capacity_available=2, estimated_wait_minutes=30)
+    assert graph_service.candidate_destinations("maternal")[1] == "H_DISTRICT_1"
+
+
+def test_compact_graph_csr_layout_and_networkx_view() -> None:
+    _seed_network()
+    with get_session() as session:
+        upsert_references(session, [{"source_id": "C_LOCAL_A", "dest_id": "H_DISTRICT_1", "travel_minutes": 12}])
+        session.commit()
+    graph_service = GraphService()
+    compact = graph_service.compact
+
+    assert compact.node_count == 6
+    assert compact.edge_count == 7
+    src = compact.index["C_LOCAL_A"]
+    targets = {
+        compact.ids[int(dst)]: float(weight)
+        for dst, weight in zip(
+            compact.indices[compact.indptr[src] : compact.indptr[src + 1]],
+            compact.travel_minutes[compact.indptr[src] : compact.indptr[src + 1]],
+        )
+    }
+    # Upserting an existing pair overwrites its travel time in place.
+    assert targets == {"H_DISTRICT_1": 12.0, "H_DISTRICT_2": 30.0, "H_REGIONAL_1": 70.0}
+    assert compact.levels[int(compact.level_code[src])] == "primary"
+    assert compact.node_specialities(src) == ("general", "maternal")
+
+    graph = graph_service.graph
+    assert graph.number_of_nodes() == 6
+    assert graph.number_of_edges() == 7
+    assert graph.nodes["H_REGIONAL_1"] == graph_service.node("H_REGIONAL_1")
+
+
+def test_snapshot_is_unchanged_by_later_updates() -> None:
+    _seed_network()
+    graph_service = GraphService()
+    snapshot = graph_service.snapshot()
+    assert "H_DISTRICT_1" in snapshot.candidate_destinations("maternal")
+
+    graph_service.update_load("H_DISTRICT_1", capacity_available=0, estimated_wait_minutes=90)
+    with get_session() as session:
+        session.add(ReferenceModel(source_id="C_LOCAL_A", dest_id="H_ISOLATED", travel_minutes=10))
+        session.commit()
+    latest = graph_service.snapshot()
+
+    assert latest is not snapshot
+    assert latest.topology_version > snapshot.topology_version
+    assert "H_ISOLATED" in latest.shortest_travel_times("C_LOCAL_A", ["H_ISOLATED"])[0]
+    assert snapshot.shortest_travel_times("C_LOCAL_A", ["H_ISOLATED"])[0] == {}
+    assert snapshot.node("H_DISTRICT_1")["capacity_available"] == 3
+    assert "H_DISTRICT_1" in snapshot.candidate_destinations("maternal")
+    assert not snapshot.load.capacity_available.flags.writeable
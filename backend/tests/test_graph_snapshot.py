@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+from app.services.snapshot_codec import MEDIA_TYPE, decode_snapshot, strings
+
+
+def test_snapshot_carries_the_whole_network(client: TestClient, seeded_network) -> None:
+    response = client.get("/graph/snapshot")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MEDIA_TYPE
+    header, arrays = decode_snapshot(response.content)
+
+    assert header["kind"] == "full"
+    assert str(header["topology_version"]) == response.headers["X-Topology-Version"]
+    assert list(strings(arrays, "ids")) == ["C_LOCAL_A", "H_DISTRICT_1"]
+    assert list(strings(arrays, "names")) == ["Centre C_LOCAL_A", "Centre H_DISTRICT_1"]
+    assert list(strings(arrays, "osm_id")) == [None, None]
+    assert [header["levels"][code] for code in arrays["level_code"]] == ["primary", "secondary"]
+    maternal_bit = header["specialities"].index("maternal")
+    assert [int(mask) >> maternal_bit & 1 for mask in arrays["speciality_mask"]] == [0, 1]
+    assert arrays["indptr"].tolist() == [0, 1, 1]
+    assert arrays["indices"].tolist() == [1]
+    assert arrays["travel_minutes"].tolist() == [18.0]
+    assert arrays["capacity_available"].tolist() == [5, 5]
+
+
+def test_snapshot_deltas_since_known_versions(client: TestClient, seeded_network) -> None:
+    full = client.get("/graph/snapshot")
+    topology, load = full.headers["X-Topology-Version"], full.headers["X-Load-Version"]
+
+    unchanged = client.get("/graph/snapshot", params={"since_topology": topology, "since_load": load})
+    assert unchanged.status_code == 304
+    assert client.get("/graph/snapshot", headers={"If-None-Match": full.headers["ETag"]}).status_code == 304
+
+    client.patch("/centres/H_DISTRICT_1/load", json={"capacity_available": 1})
+    delta = client.get("/graph/snapshot", params={"since_topology": topology, "since_load": load})
+    assert delta.status_code == 200
+    header, arrays = decode_snapshot(delta.content)
+    assert header["kind"] == "load"
+    assert "ids.data" not in arrays and "indices" not in arrays
+    assert arrays["capacity_available"].tolist() == [5, 1]
+    assert len(delta.content) < len(full.content)
+
+    client.post("/references", json={"source_id": "H_DISTRICT_1", "dest_id": "C_LOCAL_A", "travel_minutes": 18})
+    rebuilt = client.get("/graph/snapshot", params={"since_topology": topology, "since_load": load})
+    header, arrays = decode_snapshot(rebuilt.content)
+    assert header["kind"] == "full"
+    assert arrays["indptr"].tolist() == [0, 1, 2]
@@ -0,0 +1,111 @@
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.models import CentreModel, ReferenceModel, get_session
+from app.services.graph_service import CompactGraph, GraphService
+from app.services.hierarchy import build_hierarchy
+
+LEVELS = ("primary", "secondary", "tertiary")
+
+
+@pytest.fixture(autouse=True)
+def matrix_dir(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DISTANCE_MATRIX_DIR", str(tmp_path))
+
+
+def _random_graph(seed: int, node_count: int) -> CompactGraph:
+    rng = random.Random(seed)
+    centres = [
+        SimpleNamespace(
+            id=f"N{idx}",
+            name=f"Centre {idx}",
+            level=rng.choice(LEVELS),
+            specialities="general",
+            lat=None,
+            lon=None,
+            osm_type=None,
+            osm_id=None,
+            capacity_max=1,
+            catchment_population=0,
+        )
+        for idx in range(node_count)
+    ]
+    links = [
+        SimpleNamespace(
+            source_id=f"N{rng.randrange(node_count)}",
+            dest_id=f"N{rng.randrange(node_count)}",
+            travel_minutes=rng.randint(1, 60),
+        )
+        for _ in range(node_count * 3)
+    ]
+    return CompactGraph.from_rows(centres, links)
+
+
+def test_hierarchy_matches_dijkstra_distances_and_predecessors() -> None:
+    for seed in range(10):
+        compact = _random_graph(seed, 40 + seed * 15)
+        hierarchy = build_hierarchy(compact)
+        every_node = range(compact.node_count)
+        for source in every_node:
+            settled, predecessors = compact.dijkstra(source, every_node)
+            dist = hierarchy.distances_from(source)
+            for node in every_node:
+                if node not in settled:
+                    assert math.isinf(dist[node])
+                    continue
+                assert dist[node] == settled[node]
+                if node != source:
+                    assert hierarchy.predecessor(dist, node) == predecessors[node]
+
+
+def test_hierarchical_routing_mode(monkeypatch) -> None:
+    centres = [
+        ("C_LOCAL_A", "primary"),
+        ("C_LOCAL_B", "primary"),
+        ("H_DISTRICT_1", "secondary"),
+        ("H_DISTRICT_2", "secondary"),
+        ("H_REGIONAL_1", "tertiary"),
+        ("H_ISOLATED", "tertiary"),
+    ]
+    refs = [
+        ("C_LOCAL_A", "H_DISTRICT_1", 15),
+        ("C_LOCAL_A", "H_DISTRICT_2", 30),
+        ("C_LOCAL_A", "H_REGIONAL_1", 70),
+        ("H_DISTRICT_1", "H_REGIONAL_1", 22),
+        ("H_DISTRICT_1", "H_DISTRICT_2", 5),
+        ("C_LOCAL_B", "H_DISTRICT_2", 12),
+    ]
+    with get_session() as session:
+        session.add_all(
+            [
+                CentreModel(
+                    id=centre_id,
+                    name=f"Centre {centre_id}",
+                    level=level,
+                    specialities="general",
+                    capacity_available=3,
+                    estimated_wait_minutes=20,
+                )
+                for centre_id, level in centres
+            ]
+        )
+        session.add_all([ReferenceModel(source_id=s, dest_id=d, travel_minutes=t) for s, d, t in refs])
+        session.commit()
+
+    targets = ["H_DISTRICT_2", "H_REGIONAL_1", "H_ISOLATED"]
+    expected, _ = GraphService().shortest_travel_times("C_LOCAL_A", targets)
+
+    monkeypatch.setenv("ROUTING_MODE", "hierarchical")
+    graph_service = GraphService()
+    assert graph_service.snapshot().hierarchy is not None
+
+    travel_times, predecessors = graph_service.shortest_travel_times("C_LOCAL_A", targets)
+    assert travel_times == expected == {"H_DISTRICT_2": 20.0, "H_REGIONAL_1": 37.0}
+    assert graph_service.path_from_predecessors(predecessors, "C_LOCAL_A", "H_DISTRICT_2") == [
+        "C_LOCAL_A",
+        "H_DISTRICT_1",
+        "H_DISTRICT_2",
+    ]
@@ -1,6 +1,6 @@
 from fastapi.testclient import TestClient
 
-from app.db.models import CountryIndicatorModel, get_session
+from app.db.models import CountryIndicatorLatestModel, CountryIndicatorModel, get_session, refresh_latest_indicators
 
 
 def test_indicator_endpoints_list_and_latest(client: TestClient) -> None:
@@ -50,3 +50,28 @@ def test_indicator_endpoints_list_and_latest(client: TestClient) -> None:
     beds = [row for row in latest_rows if row["indicator_code"] == "SH.MED.BEDS.ZS"][0]
     assert beds["year"] == 2023
     assert beds["value"] == 1.33
+
+
+def test_latest_indicators_follow_the_materialized_table(client: TestClient) -> None:
+    def add(year: int, value: float) -> None:
+        with get_session() as session:
+            session.add(
+                CountryIndicatorModel(country_code="KEN", indicator_code="SH.MED.BEDS.ZS", year=year, value=value)
+            )
+            session.commit()
+
+    add(2021, 1.1)
+    add(2023, 1.3)
+    with get_session() as session:
+        assert refresh_latest_indicators(session) == 1
+        session.commit()
+        materialized = session.query(CountryIndicatorLatestModel).one()
+        assert (materialized.year, materialized.value) == (2023, 1.3)
+
+    assert [row["year"] for row in client.get("/indicators/latest").json()] == [2023]
+
+    # A write after the refresh makes the table stale; the endpoint falls back to SQL.
+    add(2024, 1.4)
+    assert [row["year"] for row in client.get("/indicators/latest").json()] == [2024]
+    with get_session() as session:
+        assert session.query(CountryIndicatorLatestModel).one().year == 2023
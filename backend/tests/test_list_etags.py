@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+
+from app.db.models import CountryIndicatorModel, get_session
+
+
+def test_centres_etag_revalidates_until_a_write(client: TestClient, create_centre) -> None:
+    create_centre("C_LOCAL_A")
+    first = client.get("/centres")
+    etag = first.headers["etag"]
+
+    cached = client.get("/centres", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert client.get("/centres/page", headers={"If-None-Match": etag}).status_code == 304
+
+    client.patch("/centres/C_LOCAL_A/load", json={"capacity_available": 1})
+    changed = client.get("/centres", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["capacity_available"] == 1
+
+
+def test_references_etag_ignores_load_changes(client: TestClient, seeded_network) -> None:
+    etag = client.get("/references").headers["etag"]
+
+    client.patch("/centres/C_LOCAL_A/load", json={"estimated_wait_minutes": 5})
+    assert client.get("/references", headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
+
+    client.post("/references", json={"source_id": "H_DISTRICT_1", "dest_id": "C_LOCAL_A", "travel_minutes": 18})
+    assert client.get("/references", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_indicator_etags_follow_indicator_writes(client: TestClient) -> None:
+    with get_session() as session:
+        session.add(CountryIndicatorModel(country_code="KEN", indicator_code="SP.POP.TOTL", year=2020, value=1.0))
+        session.commit()
+
+    etag = client.get("/indicators").headers["etag"]
+    assert client.get("/indicators/latest", headers={"If-None-Match": etag}).status_code == 304
+
+    with get_session() as session:
+        session.add(CountryIndicatorModel(country_code="KEN", indicator_code="SP.POP.TOTL", year=2021, value=2.0))
+        session.commit()
+
+    latest = client.get("/indicators/latest", headers={"If-None-Match": etag})
+    assert latest.status_code == 200
+    assert latest.json()[0]["year"] == 2021
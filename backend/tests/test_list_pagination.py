@@ -0,0 +1,121 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.db.models import CentreModel, ReferenceModel, get_session
+from app.db.queries import CENTRE_COLUMNS, fetch_dicts, select_centres
+from app.services.schemas import CentreResponse, ReferenceResponse
+
+
+def _seed(count: int = 7) -> None:
+    with get_session() as session:
+        session.add_all(
+            [
+                CentreModel(
+                    id=f"C{idx:02d}",
+                    name=f"{'Hopital' if idx % 2 else 'Dispensaire'} 100%_{idx}",
+                    level="secondary" if idx % 2 else "primary",
+                    specialities="general, maternal" if idx % 3 == 0 else "general,pediatric",
+                    capacity_available=2,
+                    estimated_wait_minutes=10,
+                )
+                for idx in range(count)
+            ]
+        )
+        session.add_all(
+            [
+                ReferenceModel(source_id=f"C{idx:02d}", dest_id=f"C{idx + 1:02d}", travel_minutes=10 + idx)
+                for idx in range(count - 1)
+            ]
+        )
+        session.commit()
+
+
+def test_centres_keyset_pages_cover_the_full_list(client: TestClient) -> None:
+    _seed()
+    full = client.get("/centres").json()
+
+    pages, after_id = [], None
+    while True:
+        params = {"limit": 3} if after_id is None else {"limit": 3, "after_id": after_id}
+        page = client.get("/centres/page", params=params).json()
+        pages.extend(page["items"])
+        after_id = page["next_after_id"]
+        if after_id is None:
+            break
+
+    assert pages == full
+    assert len(pages) == 7
+    assert client.get("/centres/page", params={"limit": 0}).status_code == 422
+
+
+def test_centre_filters(client: TestClient) -> None:
+    _seed()
+
+    by_level = client.get("/centres", params={"level": "primary"}).json()
+    assert [item["id"] for item in by_level] == ["C00", "C02", "C04", "C06"]
+
+    maternal = client.get("/centres/page", params={"speciality": "maternal"}).json()
+    assert [item["id"] for item in maternal["items"]] == ["C00", "C03", "C06"]
+    assert client.get("/centres", params={"speciality": "matern"}).json() == []
+
+    created = client.post(
+        "/centres",
+        json={
+            "id": "C_MH",
+            "name": "Centre de sante mentale",
+            "level": "secondary",
+            "specialities": ["general", "mental health"],
+            "capacity_available": 1,
+            "estimated_wait_minutes": 5,
+        },
+    )
+    assert created.status_code == 201
+    for path in ("/centres", "/centres/stream"):
+        response = client.get(path, params={"speciality": "mental health"})
+        assert "C_MH" in response.text
+    mental = client.get("/centres/page", params={"speciality": " mental health "}).json()
+    assert [item["id"] for item in mental["items"]] == ["C_MH"]
+    assert client.get("/centres", params={"speciality": "mentalhealth"}).json() == []
+
+    hospitals = client.get("/centres", params={"name_prefix": "Hopital 100%_"}).json()
+    assert [item["id"] for item in hospitals] == ["C01", "C03", "C05"]
+    assert client.get("/centres", params={"name_prefix": "Hopital 100_"}).json() == []
+
+
+def test_streams_match_the_list_endpoints(client: TestClient) -> None:
+    _seed()
+
+    response = client.get("/centres/stream", params={"level": "secondary"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed == client.get("/centres", params={"level": "secondary"}).json()
+
+    streamed_refs = [json.loads(line) for line in client.get("/references/stream").text.splitlines()]
+    assert streamed_refs == client.get("/references").json()
+    assert len(streamed_refs) == 6
+
+
+def test_references_keyset_page_and_filters(client: TestClient) -> None:
+    _seed()
+    first = client.get("/references/page", params={"limit": 4}).json()
+    assert len(first["items"]) == 4
+    rest = client.get("/references/page", params={"limit": 4, "after_id": first["next_after_id"]}).json()
+    assert len(rest["items"]) == 2
+    assert rest["next_after_id"] is None
+
+    outgoing = client.get("/references", params={"source_id": "C02"}).json()
+    assert [(item["source_id"], item["dest_id"]) for item in outgoing] == [("C02", "C03")]
+
+
+def test_projected_lists_match_the_response_schemas(client: TestClient) -> None:
+    _seed(2)
+    with get_session() as session:
+        centres = fetch_dicts(session, select_centres(columns=(*CENTRE_COLUMNS, CentreModel.catchment_population)))
+
+    listed = client.get("/centres").json()
+    assert set(listed[0]) == set(CentreResponse.model_fields)
+    assert [CentreResponse(**item).model_dump() for item in listed] == listed
+    assert centres[0]["specialities"] == ["general", "maternal"]
+    assert centres[0]["catchment_population"] == 0
+    assert set(client.get("/references").json()[0]) == set(ReferenceResponse.model_fields)
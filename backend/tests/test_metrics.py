@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram, MetricsRegistry
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0)))
+    histogram.observe(0.05, route='/a"b')
+    histogram.observe(0.5, route='/a"b')
+    histogram.observe(3.0, route='/a"b')
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a\\"b",le="1"} 2',
+        'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 3',
+        'demo_seconds_sum{route="/a\\"b"} 3.55',
+        'demo_seconds_count{route="/a\\"b"} 3',
+    ]
+
+
+def test_metrics_endpoint_reports_route_latency_and_hot_path_timers(
+    client: TestClient, create_centre, create_reference
+) -> None:
+    before = client.get("/metrics").text
+    create_centre("C_LOCAL_A")
+    create_centre("H_DISTRICT_1", specialities=["general", "maternal"])
+    create_reference("C_LOCAL_A", "H_DISTRICT_1", 18)
+    response = client.post(
+        "/recommander",
+        json={"patient_id": "P1", "current_centre_id": "C_LOCAL_A", "needed_speciality": "maternal", "severity": "low"},
+    )
+    assert response.status_code == 200
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = metrics.text
+
+    def grew(prefix: str) -> bool:
+        return _sample(body, prefix) > _sample(before, prefix)
+
+    assert grew('carepath_http_request_duration_seconds_count{method="POST",route="/recommander",status="200"}')
+    assert grew('carepath_http_request_duration_seconds_count{method="POST",route="/centres",status="201"}')
+    assert grew('carepath_recommend_search_duration_seconds_count{method="dijkstra"}')
+    assert grew("carepath_recommend_scoring_duration_seconds_count")
+    assert grew("carepath_recommend_candidates_count")
+    assert grew('carepath_graph_reload_duration_seconds_count{layer="topology"}')
+    assert grew("carepath_db_commit_duration_seconds_count")
+    assert grew('carepath_db_transaction_duration_seconds_count{outcome="commit"}')
+    assert _sample(body, "carepath_graph_nodes") == 2
+    assert _sample(body, "carepath_graph_edges") == 1
@@ -0,0 +1,178 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text, update
+
+from app.api import routes
+from app.db.models import CentreModel, engine, get_network_versions, get_session
+from app.services.graph_service import GraphService
+
+
+def _add_centre(centre_id: str) -> None:
+    with get_session() as session:
+        session.add(
+            CentreModel(
+                id=centre_id,
+                name=f"Centre {centre_id}",
+                level="primary",
+                specialities="general",
+                capacity_available=1,
+                estimated_wait_minutes=5,
+            )
+        )
+        session.commit()
+
+
+def _current_versions() -> tuple[int, int]:
+    with get_session() as session:
+        return get_network_versions(session)
+
+
+def test_api_writes_bump_topology_version(client: TestClient, create_centre) -> None:
+    before, _ = _current_versions()
+    create_centre("C_LOCAL_A")
+    create_centre("H_DISTRICT_1")
+    after_centres, _ = _current_versions()
+    assert after_centres > before
+
+    response = client.post(
+        "/references",
+        json={"source_id": "C_LOCAL_A", "dest_id": "H_DISTRICT_1", "travel_minutes": 15},
+    )
+    assert response.status_code == 201
+    assert _current_versions()[0] > after_centres
+
+
+def test_bulk_delete_bumps_topology_version() -> None:
+    with get_session() as session:
+        session.add(
+            CentreModel(
+                id="BULK_1",
+                name="Bulk 1",
+                level="primary",
+                specialities="general",
+                capacity_available=1,
+                estimated_wait_minutes=5,
+            )
+        )
+        session.commit()
+
+    before, _ = _current_versions()
+    with get_session() as session:
+        session.query(CentreModel).delete()
+        session.commit()
+    assert _current_versions()[0] > before
+
+
+def test_bulk_load_update_bumps_load_only(client: TestClient, create_centre) -> None:
+    create_centre("C_LOCAL_A")
+    create_centre("H_DISTRICT_1")
+    topology_before, load_before = _current_versions()
+
+    with get_session() as session:
+        session.execute(update(CentreModel).where(CentreModel.id == "C_LOCAL_A").values(capacity_available=0))
+        session.execute(
+            update(CentreModel),
+            [{"id": "C_LOCAL_A", "estimated_wait_minutes": 45}, {"id": "H_DISTRICT_1", "capacity_available": 9}],
+        )
+        session.commit()
+    assert _current_versions() == (topology_before, load_before + 2)
+
+    with get_session() as session:
+        session.execute(update(CentreModel).values(capacity_available=1, name="Renamed"))
+        session.commit()
+    assert _current_versions()[0] > topology_before
+
+
+def test_update_values_contract() -> None:
+    # _is_load_only_update reads this private attribute; a SQLAlchemy upgrade that
+    # drops or reshapes it would silently turn load updates into topology bumps.
+    statement = update(CentreModel).values({CentreModel.estimated_wait_minutes: 5}).values(capacity_available=1)
+    assert {column.key for column in statement._values} == {"capacity_available", "estimated_wait_minutes"}
+    assert update(CentreModel)._values is None
+
+
+def test_capacity_edit_bumps_load_only(client: TestClient, create_centre) -> None:
+    create_centre("C_LOCAL_A")
+    graph_service = GraphService()
+    compact = graph_service.compact
+    topology_before, load_before = _current_versions()
+
+    assert graph_service.refresh() is False
+
+    with get_session() as session:
+        centre = session.get(CentreModel, "C_LOCAL_A")
+        centre.capacity_available = 0
+        session.commit()
+
+    topology_after, load_after = _current_versions()
+    assert topology_after == topology_before
+    assert load_after > load_before
+
+    assert graph_service.refresh() is True
+    assert graph_service.compact is compact
+    assert graph_service.node("C_LOCAL_A")["capacity_available"] == 0
+    assert graph_service.candidate_destinations("maternal") == []
+    assert graph_service.refresh() is False
+
+
+def test_patch_centre_load_updates_without_topology_bump(client: TestClient, create_centre) -> None:
+    create_centre("C_LOCAL_A")
+    create_centre("H_DISTRICT_1", specialities=["general", "maternal"])
+    client.post("/references", json={"source_id": "C_LOCAL_A", "dest_id": "H_DISTRICT_1", "travel_minutes": 15})
+    recommender = routes.get_recommender()
+    recommender.graph_service.refresh()
+    compact = recommender.graph_service.compact
+    topology_before, load_before = _current_versions()
+
+    response = client.patch("/centres/H_DISTRICT_1/load", json={"capacity_available": 0})
+    assert response.status_code == 200
+    body = response.json()
+    assert body == {
+        "id": "H_DISTRICT_1",
+        "capacity_available": 0,
+        "estimated_wait_minutes": 25,
+        "load_version": load_before + 1,
+    }
+    assert _current_versions() == (topology_before, load_before + 1)
+    assert recommender.graph_service.load_version == load_before + 1
+    assert recommender.graph_service.compact is compact
+
+    recommend = client.post(
+        "/recommander",
+        json={"patient_id": "P1", "current_centre_id": "C_LOCAL_A", "needed_speciality": "maternal"},
+    )
+    assert recommend.status_code == 400
+    assert "No available destination" in recommend.json()["detail"]
+
+
+def test_patch_centre_load_validation(client: TestClient, create_centre) -> None:
+    create_centre("C_LOCAL_A")
+
+    assert client.patch("/centres/UNKNOWN/load", json={"capacity_available": 1}).status_code == 404
+    assert client.patch("/centres/C_LOCAL_A/load", json={}).status_code == 400
+    assert client.patch("/centres/C_LOCAL_A/load", json={"estimated_wait_minutes": -1}).status_code == 422
+
+
+def test_databases_without_change_counters_route_and_track_writes() -> None:
+    # A carepath.db from before the change counters, opened without init_db (e.g. scripts/train_rl.py).
+    with engine.begin() as conn:
+        saved = conn.execute(text("SELECT name, version FROM change_counters")).all()
+        conn.execute(text("DROP TABLE change_counters"))
+    try:
+        with get_session() as session:
+            assert get_network_versions(session) == (0, 0)
+        assert GraphService().is_empty()
+
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE change_counters"))
+        _add_centre("LEGACY_1")
+        with get_session() as session:
+            assert get_network_versions(session) == (1, 0)
+    finally:
+        # Restore the counters one past where they were, so cached graphs elsewhere reload.
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM change_counters"))
+            for name, version in saved:
+                conn.execute(
+                    text("INSERT INTO change_counters (name, version) VALUES (:name, :version)"),
+                    {"name": name, "version": version + 1},
+                )
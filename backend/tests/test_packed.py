@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from app.services.packed import IdIndex, StringTable, plain_view
+
+
+def test_string_table_round_trips_unicode_and_nulls() -> None:
+    values = ["C_LOCAL_A", None, "Hôpital de Kédougou", ""]
+    table = StringTable.from_values(values)
+
+    assert len(table) == 4
+    assert list(table) == values
+    assert table[-2] == "Hôpital de Kédougou"
+    assert table[1:3] == [None, "Hôpital de Kédougou"]
+    assert table.offsets.dtype == np.int64 and table.data.dtype == np.uint8
+    with pytest.raises(IndexError):
+        table[4]
+    assert list(StringTable.from_values([])) == []
+
+    ids = StringTable.from_values(["A", "BC"])
+    assert ids.matches(["A", "BC"])
+    assert not ids.matches(["AB", "C"]) and not ids.matches(["BC", "A"]) and not ids.matches(["A"])
+    assert not table.matches(["C_LOCAL_A", "", "Hôpital de Kédougou", ""])
+
+
+def test_id_index_finds_every_id_without_a_dict() -> None:
+    ids = StringTable.from_values([f"N{idx}" for idx in range(1000)])
+    index = IdIndex.build(ids)
+
+    assert len(index.slots) == 2048
+    assert all(index[f"N{idx}"] == idx for idx in range(1000))
+    assert index.get("N1000") is None and "N1000" not in index and 7 not in index
+    with pytest.raises(KeyError):
+        index["missing"]
+    # The slots alone are enough: a worker mapping them sees the same index.
+    mapped = IdIndex(ids=ids, slots=np.frombuffer(index.slots.tobytes(), dtype="<i4"))
+    assert mapped["N512"] == 512
+    assert list(mapped)[:3] == ["N0", "N1", "N2"]
+
+
+def test_plain_view_reads_arrays_as_python_numbers() -> None:
+    weights = np.array([1.5, 2.25], dtype=np.float32)
+    view = plain_view(weights)
+    assert view[1] == 2.25 and type(view[1]) is float
+    assert plain_view(np.array([3, 4], dtype=">i4")) == [3, 4]
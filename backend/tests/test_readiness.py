@@ -0,0 +1,41 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api import routes
+
+
+def test_ready_reports_warming_until_the_graph_is_loaded(client: TestClient, monkeypatch) -> None:
+    # Without the lifespan nothing preloads, so a fresh process would still be warming.
+    monkeypatch.setattr(routes, "_warm", routes.threading.Event())
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming"
+    assert client.get("/health").status_code == 200
+
+
+def test_lifespan_preloads_the_graph_before_ready(client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(routes, "_warm", routes.threading.Event())
+    client.post(
+        "/centres",
+        json={
+            "id": "C_LOCAL_A",
+            "name": "Centre A",
+            "level": "primary",
+            "specialities": ["general"],
+            "capacity_available": 3,
+            "estimated_wait_minutes": 10,
+        },
+    )
+    with TestClient(client.app) as started:
+        deadline = time.monotonic() + 10
+        response = started.get("/ready")
+        while response.status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            response = started.get("/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["node_count"] == 1
+    assert body["routing_method"] == "dijkstra"
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def network(create_centre, create_reference) -> None:
+    create_centre("C_LOCAL_A", specialities=["general", "maternal"], capacity_available=3, estimated_wait_minutes=10)
+    create_centre("C_LOCAL_B", capacity_available=3, estimated_wait_minutes=10)
+    create_centre("H_DISTRICT_1", specialities=["general", "maternal"], capacity_available=2, estimated_wait_minutes=30)
+    create_centre("H_REGIONAL_1", specialities=["maternal", "pediatric"], capacity_available=6, estimated_wait_minutes=45)
+    create_reference("C_LOCAL_A", "H_DISTRICT_1", 20)
+    create_reference("C_LOCAL_A", "H_REGIONAL_1", 30)
+    create_reference("C_LOCAL_B", "H_DISTRICT_1", 15)
+    create_reference("H_DISTRICT_1", "H_REGIONAL_1", 25)
+
+
+def test_batch_matches_single_recommendations_in_order(client: TestClient, network) -> None:
+    items = [
+        {"patient_id": "P1", "current_centre_id": "C_LOCAL_A", "needed_speciality": "maternal", "severity": "medium"},
+        {"patient_id": "P2", "current_centre_id": "C_LOCAL_B", "needed_speciality": "pediatric", "severity": "high"},
+        {"patient_id": "P3", "current_centre_id": "C_LOCAL_A", "needed_speciality": "general", "severity": "low"},
+        {"patient_id": "P4", "current_centre_id": "C_LOCAL_B", "needed_speciality": "maternal", "severity": "low"},
+    ]
+
+    response = client.post("/recommander/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["topology_version"] is not None
+    assert body["load_version"] is not None
+    assert [result["patient_id"] for result in body["results"]] == ["P1", "P2", "P3", "P4"]
+
+    for item, result in zip(items, body["results"]):
+        single = client.post("/recommander", json=item)
+        assert single.status_code == 200
+        assert result["error"] is None
+        assert result["recommendation"] == single.json()
+
+
+def test_batch_reports_errors_per_item(client: TestClient, network) -> None:
+    items = [
+        {"patient_id": "P1", "current_centre_id": "C_LOCAL_A", "needed_speciality": "maternal", "severity": "medium"},
+        {"patient_id": "P2", "current_centre_id": "H_REGIONAL_1", "needed_speciality": "general", "severity": "medium"},
+        {"patient_id": "P3", "current_centre_id": "UNKNOWN", "needed_speciality": "maternal", "severity": "medium"},
+    ]
+
+    response = client.post("/recommander/batch", json={"items": items})
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert results[0]["recommendation"]["destination_centre_id"] == "H_REGIONAL_1"
+    assert results[1]["recommendation"] is None
+    assert "No reachable destination" in results[1]["error"]
+    assert "No reachable destination" in results[2]["error"]
+
+
+def test_batch_on_empty_network_returns_item_errors(client: TestClient) -> None:
+    response = client.post(
+        "/recommander/batch",
+        json={"items": [{"patient_id": "P1", "current_centre_id": "C_LOCAL_A", "needed_speciality": "maternal"}]},
+    )
+    assert response.status_code == 200
+    assert "Referral network is empty" in response.json()["results"][0]["error"]
@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services.route_cache import RouteCache
+
+
+@pytest.fixture
+def network(create_centre, create_reference) -> None:
+    create_centre("C_LOCAL_A", capacity_available=2, estimated_wait_minutes=20)
+    create_centre("H_DISTRICT_1", specialities=["general", "maternal"], capacity_available=2, estimated_wait_minutes=20)
+    create_centre("H_REGIONAL_1", specialities=["maternal"], capacity_available=4, estimated_wait_minutes=20)
+    create_reference("C_LOCAL_A", "H_DISTRICT_1", 15)
+    create_reference("C_LOCAL_A", "H_REGIONAL_1", 60)
+
+
+def _recommend(client: TestClient, patient_id: str):
+    return client.post(
+        "/recommander",
+        json={"patient_id": patient_id, "current_centre_id": "C_LOCAL_A", "needed_speciality": "maternal"},
+    )
+
+
+def test_repeated_query_is_served_from_cache(client: TestClient, network) -> None:
+    before = client.get("/recommander/cache").json()
+
+    first = _recommend(client, "P1")
+    second = _recommend(client, "P2")
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json()["patient_id"] == "P2"
+    assert {**first.json(), "patient_id": "P2"} == second.json()
+
+    stats = client.get("/recommander/cache").json()
+    assert stats["misses"] == before["misses"] + 1
+    assert stats["hits"] == before["hits"] + 1
+    assert stats["size"] == 1
+
+
+def test_load_change_invalidates_cached_routes(client: TestClient, network) -> None:
+    assert _recommend(client, "P1").json()["destination_centre_id"] == "H_DISTRICT_1"
+
+    response = client.patch("/centres/H_DISTRICT_1/load", json={"capacity_available": 0})
+    assert response.status_code == 200
+
+    assert _recommend(client, "P2").json()["destination_centre_id"] == "H_REGIONAL_1"
+    stats = routes.get_recommender().route_cache.stats()
+    assert stats["load_version"] == response.json()["load_version"]
+    assert stats["size"] == 1
+
+
+def test_route_cache_is_bounded_lru() -> None:
+    cache = RouteCache(max_size=2)
+    versions = (1, 1)
+    cache.put(("A", "maternal", "low"), versions, ValueError("a"))
+    cache.put(("B", "maternal", "low"), versions, ValueError("b"))
+    assert cache.get(("A", "maternal", "low"), versions) is not None
+    cache.put(("C", "maternal", "low"), versions, ValueError("c"))
+
+    assert cache.get(("B", "maternal", "low"), versions) is None
+    assert cache.get(("A", "maternal", "low"), versions) is not None
+    assert cache.get(("A", "maternal", "low"), (1, 0)) is None
+    assert cache.get(("A", "maternal", "low"), (1, 2)) is None
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["evictions"] == 3
@@ -0,0 +1,83 @@
+from sqlalchemy import text
+
+from app.db.models import (
+    SQLITE_MIGRATIONS,
+    CentreModel,
+    ReferenceModel,
+    engine,
+    get_network_versions,
+    get_session,
+    init_db,
+)
+
+
+def _index_names(conn) -> set[str]:
+    return {row[1] for row in conn.execute(text("PRAGMA index_list('references')"))}
+
+
+def test_reference_migration_dedupes_pairs_and_adds_indexes() -> None:
+    with get_session() as session:
+        session.add_all(
+            [
+                CentreModel(
+                    id=centre_id,
+                    name=centre_id,
+                    level="primary",
+                    specialities="general",
+                    capacity_available=1,
+                    estimated_wait_minutes=5,
+                )
+                for centre_id in ("A", "B")
+            ]
+        )
+        session.commit()
+
+    # Rewind to a database from before the reference indexes existed.
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_references_pair"))
+        conn.execute(text("DROP INDEX ix_references_dest_id"))
+        conn.execute(
+            text(
+                'INSERT INTO "references" (source_id, dest_id, travel_minutes) '
+                "VALUES ('A', 'B', 30), ('A', 'B', 12), ('B', 'A', 9)"
+            )
+        )
+        conn.execute(text("PRAGMA user_version = 1"))
+    with get_session() as session:
+        before, _ = get_network_versions(session)
+
+    init_db()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA user_version")).scalar_one() == len(SQLITE_MIGRATIONS)
+        assert {"uq_references_pair", "ix_references_dest_id"} <= _index_names(conn)
+    with get_session() as session:
+        rows = session.query(ReferenceModel).order_by(ReferenceModel.source_id).all()
+        after, _ = get_network_versions(session)
+    assert [(r.source_id, r.dest_id, r.travel_minutes) for r in rows] == [("A", "B", 12), ("B", "A", 9)]
+    assert after == before + 1
+
+
+def test_episode_migration_rebuilds_the_table_and_keeps_rows() -> None:
+    # Rewind to the original episodes table, whose patient_id referenced patients.
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE episodes"))
+        conn.execute(
+            text(
+                "CREATE TABLE episodes (id INTEGER PRIMARY KEY, patient_id VARCHAR NOT NULL REFERENCES patients(id), "
+                "source_id VARCHAR NOT NULL, recommended_dest_id VARCHAR NOT NULL, reward INTEGER NOT NULL)"
+            )
+        )
+        conn.execute(text("INSERT INTO episodes VALUES (1, 'P1', 'A', 'B', 3)"))
+        conn.execute(text("PRAGMA user_version = 2"))
+
+    init_db()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA user_version")).scalar_one() == len(SQLITE_MIGRATIONS)
+        referenced = {row[2] for row in conn.execute(text("PRAGMA foreign_key_list('episodes')"))}
+        assert referenced == {"centres"}
+        row = conn.execute(text("SELECT patient_id, reward, latency_ms FROM episodes")).one()
+        conn.execute(text("DELETE FROM episodes"))
+        conn.commit()
+    assert tuple(row) == ("P1", 3, None)
@@ -1,6 +1,11 @@
+import random
+
+import networkx as nx
 from fastapi.testclient import TestClient
 
-from app.services.recommender import CandidateScore
+from app.db.models import CentreModel, ReferenceModel, get_session
+from app.services.recommender import CandidateScore, Recommender, compute_final_score
+from app.services.schemas import RecommandationRequest
 
 
 def _create_centre(
@@ -148,3 +153,57 @@ def test_recommender_ignores_current_centre_as_destination(client: TestClient) -
 
     assert response.status_code == 400
     assert "No available destination" in response.json()["detail"]
+
+
+def test_pruned_search_matches_exhaustive_scoring() -> None:
+    rng = random.Random(7)
+    centre_ids = [f"N{i}" for i in range(40)]
+    with get_session() as session:
+        session.add_all(
+            [
+                CentreModel(
+                    id=centre_id,
+                    name=f"Centre {centre_id}",
+                    level="secondary",
+                    specialities=rng.choice(["general", "general,maternal", "maternal"]),
+                    capacity_available=rng.randint(0, 6),
+                    estimated_wait_minutes=rng.randint(5, 60),
+                )
+                for centre_id in centre_ids
+            ]
+        )
+        edges = {tuple(rng.sample(centre_ids, 2)) for _ in range(160)}
+        session.add_all([ReferenceModel(source_id=s, dest_id=d, travel_minutes=rng.randint(5, 60)) for s, d in edges])
+        session.commit()
+
+    recommender = Recommender()
+    graph = recommender.graph_service.graph
+    for source in centre_ids:
+        lengths = nx.single_source_dijkstra_path_length(graph, source, weight="travel_minutes")
+        for severity in ("low", "high"):
+            scores = [
+                (
+                    compute_final_score(
+                        travel_minutes=lengths[node_id],
+                        wait_minutes=graph.nodes[node_id]["estimated_wait_minutes"],
+                        capacity=graph.nodes[node_id]["capacity_available"],
+                        severity=severity,
+                    ),
+                    node_id,
+                )
+                for node_id in recommender.graph_service.candidate_destinations("maternal")
+                if node_id != source and node_id in lengths
+            ]
+            if not scores:
+                continue
+            expected_score = min(score for score, _ in scores)
+            expected = next(node_id for score, node_id in scores if score == expected_score)
+            payload = RecommandationRequest(
+                patient_id="P1",
+                current_centre_id=source,
+                needed_speciality="maternal",
+                severity=severity,
+            )
+            result = recommender.recommend(payload)
+            assert result.destination_centre_id == expected
+            assert result.score == expected_score
@@ -0,0 +1,108 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db.models import Base, engine, get_database_id, get_session, init_db
+from app.services import graph_service
+from app.services.graph_service import GraphService
+
+
+def _file_name(topology_version: int) -> str:
+    with get_session() as session:
+        return f"topology-{get_database_id(session)}-{topology_version}.cpgs"
+
+
+def test_workers_map_one_topology_file_and_match_a_private_build(seeded_network, monkeypatch, tmp_path) -> None:
+    private = GraphService().compact
+
+    monkeypatch.setenv("GRAPH_SNAPSHOT_DIR", str(tmp_path))
+    builds = []
+    build = GraphService._build_shared_topology
+    monkeypatch.setattr(GraphService, "_build_shared_topology", staticmethod(lambda: builds.append(1) or build()))
+    first = GraphService()
+    second = GraphService()
+
+    assert len(builds) == 1
+    assert [path.name for path in tmp_path.glob("topology-*")] == [_file_name(first.topology_version)]
+    for service in (first, second):
+        compact = service.compact
+        assert not compact.indptr.flags.owndata and not compact.indptr.flags.writeable
+        assert list(compact.ids) == list(private.ids)
+        assert compact.index["H_DISTRICT_1"] == 1 and "MISSING" not in compact.index
+        assert [compact.osm_type(idx) for idx in range(2)] == [private.osm_type(idx) for idx in range(2)]
+        assert compact.indptr.tolist() == private.indptr.tolist()
+        assert compact.travel_minutes.tolist() == private.travel_minutes.tolist()
+        assert compact.node_specialities(1) == ("general", "maternal")
+    assert second.load.capacity_available.tolist() == [5, 5]
+
+
+def test_workers_swap_to_the_new_file_when_the_topology_changes(client: TestClient, seeded_network, monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("GRAPH_SNAPSHOT_DIR", str(tmp_path))
+    first = GraphService()
+    second = GraphService()
+    old_version = first.topology_version
+
+    client.post("/references", json={"source_id": "H_DISTRICT_1", "dest_id": "C_LOCAL_A", "travel_minutes": 12})
+    client.patch("/centres/C_LOCAL_A/load", json={"capacity_available": 2})
+    assert first.refresh() and second.refresh()
+
+    assert first.topology_version == second.topology_version > old_version
+    assert [path.name for path in tmp_path.glob("topology-*")] == [_file_name(first.topology_version)]
+    assert second.compact.edge_count == 2
+    assert second.load.capacity_available.tolist() == [2, 5]
+    travel, _ = second.snapshot().shortest_travel_times("H_DISTRICT_1", ["C_LOCAL_A"])
+    assert travel == {"C_LOCAL_A": 12.0}
+
+
+def test_workers_map_the_hierarchy_built_with_the_topology(seeded_network, monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("GRAPH_SNAPSHOT_DIR", str(tmp_path / "shared"))
+    monkeypatch.setenv("DISTANCE_MATRIX_DIR", str(tmp_path / "matrix"))
+    monkeypatch.setenv("ROUTING_MODE", "hierarchical")
+    contractions = []
+    build = graph_service.build_hierarchy
+    monkeypatch.setattr(graph_service, "build_hierarchy", lambda compact: contractions.append(1) or build(compact))
+    first = GraphService()
+    second = GraphService()
+
+    assert len(contractions) == 1
+    for service in (first, second):
+        snapshot = service.snapshot()
+        assert snapshot.routing_method == "hierarchy"
+        assert not snapshot.hierarchy.up_indptr.flags.owndata
+        travel, _ = snapshot.shortest_travel_times("C_LOCAL_A", ["H_DISTRICT_1"])
+        assert travel == {"H_DISTRICT_1": 18.0}
+
+
+def test_a_recreated_database_never_maps_the_old_file_at_the_same_version(
+    seeded_network, create_centre, create_reference, monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("GRAPH_SNAPSHOT_DIR", str(tmp_path))
+    version = GraphService().topology_version
+    with engine.begin() as conn:
+        saved = conn.execute(text("SELECT name, version FROM change_counters")).all()
+
+    # Start over from an empty database, as after deleting carepath.db, and reach the same version.
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("PRAGMA user_version = 0"))
+    init_db()
+    try:
+        create_centre("C_LOCAL_A", level="primary")
+        create_centre("H_DISTRICT_1", specialities=["general", "maternal"])
+        create_reference("C_LOCAL_A", "H_DISTRICT_1", 40)
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE change_counters SET version = :version WHERE name = 'topology'"), {"version": version})
+
+        service = GraphService()
+        assert service.topology_version == version
+        travel, _ = service.snapshot().shortest_travel_times("C_LOCAL_A", ["H_DISTRICT_1"])
+        assert travel == {"H_DISTRICT_1": 40.0}
+        assert _file_name(version) in [path.name for path in tmp_path.glob("topology-*")]
+    finally:
+        # Restore the counters one past where they were, so cached graphs elsewhere reload.
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM change_counters"))
+            for name, counter in saved:
+                conn.execute(
+                    text("INSERT INTO change_counters (name, version) VALUES (:name, :version)"),
+                    {"name": name, "version": counter + 1},
+                )
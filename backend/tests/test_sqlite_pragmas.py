@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.config import get_sqlite_pragmas
+from app.db.models import engine
+
+
+def test_engine_connections_use_the_performance_profile() -> None:
+    with engine.connect() as conn:
+        values = {
+            name: conn.execute(text(f"PRAGMA {name}")).scalar_one()
+            for name in ("journal_mode", "synchronous", "temp_store", "cache_size", "busy_timeout")
+        }
+    # synchronous 1 is NORMAL, temp_store 2 is MEMORY.
+    assert values == {
+        "journal_mode": "wal",
+        "synchronous": 1,
+        "temp_store": 2,
+        "cache_size": -65536,
+        "busy_timeout": 5000,
+    }
+
+
+def test_sqlite_pragmas_are_tunable(monkeypatch) -> None:
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "delete")
+    monkeypatch.setenv("SQLITE_MMAP_SIZE", "")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "250")
+    pragmas = get_sqlite_pragmas()
+    assert pragmas["journal_mode"] == "DELETE"
+    assert "mmap_size" not in pragmas
+    assert pragmas["busy_timeout"] == "250"
+
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "WAL; DROP TABLE centres")
+    with pytest.raises(ValueError):
+        get_sqlite_pragmas()
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "WAL")
+    monkeypatch.setenv("SQLITE_CACHE_SIZE", "lots")
+    with pytest.raises(ValueError):
+        get_sqlite_pragmas()
@@ -7,7 +7,6 @@ import networkx as nx
 import streamlit as st
 import streamlit.components.v1 as components
 from pyvis.network import Network
-from sqlalchemy import select
 
 try:
     from streamlit_autorefresh import st_autorefresh
@@ -20,7 +19,8 @@ BACKEND_DIR = REPO_ROOT / "backend"
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
-from app.db.models import CentreModel, ReferenceModel, get_session, init_db
+from app.db.models import CentreModel, get_session, init_db
+from app.db.queries import CENTRE_COLUMNS, fetch_dicts, select_centres, select_references
 from app.services.recommender import Recommender
 from app.services.schemas import RecommandationRequest
 
@@ -33,34 +33,16 @@ init_db()
 @st.cache_data(ttl=3)
 def fetch_centres_local() -> list[dict]:
     with get_session() as session:
-        rows = session.scalars(select(CentreModel).order_by(CentreModel.id)).all()
-    return [
-        {
-            "id": row.id,
-            "name": row.name,
-            "level": row.level,
-            "specialities": [s.strip() for s in row.specialities.split(",") if s.strip()],
-            "capacity_available": int(row.capacity_available),
-            "estimated_wait_minutes": int(row.estimated_wait_minutes),
-            "catchment_population": int(row.catchment_population or 0),
-        }
-        for row in rows
-    ]
+        centres = fetch_dicts(session, select_centres(columns=(*CENTRE_COLUMNS, CentreModel.catchment_population)))
+    for centre in centres:
+        centre["catchment_population"] = centre["catchment_population"] or 0
+    return centres
 
 
 @st.cache_data(ttl=3)
 def fetch_references_local() -> list[dict]:
     with get_session() as session:
-        rows = session.scalars(select(ReferenceModel).order_by(ReferenceModel.id)).all()
-    return [
-        {
-            "id": int(row.id),
-            "source_id": row.source_id,
-            "dest_id": row.dest_id,
-            "travel_minutes": int(row.travel_minutes),
-        }
-        for row in rows
-    ]
+        return fetch_dicts(session, select_references())
 
 
 def build_graph(centres: list[dict], refs: list[dict]) -> nx.DiGraph: